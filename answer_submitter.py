@@ -1,23 +1,82 @@
 import httpx
-import json
+import hashlib
 import logging
+import random
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
 from typing import Dict, Any, Optional
 import asyncio
+from host_latency import host_latency, LatencyHistogram
+from circuit_breaker import CircuitOpenError
+from json_codec import encode_json, decode_json
 
 logger = logging.getLogger(__name__)
 
+# Statuses worth another attempt: the server was overloaded, restarting or asked us to slow down
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# Bodies above this size are sent as a stream of slices instead of one buffer handed to the transport
+STREAM_THRESHOLD = 1024 * 1024
+STREAM_CHUNK = 64 * 1024
+
+def submission_key(submit_url: str, body: bytes) -> str:
+    digest = hashlib.sha256(submit_url.encode('utf-8'))
+    digest.update(b'\n')
+    digest.update(body)
+    return digest.hexdigest()
+
+async def stream_body(body: bytes):
+    """The body in slices; each slice is copied only as it is written"""
+    view = memoryview(body)
+    for offset in range(0, len(body), STREAM_CHUNK):
+        yield bytes(view[offset:offset + STREAM_CHUNK])
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get('retry-after')
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
 class AnswerSubmitter:
-    def __init__(self):
+    """
+    Submits answers with retries: transient failures (connection errors,
+    timeouts, 429/5xx) are retried with full-jitter exponential backoff while
+    the caller's deadline (or `max_total` seconds) allows, anything else fails
+    at once. Waits between attempts, Retry-After included, are capped at
+    `max_delay`. Identical submissions share one in-flight request, and a
+    successful result is replayed for `dedup_ttl` seconds instead of posting again.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.25, max_delay: float = 4.0,
+                 dedup_ttl: float = 600.0, max_recent: int = 256, max_total: float = 60.0):
         self.client = httpx.AsyncClient(timeout=30.0)
-    
-    async def submit_answer(self, 
-                          submit_url: str, 
-                          email: str, 
-                          secret: str, 
-                          quiz_url: str, 
-                          answer: Any) -> Dict[str, Any]:
+        self.max_attempts = max_attempts
+        self.max_total = max_total
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dedup_ttl = dedup_ttl
+        self.max_recent = max_recent
+        self._inflight = {}
+        self._recent = OrderedDict()
+        self._metrics = {}
+
+    async def submit_answer(self,
+                          submit_url: str,
+                          email: str,
+                          secret: str,
+                          quiz_url: str,
+                          answer: Any,
+                          deadline: Optional[float] = None) -> Dict[str, Any]:
         """
-        Submit answer to the evaluation endpoint
+        Submit answer to the evaluation endpoint. `deadline` (time.monotonic())
+        bounds all attempts and backoff sleeps together; without one they get
+        `max_total` seconds.
         """
         payload = {
             "email": email,
@@ -25,49 +84,152 @@ class AnswerSubmitter:
             "url": quiz_url,
             "answer": answer
         }
-        
-        logger.info(f"Submitting answer to: {submit_url}")
-        logger.info(f"Payload: {json.dumps(payload, indent=2)}")
-        
+        metrics = self._metrics_for(submit_url)
+        metrics['submissions'] += 1
         try:
-            response = await self.client.post(
-                submit_url,
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            logger.info(f"Submission response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Submission successful: {result}")
-                return {
-                    "status": "submitted",
-                    "correct": result.get("correct", False),
-                    "reason": result.get("reason"),
-                    "next_url": result.get("url"),
-                    "response": result
-                }
-            else:
+            body = encode_json(payload)
+        except (TypeError, ValueError) as e:
+            # An answer that can't be serialized will never be accepted; report it like any other fatal error
+            metrics['fatal_errors'] += 1
+            error_msg = f"Submission error: could not serialize the answer: {str(e)}"
+            logger.error(error_msg)
+            return {"status": "error", "error": error_msg, "correct": False, "retryable": False, "attempts": 0}
+        # The payload dict isn't needed once serialized; drop our reference so only the body is held
+        del payload
+        key = submission_key(submit_url, body)
+
+        recent = self._recent.get(key)
+        if recent is not None and time.monotonic() - recent[1] < self.dedup_ttl:
+            metrics['deduplicated'] += 1
+            logger.info(f"Identical submission to {submit_url} already answered, reusing the result")
+            return dict(recent[0], deduplicated=True)
+
+        if deadline is None:
+            deadline = time.monotonic() + self.max_total
+
+        pending = self._inflight.get(key)
+        while pending is not None:
+            metrics['deduplicated'] += 1
+            logger.info(f"Identical submission to {submit_url} in flight, waiting for it")
+            try:
+                return dict(await asyncio.shield(pending), deduplicated=True)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+            # The submission we waited on was cancelled with its caller; this caller still wants an answer
+            logger.info(f"In-flight submission to {submit_url} was cancelled, submitting again")
+            pending = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._submit_with_retries(submit_url, body, key, deadline, metrics)
+            if result['status'] == 'submitted':
+                self._recent[key] = (result, time.monotonic())
+                while len(self._recent) > self.max_recent:
+                    self._recent.popitem(last=False)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; waiters see a cancelled future and submit themselves
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _submit_with_retries(self, submit_url: str, body: bytes, key: str, deadline: float,
+                                   metrics: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info(f"Submitting answer to: {submit_url} ({len(body)} bytes, sha256 {key[:16]})")
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+
+        attempt = 0
+        while True:
+            attempt += 1
+            metrics['attempts'] += 1
+            retry_after = None
+            timeout = min(30.0, deadline - time.monotonic())
+            start = time.perf_counter()
+            try:
+                if timeout <= 0:
+                    raise httpx.TimeoutException("Chain deadline reached before submitting")
+                # Submissions aren't idempotent: adaptive timeout, but never hedged
+                response = await host_latency.send(
+                    self.client, 'POST', submit_url, hedge=False, default_timeout=timeout,
+                    content=stream_body(body) if len(body) > STREAM_THRESHOLD else body,
+                    headers=headers
+                )
+                metrics['latency'].record(time.perf_counter() - start)
+                logger.info(f"Submission response status: {response.status_code}")
+
+                if response.status_code == 200:
+                    result = decode_json(response.content)
+                    logger.info(f"Submission successful: {result}")
+                    metrics['succeeded'] += 1
+                    return {
+                        "status": "submitted",
+                        "correct": result.get("correct", False),
+                        "reason": result.get("reason"),
+                        "next_url": result.get("url"),
+                        "response": result,
+                        "attempts": attempt
+                    }
                 error_msg = f"Submission failed with status {response.status_code}: {response.text}"
+                retryable = response.status_code in RETRYABLE_STATUS
+                retry_after = retry_after_seconds(response)
+            except CircuitOpenError as e:
+                # The host is known to be down; retrying inside this deadline won't help
+                error_msg = f"Submission error: {str(e)}"
+                retryable = False
+            except httpx.TransportError as e:
+                error_msg = f"Submission error: {type(e).__name__}: {str(e)}"
+                retryable = True
+            except Exception as e:
+                error_msg = f"Submission error: {str(e)}"
+                retryable = False
+
+            delay = min(self.max_delay, retry_after) if retry_after is not None else \
+                random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+            out_of_time = time.monotonic() + delay + 1.0 >= deadline
+            if not retryable or attempt >= self.max_attempts or out_of_time:
+                metrics['retryable_errors' if retryable else 'fatal_errors'] += 1
                 logger.error(error_msg)
                 return {
                     "status": "error",
                     "error": error_msg,
-                    "correct": False
+                    "correct": False,
+                    "retryable": retryable,
+                    "attempts": attempt
                 }
-                
-        except Exception as e:
-            error_msg = f"Submission error: {str(e)}"
-            logger.error(error_msg)
-            return {
-                "status": "error",
-                "error": error_msg,
-                "correct": False
+
+            metrics['retries'] += 1
+            logger.warning(f"{error_msg}; retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_attempts})")
+            await asyncio.sleep(delay)
+
+    def _metrics_for(self, submit_url: str) -> Dict[str, Any]:
+        metrics = self._metrics.get(submit_url)
+        if metrics is None:
+            metrics = self._metrics[submit_url] = {
+                'submissions': 0, 'attempts': 0, 'retries': 0, 'succeeded': 0, 'deduplicated': 0,
+                'retryable_errors': 0, 'fatal_errors': 0, 'latency': LatencyHistogram()
             }
-    
+        return metrics
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        for url, metrics in self._metrics.items():
+            latency = metrics['latency']
+            stats[url] = {name: value for name, value in metrics.items() if name != 'latency'}
+            stats[url]['p50_ms'] = round((latency.quantile(0.5) or 0) * 1000, 1)
+            stats[url]['p95_ms'] = round((latency.quantile(0.95) or 0) * 1000, 1)
+        return stats
+
     async def close(self):
         await self.client.aclose()
 
 # Global submitter instance
-answer_submitter = AnswerSubmitter()
\ No newline at end of file
+answer_submitter = AnswerSubmitter()
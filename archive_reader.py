@@ -0,0 +1,139 @@
+import gzip
+import io
+import logging
+import os
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from data_readers import FORMAT_EXTENSIONS, detect_format
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_EXTENSIONS = ('.tar.gz', '.tgz', '.gz', '.zip')
+
+# Preferred member types when an archive holds several files
+MEMBER_PREFERENCE = ('.csv', '.tsv', '.jsonl', '.ndjson', '.json', '.xlsx', '.xls', '.txt')
+
+def is_archive(name: str) -> bool:
+    return name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+def detect_compression(name: str, head: bytes) -> Optional[str]:
+    """Identify gzip / zip / tar.gz from magic bytes, falling back to the file name"""
+    if head.startswith(b'PK\x03\x04') or head.startswith(b'PK\x05\x06'):
+        return 'zip'
+    if head.startswith(b'\x1f\x8b'):
+        lowered = name.lower()
+        return 'tar.gz' if lowered.endswith(('.tar.gz', '.tgz')) else 'gzip'
+
+    lowered = name.lower()
+    if lowered.endswith('.zip'):
+        return 'zip'
+    if lowered.endswith(('.tar.gz', '.tgz')):
+        return 'tar.gz'
+    if lowered.endswith('.gz'):
+        return 'gzip'
+    return None
+
+def select_member(names: List[str], member: Optional[str] = None,
+                  extensions: Tuple[str, ...] = MEMBER_PREFERENCE) -> Optional[str]:
+    """
+    Pick an archive member: an exact or basename match for `member`, an extension
+    filter if `member` starts with '.', otherwise (or when `member` isn't in the
+    archive) the first file of the most preferred data type.
+    """
+    candidates = [n for n in names if not n.endswith('/') and not n.startswith('__MACOSX/')
+                  and not os.path.basename(n).startswith('.')]
+
+    extension_filter = bool(member) and member.startswith('.')
+    if extension_filter:
+        extensions = (member.lower(),)
+    elif member:
+        for name in candidates:
+            if _is_named_member(name, member):
+                return name
+        logger.info(f"{member} not found in archive, using the first data file")
+
+    for ext in extensions:
+        for name in candidates:
+            if name.lower().endswith(ext):
+                return name
+
+    return candidates[0] if candidates and not extension_filter else None
+
+def _is_named_member(name: str, member: str) -> bool:
+    return name == member or os.path.basename(name) == member
+
+@contextmanager
+def open_data_stream(source: BinaryIO, name: str, member: Optional[str] = None) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Yield (member_name, stream) with the decompressed contents of `source`.
+    Decompression is incremental; nothing is inflated into memory up front.
+    Non-archive sources are passed through unchanged.
+    """
+    head = source.read(4)
+    source.seek(0)
+    kind = detect_compression(name, head)
+
+    if kind == 'zip':
+        with zipfile.ZipFile(source) as archive:
+            selected = select_member(archive.namelist(), member)
+            if selected is None:
+                raise ValueError(f"No matching data file in zip archive {name}")
+            logger.info(f"Reading {selected} from zip archive {name}")
+            with archive.open(selected) as stream:
+                yield selected, stream
+
+    elif kind == 'tar.gz':
+        # Stream mode: members are visited in order without random access. A named member
+        # that turns out to be missing costs a second pass for the first data file instead.
+        named = bool(member) and not member.startswith('.')
+        names = []
+        for wanted in ([member, None] if named else [member]):
+            source.seek(0)
+            with tarfile.open(fileobj=source, mode='r|gz') as archive:
+                names = []
+                for info in archive:
+                    if not info.isfile():
+                        continue
+                    names.append(info.name)
+                    if _is_tar_match(info.name, wanted):
+                        logger.info(f"Reading {info.name} from tar archive {name}")
+                        with archive.extractfile(info) as stream:
+                            yield info.name, io.BufferedReader(_ForwardOnlyStream(stream))
+                        return
+            if wanted:
+                logger.info(f"{wanted} not found in tar archive {name}, using the first data file")
+        raise ValueError(f"No matching data file in tar archive {name} (members: {names[:10]})")
+
+    elif kind == 'gzip':
+        inner = os.path.basename(name)[:-3] if name.lower().endswith('.gz') else os.path.basename(name)
+        with gzip.GzipFile(fileobj=source) as stream:
+            yield inner, stream
+
+    else:
+        yield os.path.basename(name), source
+
+class _ForwardOnlyStream(io.RawIOBase):
+    """Tar stream members report seekability they don't have; hide it from text wrappers"""
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+def _is_tar_match(name: str, member: Optional[str]) -> bool:
+    if member and not member.startswith('.'):
+        return _is_named_member(name, member)
+    # Tar streams can't be rewound, so without an explicit member take the first data file
+    return select_member([name], member) == name and (bool(member) or name.lower().endswith(tuple(FORMAT_EXTENSIONS)))
+
+def member_format(member_name: str) -> str:
+    """Reader format for a decompressed member, defaulting to CSV"""
+    return detect_format(member_name) or 'csv'
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark for sandboxed code execution: warm pool jobs vs a fresh interpreter per job
+Usage: python benchmark_code_sandbox.py [jobs]
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+from code_sandbox import CodeSandbox, share_body
+from download_spooler import SpooledBody
+
+async def main():
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rows = "\n".join(f"{i},{i % 7},{i * 0.5}" for i in range(50_000))
+    body = SpooledBody('memory://data.csv', 'text/csv', data=f"id,group,value\n{rows}\n".encode())
+
+    start = time.perf_counter()
+    for _ in range(3):
+        subprocess.run([sys.executable, '-c', 'import pandas, numpy'], check=True)
+    cold = (time.perf_counter() - start) / 3
+
+    sandbox = CodeSandbox(workers=2, max_jobs_per_worker=50)
+    start = time.perf_counter()
+    await sandbox.start()
+    startup = time.perf_counter() - start
+
+    with share_body(body, 'data.csv', 'bench') as handle:
+        start = time.perf_counter()
+        await sandbox.run("1 + 1")
+        trivial_first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(jobs):
+            await sandbox.run("1 + 1")
+        trivial = (time.perf_counter() - start) / jobs
+
+        start = time.perf_counter()
+        for _ in range(jobs):
+            result = await sandbox.run("df.groupby('group')['value'].sum().max()", {'df': handle})
+        analysis = (time.perf_counter() - start) / jobs
+
+    print("=" * 60)
+    print(f"{'scenario':<40} {'ms':>10}")
+    print(f"{'fresh interpreter + pandas import':<40} {cold * 1000:>10.1f}")
+    print(f"{'pool start (forkserver + workers)':<40} {startup * 1000:>10.1f}")
+    print(f"{'first job':<40} {trivial_first * 1000:>10.1f}")
+    print(f"{'trivial job (mean)':<40} {trivial * 1000:>10.2f}")
+    print(f"{'50k-row groupby job (mean)':<40} {analysis * 1000:>10.2f}")
+    print("=" * 60)
+    print(f"Answer: {result.get('answer')}, sandbox stats: {sandbox.stats()}")
+    await sandbox.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark for parallel chunked CSV aggregation
+Usage: python benchmark_csv_parallel.py [size_mb]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from csv_aggregator import ParallelCSVAggregator
+
+def generate_csv(path: str, size_mb: int):
+    rng = random.Random(42)
+    target = size_mb * 1024 * 1024
+    with open(path, 'w') as f:
+        f.write("id,category,value,amount\n")
+        row_id = 0
+        while f.tell() < target:
+            lines = []
+            for _ in range(10000):
+                row_id += 1
+                lines.append(f"{row_id},cat{rng.randint(1, 20)},{rng.randint(-1000, 1000)},{rng.random() * 100:.3f}\n")
+            f.write(''.join(lines))
+
+async def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    cpu_count = os.cpu_count() or 1
+
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        print(f"Generating {size_mb} MB CSV...")
+        generate_csv(path, size_mb)
+
+        worker_counts = sorted({1, 2, 4, 8, 16, cpu_count} & set(range(1, cpu_count + 1)))
+        aggregator = ParallelCSVAggregator(max_chunk_bytes=16 * 1024 * 1024)
+
+        for label, group_by, column_stats in [("totals only", None, False), ("group-by category", 'category', True)]:
+            baseline = None
+            print("=" * 60)
+            print(f"Mode: {label}")
+            print(f"{'workers':>8} {'seconds':>10} {'MB/s':>10} {'speedup':>10} {'efficiency':>11}")
+            for workers in worker_counts:
+                start = time.perf_counter()
+                result = await aggregator.aggregate_file(path, group_by=group_by, workers=workers,
+                                                         column_stats=column_stats)
+                elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed
+                speedup = baseline / elapsed
+                print(f"{workers:>8} {elapsed:>10.2f} {size_mb / elapsed:>10.1f} {speedup:>10.2f} {speedup / workers:>10.0%}")
+
+        print("=" * 60)
+        print(f"Rows: {result['rows']}, total sum: {result['total_sum']:.3f}, groups: {len(result['group_counts'])}")
+        aggregator.close()
+    finally:
+        os.unlink(path)
+
+if __name__ == "__main__":
+    asyncio.run(main())
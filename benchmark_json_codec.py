@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark for response serialization: a realistic /quiz-chain result (every
+hop carrying its page text and instructions) encoded through FastAPI's default
+path vs pydantic's JSON dump vs json_codec's encoders
+Usage: python benchmark_json_codec.py [hops] [page_kb]
+"""
+
+import random
+import sys
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from json_codec import ENCODERS
+from main import QuizChainResponse
+
+WORDS = ('revenue sales region quarter total average download the file sum values column '
+         'submit answer secret code table row filter where greater than café naïve').split()
+
+def page_text(size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = random.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+def chain_result(hops: int, page_kb: int) -> dict:
+    chain = []
+    for hop in range(hops):
+        url = f'https://quiz.example.com/q{hop}'
+        chain.append({
+            'url': url,
+            'success': True,
+            'error': None,
+            'instructions': {
+                'question': f'Q{hop}. What is the sum of the "value" column where region is north?',
+                'data_source': f'https://quiz.example.com/data{hop}.csv',
+                'task_type': 'sum',
+                'submit_url': 'https://quiz.example.com/submit',
+                'answer_format': 'number',
+                'extracted_content': page_text(page_kb * 1024),
+                'secret_code_pattern': None
+            },
+            'answer': random.randint(0, 10 ** 6),
+            'correct': hop % 3 != 0,
+            'next_url': f'https://quiz.example.com/q{hop + 1}' if hop + 1 < hops else None,
+            'submission_result': {'status': 'submitted', 'correct': hop % 3 != 0, 'reason': None,
+                                  'next_url': None, 'response': {'correct': hop % 3 != 0}, 'attempts': 1}
+        })
+    return {'start_url': chain[0]['url'], 'completed': True, 'total_questions': hops,
+            'correct_answers': sum(hop['correct'] for hop in chain), 'chain': chain}
+
+def fastapi_default(result: dict) -> bytes:
+    # What the endpoint did before: validate into the response model, jsonable_encoder, json.dumps
+    model = QuizChainResponse(status='success', message='done', chain_result=result)
+    return JSONResponse(jsonable_encoder(model)).body
+
+def pydantic_dump(result: dict) -> bytes:
+    return QuizChainResponse(status='success', message='done', chain_result=result).model_dump_json().encode()
+
+def codec(name: str):
+    encode = ENCODERS[name]
+    return lambda result: encode({'status': 'success', 'message': 'done', 'chain_result': result})
+
+def timed(function, result: dict, repeat: int):
+    body = function(result)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(result)
+    return (time.perf_counter() - start) / repeat, len(body)
+
+def main():
+    hops = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    page_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    random.seed(7)
+    result = chain_result(hops, page_kb)
+    repeat = 20
+
+    rows = [('FastAPI default', timed(fastapi_default, result, repeat)),
+            ('pydantic dump_json', timed(pydantic_dump, result, repeat))]
+    rows += [(f'json_codec[{name}]', timed(codec(name), result, repeat)) for name in ENCODERS]
+
+    baseline = rows[0][1][0]
+    print("=" * 64)
+    print(f"{hops}-hop chain result, ~{page_kb}KB of page text per hop, {repeat} runs")
+    print(f"{'encoder':<22} {'ms':>9} {'KB':>9} {'speedup':>9}")
+    for name, (seconds, size) in rows:
+        print(f"{name:<22} {seconds * 1000:>9.2f} {size / 1024:>9.1f} {baseline / seconds:>8.1f}x")
+    print("=" * 64)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the LLM client against the local stub server
+Usage: python benchmark_llm_client.py [prompts] [latency_seconds]
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+from llm_client import LLMClient
+
+PORT = 8011
+
+async def wait_for_server(url: str):
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("Stub server did not start")
+
+def prompt(i: int):
+    return [{'role': 'user', 'content': f"Question:\nWhat is {i} + {i * 3}?"}]
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency = sys.argv[2] if len(sys.argv) > 2 else '0.2'
+
+    env = dict(os.environ, LLM_STUB_LATENCY=latency)
+    server = subprocess.Popen([sys.executable, 'llm_stub_server.py', str(PORT)], env=env)
+    try:
+        api_url = f"http://127.0.0.1:{PORT}/v1"
+        await wait_for_server(f"http://127.0.0.1:{PORT}/stats")
+
+        print("=" * 60)
+        print(f"Prompts: {count}, stub latency: {latency}s")
+        print(f"{'scenario':<36} {'seconds':>9} {'requests':>9}")
+
+        for concurrency in (1, 4, 16):
+            client = LLMClient(api_url=api_url, max_concurrency=concurrency)
+            start = time.perf_counter()
+            await client.complete_batch([prompt(i) for i in range(count)])
+            print(f"{f'distinct, concurrency {concurrency}':<36} {time.perf_counter() - start:>9.2f} {client.requests:>9}")
+
+            if concurrency == 16:
+                start = time.perf_counter()
+                await client.complete_batch([prompt(i) for i in range(count)])
+                print(f"{'repeat (cache)':<36} {time.perf_counter() - start:>9.3f} {client.requests - count:>9}")
+            await client.close()
+
+        client = LLMClient(api_url=api_url, max_concurrency=16)
+        start = time.perf_counter()
+        await client.complete_batch([prompt(0)] * count)
+        print(f"{'identical, concurrent (coalesced)':<36} {time.perf_counter() - start:>9.2f} {client.requests:>9}")
+
+        start = time.perf_counter()
+        first = None
+        async for _ in client.stream(prompt(count + 1)):
+            first = first or time.perf_counter() - start
+        total = time.perf_counter() - start
+        print(f"{'streamed: first token / total':<36} {f'{first:.2f}/{total:.2f}':>9} {1:>9}")
+        await client.close()
+
+        print("=" * 60)
+        print(f"Client stats: {client.stats()}")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the parse scheduler: event-loop latency while quiz pages of mixed
+sizes are parsed inline on the loop vs through the size-aware scheduler
+Usage: python benchmark_parse_scheduler.py [rounds]
+"""
+
+import asyncio
+import gc
+import statistics
+import sys
+import time
+from parse_scheduler import ParseScheduler, parse_instructions
+
+def quiz_page(rows: int) -> str:
+    table = ''.join(f'<tr><td>{i}</td><td>item {i}</td><td>{i * 3 % 97}</td></tr>' for i in range(rows))
+    return (f'<html><body><h1>Quiz</h1><p>Q1. Download <a href="/data.csv">the file</a> and submit the sum '
+            f'of the value column to /submit. Secret code: ab12cd34</p><table>{table}</table></body></html>')
+
+PAGES = [quiz_page(20)] * 12 + [quiz_page(2_000)] * 3 + [quiz_page(60_000)]
+
+async def ticker(lags, stop, interval=0.005):
+    """How late a 5 ms sleep wakes up: the time other work held the loop"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+async def run(parse, rounds: int):
+    # Soups are reference cycles; don't let one mode's garbage land in the next mode's numbers
+    gc.collect()
+    lags = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*[parse(page) for page in PAGES])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    lags.sort()
+    return elapsed, statistics.median(lags), lags[int(len(lags) * 0.99)], lags[-1]
+
+async def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    sizes = sorted({len(page) for page in PAGES})
+    scheduler = ParseScheduler()
+
+    async def inline(html):
+        return parse_instructions(html)
+
+    # Warm the process pool so the first large page doesn't pay worker startup
+    await scheduler.parse_instructions(PAGES[-1])
+
+    rows = [('inline on the loop', await run(inline, rounds)),
+            ('size-aware scheduler', await run(scheduler.parse_instructions, rounds))]
+    scheduler.close()
+
+    print("=" * 72)
+    print(f"{len(PAGES)} pages per round ({', '.join(f'{size // 1024}KB' for size in sizes)}), {rounds} rounds")
+    print(f"{'mode':<24} {'total s':>9} {'lag p50 ms':>12} {'lag p99 ms':>12} {'lag max ms':>12}")
+    for name, (elapsed, p50, p99, worst) in rows:
+        print(f"{name:<24} {elapsed:>9.2f} {p50 * 1000:>12.2f} {p99 * 1000:>12.2f} {worst * 1000:>12.2f}")
+    print("=" * 72)
+    print(f"Scheduler: {scheduler.stats()}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark for render decisions: Chrome launches under the old string-match rules
+vs the render-decision engine, cold and after it has learned from past renders
+Usage: python benchmark_render_decisions.py [corpus_dir]
+
+corpus_dir holds *.html pages and a labels.json mapping each file name to
+{"url": ..., "needs_render": true/false}; without it a synthetic corpus is used.
+"""
+
+import json
+import os
+import sys
+import time
+from bs4 import BeautifulSoup
+from render_decision import RenderDecisionEngine
+
+STATIC_QUIZ = """<html><body><h1>Quiz {n}</h1>
+<p>Q{n}. Download the file at <a href="/data/{n}.csv">/data/{n}.csv</a> and answer the question:
+what is the sum of the value column? Submit your answer to /submit as JSON.</p>
+<script>document.querySelector('h1').addEventListener('click', () => console.log('clicked'));</script>
+</body></html>"""
+
+JS_QUIZ = """<html><body><div id="result"></div>
+<script>document.querySelector('#result').innerHTML = atob('{payload}');</script>
+</body></html>"""
+
+THEME_TOGGLE = """<html><body><nav><button id="theme">Theme</button></nav>
+<article><p>Scrape page {n}: the secret code is listed below. Submit the secret code with your email.</p>
+<p>Secret code: {code}</p></article>
+<script>document.querySelector('#theme').onclick = () => {{ document.body.innerHTML += ''; }};</script>
+</body></html>"""
+
+SPA_ROOT = """<html><head><script src="/static/app.{n}.js"></script></head>
+<body><noscript>You need to enable JavaScript to run this app.</noscript><div id="root"></div></body></html>"""
+
+PLAIN = """<html><body><h2>Report {n}</h2><p>Table of values for region {n}. Answer the question about
+the total and submit it to the endpoint given on the page.</p><table><tr><td>{n}</td></tr></table></body></html>"""
+
+FETCHED = """<html><body><h3>Loading</h3><p id="q"></p>
+<script>fetch('/api/question/{n}').then(r => r.json()).then(d => {{ document.getElementById('q').textContent = d.text; }});</script>
+</body></html>"""
+
+# Scores as needing a render (short text, DOM writes of parsed JSON) but the widget never touches the task text
+CHART_WIDGET = """<html><body><h4>Stats {n}</h4><p>Count the rows in /files/{n}.csv.</p><canvas id="c"></canvas>
+<script>const cfg = JSON.parse('{{"bars": [{n}]}}'); document.getElementById('legend').innerHTML = cfg.bars.join(',');</script>
+</body></html>"""
+
+def synthetic_corpus(per_template: int = 20):
+    """(url, static html, rendered html, needs_render) for several templates on a few hosts"""
+    pages = []
+    for n in range(per_template):
+        payload = f"U2VjcmV0IGNvZGUgaXMgNDI{n}"
+        pages.append((f"https://quiz.example.com/quiz-{n}", STATIC_QUIZ.format(n=n), None, False))
+        pages.append((f"https://quiz.example.com/js-quiz-{n}", JS_QUIZ.format(payload=payload), None, True))
+        pages.append((f"https://data.example.com/scrape/{n}", THEME_TOGGLE.format(n=n, code=1000 + n), None, False))
+        pages.append((f"https://app.example.com/task/{n}", SPA_ROOT.format(n=n), None, True))
+        pages.append((f"https://data.example.com/report/{n}", PLAIN.format(n=n), None, False))
+        pages.append((f"https://api.example.com/q/{n}", FETCHED.format(n=n), None, True))
+        pages.append((f"https://quiz.example.com/stats/{n}", CHART_WIDGET.format(n=n), None, False))
+    return [(url, html, rendered or _rendered(html, needs), needs) for url, html, rendered, needs in pages]
+
+def _rendered(html: str, needs_render: bool) -> str:
+    # Stand-in for the browser: content appears only where rendering actually matters
+    return html.replace('</body>', '<p>Rendered content: secret 4242</p></body>') if needs_render else html
+
+def load_corpus(directory: str):
+    with open(os.path.join(directory, 'labels.json')) as f:
+        labels = json.load(f)
+    pages = []
+    for name, label in labels.items():
+        with open(os.path.join(directory, name), encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        rendered = label.get('rendered')
+        if rendered:
+            with open(os.path.join(directory, rendered), encoding='utf-8', errors='replace') as f:
+                rendered = f.read()
+        needs = bool(label['needs_render'])
+        pages.append((label['url'], html, rendered or _rendered(html, needs), needs))
+    return pages
+
+def legacy_scraper_rule(html: str) -> bool:
+    """The check web_scraper.scrape_page used before the engine"""
+    soup = BeautifulSoup(html, 'html.parser')
+    text = soup.get_text().strip()
+    definitely = False
+    if not (len(text) > 50 and any(k in text.lower() for k in ['scrape', 'secret', 'code', 'submit'])):
+        definitely = len(text) < 20 and any('document.querySelector' in str(s) for s in soup.find_all('script'))
+    return definitely or "document.querySelector" in html or "innerHTML" in html or "atob(" in html
+
+def legacy_data_processor_rule(html: str) -> bool:
+    """The check DataProcessor._scrape_with_js_detection used before the engine"""
+    soup = BeautifulSoup(html, 'html.parser')
+    scripts = [str(script) for script in soup.find_all('script')]
+    return any([
+        len(soup.get_text().strip()) < 20,
+        any('document.querySelector' in script for script in scripts),
+        any('innerHTML' in script for script in scripts),
+        any('atob' in script for script in scripts),
+    ])
+
+def score(decisions, pages):
+    renders = sum(decisions)
+    unnecessary = sum(1 for rendered, page in zip(decisions, pages) if rendered and not page[3])
+    missed = sum(1 for rendered, page in zip(decisions, pages) if not rendered and page[3])
+    return renders, unnecessary, missed
+
+def run_engine(engine: RenderDecisionEngine, pages):
+    """Decide for each page the way the scraper does, recording every render's outcome"""
+    decisions = []
+    for url, html, rendered, _ in pages:
+        if engine.known_render(url):
+            decisions.append(True)
+            continue
+        needs, _ = engine.should_render(url, html)
+        if needs:
+            engine.record(url, html, rendered)
+        decisions.append(needs)
+    return decisions
+
+def main():
+    pages = load_corpus(sys.argv[1]) if len(sys.argv) > 1 else synthetic_corpus()
+    needed = sum(1 for page in pages if page[3])
+
+    rows = []
+    start = time.perf_counter()
+    rows.append(('legacy scraper rule', score([legacy_scraper_rule(p[1]) for p in pages], pages),
+                 time.perf_counter() - start))
+    start = time.perf_counter()
+    rows.append(('legacy data_processor rule', score([legacy_data_processor_rule(p[1]) for p in pages], pages),
+                 time.perf_counter() - start))
+
+    engine = RenderDecisionEngine()
+    start = time.perf_counter()
+    rows.append(('engine, first pass', score(run_engine(engine, pages), pages), time.perf_counter() - start))
+    start = time.perf_counter()
+    rows.append(('engine, second pass (learned)', score(run_engine(engine, pages), pages), time.perf_counter() - start))
+
+    print("=" * 78)
+    print(f"{len(pages)} pages, {needed} need rendering")
+    print(f"{'rule':<32} {'renders':>9} {'unneeded':>9} {'missed':>8} {'decide ms':>10}")
+    for name, (renders, unnecessary, missed), elapsed in rows:
+        print(f"{name:<32} {renders:>9} {unnecessary:>9} {missed:>8} {elapsed * 1000:>10.1f}")
+    print("=" * 78)
+    print(f"Engine stats: {engine.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the light render profile: render time and bytes served for a
+resource-heavy page under a plain headless Chrome vs the light profile
+Usage: python benchmark_render_profile.py [renders]
+"""
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium import webdriver
+from render_profile import chrome_options, apply_profile
+
+IMAGES = 20
+PAGE = ("<html><head>" + "".join(f'<link rel="stylesheet" href="/static/style{i}.css?v=3">' for i in range(3)) +
+        "<style>@font-face { font-family: f; src: url('/static/font.woff2'); } body { font-family: f; }</style>"
+        "</head><body><div id='q'></div>" +
+        "".join(f'<img src="/img/{i}.jpg">' for i in range(IMAGES)) +
+        "<script>document.getElementById('q').innerHTML = atob('U2VjcmV0IGNvZGUgaXMgNDI=');</script></body></html>")
+ASSET_SIZES = {'.jpg': 150_000, '.css': 40_000, '.woff2': 80_000}
+
+class Handler(BaseHTTPRequestHandler):
+    served = 0
+    requests = 0
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        size = next((size for suffix, size in ASSET_SIZES.items() if path.endswith(suffix)), None)
+        body = PAGE.encode() if size is None else b'x' * size
+        Handler.served += len(body)
+        Handler.requests += 1
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def run(url: str, light: bool, renders: int):
+    Handler.served = Handler.requests = 0
+    times = []
+    for _ in range(renders):
+        # A fresh browser per render, as the scraper does, so nothing comes from Chrome's cache
+        driver = webdriver.Chrome(options=chrome_options(light=light))
+        try:
+            if light:
+                apply_profile(driver, url)
+            start = time.perf_counter()
+            driver.get(url)
+            html = driver.page_source
+            times.append(time.perf_counter() - start)
+            assert 'Secret code is 42' in html
+        finally:
+            driver.quit()
+    return sum(times) / renders, Handler.served / renders, Handler.requests / renders
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/quiz"
+
+    try:
+        rows = [('full profile', run(url, False, renders)), ('light profile', run(url, True, renders))]
+    except Exception as e:
+        print(f"Chrome is not available here: {e}")
+        return
+    finally:
+        server.shutdown()
+
+    print("=" * 64)
+    print(f"{'profile':<20} {'render ms':>12} {'KB served':>14} {'requests':>12}")
+    for name, (elapsed, served, requests) in rows:
+        print(f"{name:<20} {elapsed * 1000:>12.1f} {served / 1024:>14.1f} {requests:>12.1f}")
+    print("=" * 64)
+
+if __name__ == "__main__":
+    main()
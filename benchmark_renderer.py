@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark for render throughput: concurrent renders through each renderer backend
+Usage: python benchmark_renderer.py [renders] [concurrency]
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from benchmark_render_profile import Handler
+from renderer import Renderer, async_playwright
+
+async def run(backend: str, url: str, renders: int, concurrency: int):
+    if backend == 'playwright' and async_playwright is None:
+        raise RuntimeError("playwright is not installed")
+    renderer = Renderer(backend=backend, max_contexts=concurrency)
+    try:
+        await renderer.render(url, settle=0.0)
+        if renderer.stats()['backend'] != backend:
+            raise RuntimeError(f"fell back to {renderer.stats()['backend']}")
+        start = time.perf_counter()
+        pages = await asyncio.gather(*[renderer.render(url, settle=0.0) for _ in range(renders)])
+        elapsed = time.perf_counter() - start
+        assert all('Secret code is 42' in page for page in pages)
+        return renderer.stats()['backend'], renders / elapsed
+    finally:
+        await renderer.close()
+
+async def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/quiz"
+
+    rows = []
+    try:
+        for backend in ('playwright', 'selenium'):
+            try:
+                rows.append(await run(backend, url, renders, concurrency))
+            except Exception as e:
+                print(f"{backend}: unavailable ({str(e).splitlines()[0]})")
+    finally:
+        server.shutdown()
+
+    print("=" * 60)
+    print(f"{renders} renders, {concurrency} at a time, {os.cpu_count()} cores")
+    print(f"{'backend':<20} {'renders/s':>12} {'renders/s/core':>16}")
+    for name, throughput in rows:
+        print(f"{name:<20} {throughput:>12.2f} {throughput / os.cpu_count():>16.2f}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main())
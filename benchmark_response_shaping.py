@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Benchmark for response shaping: memory a /quiz-chain result holds and bytes it
+returns in full, summary and field-selection modes, building hops the way the
+solver does (each hop's page text is fresh and shaped as soon as the hop ends)
+Usage: python benchmark_response_shaping.py [hops] [page_kb]
+"""
+
+import random
+import sys
+import tracemalloc
+from benchmark_json_codec import chain_result
+from json_codec import encode_json
+from response_shaping import ResponseShape
+
+MODES = [('full', ResponseShape('full')),
+         ('summary', ResponseShape('summary')),
+         ('fields: answer,correct', ResponseShape('fields', ['answer', 'correct']))]
+
+def run(shape: ResponseShape, hops: int, page_kb: int):
+    random.seed(7)
+    tracemalloc.start()
+    results = {'start_url': None, 'completed': True, 'total_questions': hops, 'correct_answers': 0, 'chain': []}
+    for hop in range(hops):
+        # One hop's worth of result, built fresh like _process_single_quiz does
+        quiz_result = chain_result(1, page_kb)['chain'][0]
+        results['chain'].append(shape.hop(quiz_result))
+        del quiz_result
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    body = encode_json({'status': 'success', 'message': 'done', 'chain_result': results})
+    return held, len(body)
+
+def main():
+    hops = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    page_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    print("=" * 64)
+    print(f"{hops}-hop chain, ~{page_kb}KB of page text per hop")
+    print(f"{'mode':<24} {'held KB':>12} {'response KB':>14}")
+    for name, shape in MODES:
+        held, size = run(shape, hops, page_kb)
+        print(f"{name:<24} {held / 1024:>12.1f} {size / 1024:>14.1f}")
+    print("=" * 64)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the statistics kernels
+Usage: python benchmark_stats_kernels.py [million_rows]
+"""
+
+import statistics
+import sys
+import time
+import numpy as np
+import stats_kernels
+
+def timed(function, repeat: int = 3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    rows = int(float(sys.argv[1]) * 1_000_000) if len(sys.argv) > 1 else 5_000_000
+    rng = np.random.default_rng(42)
+    x = rng.normal(50, 10, rows)
+    y = 2.5 * x + rng.normal(0, 5, rows)
+    x[rng.integers(0, rows, rows // 100)] = np.nan
+    chunk_rows = 250_000
+
+    def chunks(values):
+        return lambda: (values[i:i + chunk_rows] for i in range(0, rows, chunk_rows))
+
+    def running_std():
+        running = stats_kernels.RunningStats()
+        for chunk in chunks(x)():
+            running.update(chunk)
+        return running.std()
+
+    def running_correlation():
+        running = stats_kernels.RunningCovariance()
+        for start in range(0, rows, chunk_rows):
+            running.update(x[start:start + chunk_rows], y[start:start + chunk_rows])
+        return running.correlation()
+
+    sample = x[:200_000]
+    sample = sample[~np.isnan(sample)].tolist()
+
+    cases = [
+        ("mean", lambda: stats_kernels.mean(x)),
+        ("std", lambda: stats_kernels.std(x)),
+        ("median", lambda: stats_kernels.median(x)),
+        ("percentile 90", lambda: stats_kernels.percentile(x, 90)),
+        ("correlation", lambda: stats_kernels.correlation(x, y)),
+        ("spearman", lambda: stats_kernels.spearman(x, y)),
+        ("linregress slope", lambda: stats_kernels.linregress(x, y)['slope']),
+        ("streaming std (Welford)", running_std),
+        ("streaming correlation", running_correlation),
+        ("streaming percentile 90", lambda: stats_kernels.streaming_quantile(chunks(x), 90)),
+        ("statistics.stdev (200k rows)", lambda: statistics.stdev(sample)),
+    ]
+
+    print("=" * 64)
+    print(f"Rows: {rows:,} (1% NaN), chunk size for streaming kernels: {chunk_rows:,}")
+    print(f"{'kernel':<30} {'seconds':>10} {'Mrows/s':>10} {'result':>12}")
+    for label, function in cases:
+        elapsed, result = timed(function)
+        size = 200_000 if label.startswith("statistics.") else rows
+        print(f"{label:<30} {elapsed:>10.4f} {size / elapsed / 1e6:>10.1f} {result:>12.5f}")
+    print("=" * 64)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark for answer submission memory: peak allocation while submitting a
+large base64 file answer the old way (indented json.dumps for the log plus
+httpx's json= encoding) vs the single-serialization path in AnswerSubmitter
+Usage: python benchmark_submission_memory.py [answer_mb]
+"""
+
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+import tracemalloc
+import logging
+import httpx
+import json_codec
+from answer_submitter import AnswerSubmitter
+from json_codec import encode_json
+
+logger = logging.getLogger('benchmark')
+
+def handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={'correct': True, 'url': None})
+
+class DrainingTransport(httpx.AsyncBaseTransport):
+    """Reads the request body like a socket write would, then answers"""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        received = 0
+        async for chunk in request.stream:
+            received += len(chunk)
+        assert received == int(request.headers['content-length'])
+        return handler(request)
+
+async def legacy_submit(client: httpx.AsyncClient, payload):
+    logger.info(f"Payload: {json.dumps(payload, indent=2)}")
+    response = await client.post('http://quiz.test/submit', json=payload,
+                                 headers={"Content-Type": "application/json"})
+    return response.json()
+
+async def measure(submit):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    await submit()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed, peak
+
+async def main():
+    answer_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    answer = 'data:application/octet-stream;base64,' + \
+        base64.b64encode(os.urandom(int(answer_mb * 1024 * 1024 * 3 / 4))).decode()
+    payload = {'email': 'bench@example.com', 'secret': 's', 'url': 'http://quiz.test/q1', 'answer': answer}
+
+    legacy_client = httpx.AsyncClient(transport=DrainingTransport())
+    submitter = AnswerSubmitter(dedup_ttl=0)
+    await submitter.client.aclose()
+    submitter.client = httpx.AsyncClient(transport=DrainingTransport())
+
+    rows = [
+        ('json.dumps + json=', await measure(lambda: legacy_submit(legacy_client, payload))),
+        ('encode once + stream', await measure(lambda: submitter.submit_answer(
+            'http://quiz.test/submit', payload['email'], payload['secret'], payload['url'], answer)))
+    ]
+    await legacy_client.aclose()
+    await submitter.close()
+
+    body_mb = len(encode_json(payload)) / 1024 / 1024
+    print("=" * 64)
+    print(f"Encoder: {json_codec.encoder_name}")
+    print(f"Answer {len(answer) / 1024 / 1024:.1f}MB, request body {body_mb:.1f}MB")
+    print(f"{'path':<24} {'seconds':>9} {'peak MB':>10} {'copies':>8}")
+    for name, (elapsed, peak) in rows:
+        print(f"{name:<24} {elapsed:>9.3f} {peak / 1024 / 1024:>10.1f} {peak / 1024 / 1024 / body_mb:>8.1f}")
+    print("=" * 64)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,279 @@
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Added to every browser we launch so a sweep can tell our browsers from anyone else's
+BROWSER_MARKER = '--quiz-solver-browser'
+BROWSER_NAMES = ('chrome', 'chromium', 'chromedriver', 'headless_shell')
+
+def process_table() -> Dict[int, Dict[str, Any]]:
+    """{pid: {'ppid', 'state', 'name', 'cmdline'}} read from /proc; empty where /proc is unavailable"""
+    table = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return table
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                stat = f.read().decode('utf-8', errors='replace')
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                cmdline = f.read().replace(b'\0', b' ').decode('utf-8', errors='replace')
+        except OSError:
+            # Exited between listdir and open
+            continue
+        name = stat[stat.index('(') + 1:stat.rindex(')')]
+        fields = stat[stat.rindex(')') + 2:].split()
+        table[int(entry)] = {'ppid': int(fields[1]), 'state': fields[0], 'name': name, 'cmdline': cmdline}
+    return table
+
+def descendants(table: Dict[int, Dict[str, Any]], roots: Iterable[int]) -> Set[int]:
+    """`roots` and every process below them"""
+    children = {}
+    for pid, info in table.items():
+        children.setdefault(info['ppid'], []).append(pid)
+    found = set()
+    stack = [pid for pid in roots if pid in table]
+    while stack:
+        pid = stack.pop()
+        if pid not in found:
+            found.add(pid)
+            stack.extend(children.get(pid, []))
+    return found
+
+def is_browser(info: Dict[str, Any]) -> bool:
+    name = info['name'].lower()
+    return BROWSER_MARKER in info['cmdline'] or any(browser in name for browser in BROWSER_NAMES)
+
+def _tree_top(table: Dict[int, Dict[str, Any]], pid: int) -> int:
+    """Highest browser process above `pid` (e.g. the chromedriver that launched a Chrome)"""
+    while table.get(table[pid]['ppid']) is not None and is_browser(table[table[pid]['ppid']]):
+        pid = table[pid]['ppid']
+    return pid
+
+class BrowserSupervisor:
+    """
+    Tracks every browser process tree we start (chromedriver + Chrome, or a
+    Playwright Chromium) as a session. Sessions can carry a hard deadline after
+    which the whole tree is SIGKILLed; quitting a driver is bounded by
+    `quit_timeout`. A periodic sweep (and one at startup) kills marked browser
+    trees no live session owns and reaps browser zombies left as our children.
+    """
+
+    def __init__(self, reap_interval: float = 30.0, quit_timeout: float = 5.0):
+        self.reap_interval = reap_interval
+        self.quit_timeout = quit_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._launching = 0
+        self._task = None
+        self.started = 0
+        self.hard_kills = 0
+        self.quit_timeouts = 0
+        self.leaked = 0
+        self.reaped = 0
+        self.zombies_collected = 0
+
+    def register(self, pids: Iterable[int], deadline: Optional[float] = None, label: str = '') -> int:
+        """Start supervising the process trees rooted at `pids`; kill them after `deadline` seconds"""
+        with self._lock:
+            self._next_id += 1
+            session_id = self._next_id
+            timer = None
+            if deadline is not None:
+                timer = threading.Timer(deadline, self._expire, (session_id,))
+                timer.daemon = True
+                timer.start()
+            self._sessions[session_id] = {'roots': set(pids), 'label': label, 'timer': timer,
+                                          'started': time.monotonic()}
+            self.started += 1
+        return session_id
+
+    @contextlib.contextmanager
+    def launching(self):
+        """
+        Hold around launching a browser and registering it: until the launch is
+        registered its processes belong to no session, and reap() must not take
+        them for leaks
+        """
+        with self._lock:
+            self._launching += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._launching -= 1
+
+    def track_driver(self, driver, deadline: Optional[float] = None, label: str = '') -> int:
+        """Supervise a Selenium driver's chromedriver and the Chrome it launched"""
+        process = getattr(getattr(driver, 'service', None), 'process', None)
+        return self.register([process.pid] if process else [], deadline, label)
+
+    def track_new_browser(self, label: str = '') -> int:
+        """Supervise marked browsers below this process that no session owns yet (e.g. just launched by Playwright)"""
+        table = process_table()
+        unowned = descendants(table, [os.getpid()]) - self._owned(table)
+        return self.register({_tree_top(table, pid) for pid in unowned if BROWSER_MARKER in table[pid]['cmdline']},
+                             None, label)
+
+    def unregister(self, session_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None and session['timer'] is not None:
+            session['timer'].cancel()
+        return session
+
+    def _expire(self, session_id: int):
+        session = self.unregister(session_id)
+        if session is not None:
+            self.hard_kills += 1
+            killed = self._kill_tree(session['roots'])
+            logger.warning(f"Browser session {session['label'] or session_id} passed its deadline, killed {killed} processes")
+
+    def _kill_tree(self, roots: Iterable[int], table: Optional[Dict[int, Dict[str, Any]]] = None) -> int:
+        table = process_table() if table is None else table
+        killed = 0
+        for pid in descendants(table, roots):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                killed += 1
+            except (ProcessLookupError, PermissionError):
+                pass
+        self.reaped += killed
+        # Roots we started directly stay zombies until waited for
+        self._collect_zombies(roots, wait=1.0 if killed else 0.0)
+        return killed
+
+    def _collect_zombies(self, pids: Iterable[int], wait: float = 0.0):
+        pending = set(pids)
+        deadline = time.monotonic() + wait
+        while pending:
+            for pid in list(pending):
+                try:
+                    if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                        self.zombies_collected += 1
+                        pending.discard(pid)
+                except ChildProcessError:
+                    # Not our child (its parent waits for it) or already collected
+                    pending.discard(pid)
+            if not pending or time.monotonic() >= deadline:
+                break
+            time.sleep(0.02)
+
+    def quit_driver(self, session_id: int, driver):
+        """driver.quit() bounded by quit_timeout; a hung quit gets the process tree killed instead"""
+        session = self.unregister(session_id)
+        quitter = threading.Thread(target=driver.quit, daemon=True)
+        quitter.start()
+        quitter.join(self.quit_timeout)
+        if session is None:
+            # The deadline already killed it
+            return
+        if quitter.is_alive():
+            self.quit_timeouts += 1
+            logger.warning(f"driver.quit() hung for {self.quit_timeout}s, killing the browser")
+        # chromedriver is gone after a clean quit; anything left under it is killed either way
+        self._kill_tree(session['roots'])
+
+    async def close_browser(self, session_id: int, close):
+        """Await `close()` (e.g. Browser.close) for up to quit_timeout, then kill whatever is left"""
+        session = self.unregister(session_id)
+        try:
+            await asyncio.wait_for(close(), self.quit_timeout)
+        except asyncio.TimeoutError:
+            self.quit_timeouts += 1
+            logger.warning(f"Browser close hung for {self.quit_timeout}s, killing the browser")
+        finally:
+            if session is not None:
+                await asyncio.to_thread(self._kill_tree, session['roots'])
+
+    def _owned(self, table: Dict[int, Dict[str, Any]]) -> Set[int]:
+        with self._lock:
+            roots = [pid for session in self._sessions.values() for pid in session['roots']]
+        return descendants(table, roots)
+
+    def reap(self) -> int:
+        """
+        Kill leaked browsers and reap browser zombies. A marked browser is leaked
+        when no session owns it and it either runs below this process or was
+        orphaned (re-parented to init) by an earlier crash; browsers under another
+        live process are left to that process.
+        """
+        table = process_table()
+        # Read after the snapshot: a launch that ended since then has registered, so _owned() sees it
+        with self._lock:
+            launching = self._launching > 0
+        owned = self._owned(table)
+        mine = descendants(table, [os.getpid()])
+
+        leaked_roots = set()
+        for pid, info in table.items():
+            if pid in owned or info['state'] == 'Z':
+                continue
+            # Unmarked chromedrivers only count when they are ours
+            if BROWSER_MARKER not in info['cmdline'] and not (pid in mine and is_browser(info)):
+                continue
+            top = _tree_top(table, pid)
+            if top in owned or (launching and top in mine):
+                continue
+            if top in mine or table[top]['ppid'] <= 1 or table[top]['ppid'] not in table:
+                leaked_roots.add(top)
+
+        killed = 0
+        if leaked_roots:
+            self.leaked += len(leaked_roots)
+            killed = self._kill_tree(leaked_roots, table)
+            logger.warning(f"Killed {killed} leaked browser processes ({len(leaked_roots)} browser trees)")
+
+        # Zombie chromedrivers/browsers we launched directly and nobody waited for
+        self._collect_zombies([pid for pid in mine if table[pid]['state'] == 'Z' and is_browser(table[pid])
+                             and table[pid]['ppid'] == os.getpid()])
+        return killed
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await asyncio.to_thread(self.reap)
+            except Exception as e:
+                logger.error(f"Browser reaper failed: {str(e)}")
+
+    async def start(self):
+        """Sweep browsers left over from a previous run, then keep sweeping on a timer"""
+        await asyncio.to_thread(self.reap)
+        if self._task is None:
+            self._task = asyncio.create_task(self._reap_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.reap)
+
+    def live_processes(self) -> int:
+        table = process_table()
+        return sum(1 for pid in self._owned(table) if table[pid]['state'] != 'Z')
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'sessions': len(self._sessions),
+            'live_processes': self.live_processes(),
+            'started': self.started,
+            'leaked': self.leaked,
+            'reaped': self.reaped,
+            'zombies_collected': self.zombies_collected,
+            'hard_kills': self.hard_kills,
+            'quit_timeouts': self.quit_timeouts
+        }
+
+browser_supervisor = BrowserSupervisor()
@@ -0,0 +1,246 @@
+import ast
+import logging
+import math
+import operator
+import re
+import statistics
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow
+}
+
+UNARY_OPERATORS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos
+}
+
+FUNCTIONS = {
+    'sum': lambda *a: sum(_flatten(a)),
+    'min': lambda *a: min(_flatten(a)),
+    'max': lambda *a: max(_flatten(a)),
+    'avg': lambda *a: statistics.fmean(_flatten(a)),
+    'mean': lambda *a: statistics.fmean(_flatten(a)),
+    'median': lambda *a: statistics.median(_flatten(a)),
+    'product': lambda *a: math.prod(_flatten(a)),
+    'count': lambda *a: len(_flatten(a)),
+    'range': lambda start, stop: _inclusive_range(start, stop),
+    'abs': abs,
+    'round': round,
+    'sqrt': math.sqrt,
+    'log': math.log,
+    'exp': math.exp,
+    'floor': math.floor,
+    'ceil': math.ceil
+}
+
+CONSTANTS = {
+    'pi': math.pi,
+    'e': math.e
+}
+
+MAX_EXPONENT = 1000
+# Integer results are capped at ~1200 digits so nested powers and products can't run away
+MAX_RESULT_BITS = 4096
+MAX_RANGE = 100_000
+
+def _flatten(values) -> List[float]:
+    flat = []
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            flat.extend(_flatten(value))
+        else:
+            flat.append(value)
+    return flat
+
+def _inclusive_range(start, stop) -> List[int]:
+    """The numbers start..stop inclusive, as a question's "1-10" means"""
+    if not all(isinstance(v, int) or (isinstance(v, float) and v.is_integer()) for v in (start, stop)):
+        raise ValueError("Range bounds must be whole numbers")
+    if stop - start >= MAX_RANGE:
+        raise ValueError(f"Range of {int(stop - start) + 1} numbers too long")
+    return list(range(int(start), int(stop) + 1))
+
+def _bounded(value):
+    if isinstance(value, int) and value.bit_length() > MAX_RESULT_BITS:
+        raise ValueError(f"Result too large ({value.bit_length()} bits)")
+    return value
+
+def _safe_pow(base, exponent):
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"Exponent {exponent} too large")
+    # Size the result before computing it: (9**999)**999 is rejected without being built
+    if isinstance(base, int) and isinstance(exponent, int) and abs(base) > 1 and exponent > 0:
+        if exponent * math.log2(abs(base)) > MAX_RESULT_BITS:
+            raise ValueError(f"Result of {exponent}th power too large")
+    return operator.pow(base, exponent)
+
+def _compile_node(node: ast.AST, argument: bool = False) -> Callable[[], Any]:
+    """
+    Translate a whitelisted AST node into a closure; anything else is rejected.
+    List and tuple literals are only accepted as function arguments (`argument`),
+    so `[0] * 10**6` can't build a sequence.
+    """
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body)
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = node.value
+        return lambda: value
+
+    if isinstance(node, ast.Name) and node.id in CONSTANTS:
+        value = CONSTANTS[node.id]
+        return lambda: value
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        op = _safe_pow if isinstance(node.op, ast.Pow) else BINARY_OPERATORS[type(node.op)]
+        return lambda: _bounded(op(left(), right()))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        operand = _compile_node(node.operand)
+        op = UNARY_OPERATORS[type(node.op)]
+        return lambda: op(operand())
+
+    if isinstance(node, (ast.List, ast.Tuple)) and argument:
+        items = [_compile_node(item, argument=True) for item in node.elts]
+        return lambda: [item() for item in items]
+
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in FUNCTIONS and not node.keywords):
+        function = FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, argument=True) for arg in node.args]
+        return lambda: _bounded(function(*[arg() for arg in args]))
+
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> Callable[[], Any]:
+    """Parse and validate an arithmetic expression once; the returned closure can be re-run cheaply"""
+    if len(expression) > 500:
+        raise ValueError("Expression too long")
+    return _compile_node(ast.parse(expression, mode='eval'))
+
+def evaluate(expression: str) -> Any:
+    return compile_expression(expression)()
+
+WORD_OPERATORS = [
+    (r'\bmultiplied\s+by\b', '*'),
+    (r'\bdivided\s+by\b', '/'),
+    (r'\btimes\b', '*'),
+    (r'\bplus\b', '+'),
+    (r'\bminus\b', '-'),
+    (r'\bmod(?:ulo)?\b', '%'),
+    (r'\bto\s+the\s+power\s+of\b', '**'),
+    (r'\bsquared\b', '**2'),
+    (r'\bcubed\b', '**3'),
+    (r'(?<=[\d)\s])[×x✕](?=\s*[\d(])', '*'),
+    (r'[÷]', '/'),
+    (r'\^', '**'),
+    (r'[−–]', '-')
+]
+
+NUMBER = r'-?\d+(?:,\d{3})*(?:\.\d+)?'
+# Dates, times and dashed IDs look like arithmetic ("2024-10-15" -> 1999) but never are
+NOT_ARITHMETIC = re.compile(r'\b\d{4}-\d{1,2}-\d{1,2}\b|\b\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}\b|\b\d{1,2}:\d{2}(?::\d{2})?\b'
+                            r'|\b\d+(?:-\d+){2,}\b')
+# Only a question that asks for a calculation may have one taken from the page text
+ASKS_TO_CALCULATE = re.compile(r'\b(?:calculate|compute|evaluate)\b', re.IGNORECASE)
+ARITHMETIC_SPAN = re.compile(r'[-+*/%().\d\s]*\d[-+*/%().\d\s]*')
+AGGREGATE_PHRASE = re.compile(
+    r'\b(sum|total|average|mean|median|product|maximum|max|minimum|min|count)\s+of\s+(?:the\s+)?(?:numbers\s+)?'
+    r'((?:' + NUMBER + r')(?:\s*(?:,|and|&)\s*(?:' + NUMBER + r'))+)',
+    re.IGNORECASE
+)
+# "sum of the numbers 1-10" is a range, not 1 minus 10
+AGGREGATE_RANGE = re.compile(
+    r'\b(sum|total|average|mean|median|product|maximum|max|minimum|min|count)\s+of\s+(?:all\s+)?(?:the\s+)?'
+    r'(?:(?:whole\s+)?(?:numbers|integers)\s+)?(?:from\s+)?(-?\d+)\s*(?:-|–|to|through)\s*(-?\d+)\b',
+    re.IGNORECASE
+)
+AGGREGATE_FUNCTIONS = {
+    'sum': 'sum', 'total': 'sum', 'average': 'avg', 'mean': 'avg', 'median': 'median',
+    'product': 'product', 'maximum': 'max', 'max': 'max', 'minimum': 'min', 'min': 'min', 'count': 'count'
+}
+
+def _normalize(text: str) -> str:
+    for pattern, replacement in WORD_OPERATORS:
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    # Thousands separators inside numbers: 1,234 -> 1234
+    return re.sub(r'(?<=\d),(?=\d{3}\b)', '', text)
+
+def extract_expression(text: str) -> Optional[str]:
+    """
+    Pull a computable expression out of question text: an aggregate over a range
+    ("sum of the numbers 1-10") or a list ("average of 3, 5 and 10"), or the
+    longest arithmetic span ("(12 + 8) * 3").
+    """
+    if not text:
+        return None
+
+    match = AGGREGATE_RANGE.search(text)
+    if match and int(match.group(2)) <= int(match.group(3)):
+        return f"{AGGREGATE_FUNCTIONS[match.group(1).lower()]}(range({match.group(2)}, {match.group(3)}))"
+
+    match = AGGREGATE_PHRASE.search(text)
+    if match:
+        function = AGGREGATE_FUNCTIONS[match.group(1).lower()]
+        operands = re.findall(NUMBER, match.group(2))
+        return f"{function}({', '.join(o.replace(',', '') for o in operands)})"
+
+    normalized = _normalize(NOT_ARITHMETIC.sub(' ', text))
+    candidates = []
+    for span in ARITHMETIC_SPAN.findall(normalized):
+        # Adjacent numbers with no operator between them belong to different phrases ("Q12. 5 + 3")
+        for part in re.split(r'(?<=[\d.)])\s+(?=[\d(])', span):
+            part = part.strip().rstrip('.').strip()
+            # Needs an operator between two operands, not just a lone (possibly negative) number
+            if len(re.findall(r'\d+(?:\.\d+)?', part)) >= 2 and re.search(r'[\d)]\s*(?:\*\*|[-+*/%])\s*[-(\d]', part):
+                candidates.append(part)
+
+    for span in sorted(candidates, key=len, reverse=True):
+        try:
+            compile_expression(span)
+            return span
+        except (SyntaxError, ValueError):
+            continue
+
+    return None
+
+def _normalize_result(value: Any) -> Any:
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2 ** 53:
+        return int(value)
+    if isinstance(value, float):
+        return round(value, 10)
+    return value
+
+def solve(question: str, page_text: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Solve an arithmetic-only question locally; None when no expression can be found.
+    The page text is only searched when the question asks to calculate/compute.
+    """
+    sources = [question]
+    if page_text and ASKS_TO_CALCULATE.search(question or ''):
+        sources.append(page_text)
+    for source in sources:
+        expression = extract_expression(source)
+        if expression is None:
+            continue
+        try:
+            result = _normalize_result(evaluate(expression))
+        except (ArithmeticError, ValueError, TypeError, statistics.StatisticsError) as e:
+            logger.info(f"Could not evaluate '{expression}': {str(e)}")
+            continue
+        logger.info(f"Evaluated '{expression}' = {result}")
+        return {'expression': expression, 'answer': result}
+
+    return None
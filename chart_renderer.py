@@ -0,0 +1,181 @@
+import asyncio
+import base64
+import io
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Submission payloads must stay under 1 MB; leave room for the JSON envelope
+MAX_ANSWER_BYTES = 1_000_000 - 4096
+
+def _warm_worker():
+    """Pool initializer: import the plotting stack and render once so fonts and caches are loaded"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    figure, axes = plt.subplots(figsize=(1, 1))
+    axes.plot([0, 1], [0, 1])
+    figure.savefig(io.BytesIO(), format='png')
+    plt.close(figure)
+
+def _ping() -> int:
+    return os.getpid()
+
+def render_chart(spec: Dict[str, Any]) -> bytes:
+    """
+    Render a chart spec to PNG or SVG bytes (runs inside a warm worker).
+    spec: kind (bar/line/scatter/pie/hist), x, y (list or {series: list}),
+    title, xlabel, ylabel, format, width, height (inches), dpi.
+    """
+    import matplotlib.pyplot as plt
+
+    kind = spec.get('kind', 'bar')
+    x = spec.get('x') or []
+    series = spec.get('y') or {}
+    if not isinstance(series, dict):
+        series = {spec.get('ylabel') or 'value': series}
+
+    figure, axes = plt.subplots(figsize=(spec.get('width', 6.4), spec.get('height', 4.8)))
+    try:
+        for label, values in series.items():
+            positions = x if x else list(range(len(values)))
+            if kind == 'line':
+                axes.plot(positions, values, label=label)
+            elif kind == 'scatter':
+                axes.scatter(positions, values, label=label, s=8)
+            elif kind == 'pie':
+                axes.pie(values, labels=[str(p) for p in positions])
+                break
+            elif kind == 'hist':
+                axes.hist(values, bins=spec.get('bins', 20), label=label)
+            else:
+                axes.bar([str(p) for p in positions], values, label=label)
+
+        if spec.get('title'):
+            axes.set_title(spec['title'])
+        if kind != 'pie':
+            axes.set_xlabel(spec.get('xlabel') or '')
+            axes.set_ylabel(spec.get('ylabel') or '')
+            if len(series) > 1:
+                axes.legend()
+        figure.tight_layout()
+
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format=spec.get('format', 'png'), dpi=spec.get('dpi', 100))
+        return buffer.getvalue()
+    finally:
+        plt.close(figure)
+
+CHART_KEYWORDS = [
+    ('scatter', 'scatter'), ('pie', 'pie'), ('histogram', 'hist'), ('distribution', 'hist'),
+    ('line', 'line'), ('trend', 'line'), ('over time', 'line'), ('bar', 'bar')
+]
+
+def build_chart_spec(frame, question: str, max_points: int = 5000, max_categories: int = 30) -> Dict[str, Any]:
+    """Pick chart type, x column and y series for a pandas DataFrame from the question wording"""
+    question_lower = (question or '').lower()
+    # Whole words (plurals allowed): "deadline" isn't a line chart, "copies" isn't a pie
+    kind = next((k for word, k in CHART_KEYWORDS if re.search(rf'\b{word}s?\b', question_lower)), None)
+    fmt = 'svg' if re.search(r'\bsvg\b', question_lower) else 'png'
+
+    numeric = list(frame.select_dtypes('number').columns)
+    # Whole-word mentions only: column "id" isn't named by "provided"
+    mentioned = [c for c in frame.columns
+                 if str(c) and re.search(rf'(?<!\w){re.escape(str(c).lower())}(?!\w)', question_lower)]
+    y_columns = [c for c in mentioned if c in numeric] or numeric[:1]
+    if not y_columns:
+        raise ValueError("No numeric column to plot")
+
+    if kind == 'scatter':
+        # Scatter needs a numeric x; use a second numeric column when one was named
+        if len(y_columns) > 1:
+            x_column, y_columns = y_columns[0], y_columns[1:]
+        else:
+            x_column = next((c for c in numeric if c not in y_columns), None)
+    else:
+        x_candidates = [c for c in mentioned if c not in y_columns] + [c for c in frame.columns if c not in numeric]
+        x_column = x_candidates[0] if x_candidates else None
+    if kind is None:
+        kind = 'bar' if x_column is not None and x_column not in numeric else 'line'
+
+    data = frame
+    categorical_x = x_column is not None and x_column not in numeric
+    if kind in ('bar', 'pie') and categorical_x:
+        # One bar per category, largest first; thousands of string ticks would dominate render time
+        data = frame.groupby(x_column, sort=False)[y_columns].sum()
+        data = data.sort_values(y_columns[0], ascending=False).head(max_categories).reset_index()
+    elif categorical_x and frame[x_column].nunique() > max_categories:
+        x_column = None
+    data = data.head(max_points)
+
+    return {
+        'kind': kind,
+        'format': fmt,
+        'x': data[x_column].tolist() if x_column is not None else [],
+        'y': {str(c): data[c].tolist() for c in y_columns},
+        'xlabel': str(x_column) if x_column is not None else '',
+        'ylabel': str(y_columns[0]) if len(y_columns) == 1 else '',
+        'title': question[:80] if question else ''
+    }
+
+def to_data_uri(payload: bytes, fmt: str) -> str:
+    mime = 'image/svg+xml' if fmt == 'svg' else 'image/png'
+    return f"data:{mime};base64,{base64.b64encode(payload).decode('ascii')}"
+
+class ChartRenderer:
+    def __init__(self, max_workers: int = 2, max_answer_bytes: int = MAX_ANSWER_BYTES):
+        self.max_workers = max_workers
+        self.max_answer_bytes = max_answer_bytes
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_worker)
+        return self._pool
+
+    async def start(self):
+        """Spawn and warm every worker up front so the first chart doesn't pay for imports"""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        pids = await asyncio.gather(*[loop.run_in_executor(pool, _ping) for _ in range(self.max_workers)])
+        logger.info(f"Chart workers warm: {sorted(set(pids))}")
+
+    async def render_data_uri(self, spec: Dict[str, Any], max_bytes: Optional[int] = None) -> str:
+        """
+        Render to a base64 data URI no larger than max_bytes, shrinking resolution
+        and figure size (and falling back from SVG to PNG) until it fits.
+        """
+        max_bytes = max_bytes or self.max_answer_bytes
+        loop = asyncio.get_running_loop()
+        spec = dict(spec)
+        fmt = spec.setdefault('format', 'png')
+
+        for attempt in range(8):
+            payload = await loop.run_in_executor(self._get_pool(), render_chart, spec)
+            uri = to_data_uri(payload, fmt)
+            if len(uri) <= max_bytes:
+                logger.info(f"Rendered {fmt} chart: {len(uri)} bytes after {attempt + 1} attempt(s)")
+                return uri
+
+            logger.info(f"Chart is {len(uri)} bytes, over the {max_bytes} byte limit; downscaling")
+            if fmt == 'svg':
+                # SVG size tracks point count, not resolution; switch to raster
+                fmt = spec['format'] = 'png'
+                continue
+            spec['dpi'] = max(30, int(spec.get('dpi', 100) * 0.7))
+            spec['width'] = max(2.0, spec.get('width', 6.4) * 0.85)
+            spec['height'] = max(1.5, spec.get('height', 4.8) * 0.85)
+
+        raise ValueError(f"Chart could not be rendered under {max_bytes} bytes")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+chart_renderer = ChartRenderer()
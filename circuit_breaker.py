@@ -0,0 +1,127 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(httpx.RequestError):
+    """Raised instead of sending a request to a host whose breaker is open"""
+
+class CircuitBreaker:
+    """
+    closed: requests flow; `failure_threshold` consecutive failures open it.
+    open: requests fail immediately until `reset_timeout` has passed.
+    half_open: up to `probes` trial requests go through; `success_threshold`
+    successes close the breaker, any failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, probes: int = 1,
+                 success_threshold: int = 1, name: str = ''):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.success_threshold = success_threshold
+        self.state = CLOSED
+        self.failures = 0
+        self.successes = 0
+        self.in_flight_probes = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.opened = 0
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self.successes = 0
+            self.in_flight_probes = 0
+        if self.state == HALF_OPEN:
+            if self.in_flight_probes >= self.probes:
+                self.rejected += 1
+                return False
+            self.in_flight_probes += 1
+        return True
+
+    def record_success(self):
+        if self.state == HALF_OPEN:
+            self.in_flight_probes = max(0, self.in_flight_probes - 1)
+            self.successes += 1
+            if self.successes >= self.success_threshold:
+                self.state = CLOSED
+                self.failures = 0
+        else:
+            self.failures = 0
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self.in_flight_probes = max(0, self.in_flight_probes - 1)
+            self._open()
+            return
+        self.failures += 1
+        if self.state == CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """A request ended without a verdict (e.g. cancelled); give back its probe slot"""
+        if self.state == HALF_OPEN:
+            self.in_flight_probes = max(0, self.in_flight_probes - 1)
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.opened += 1
+        logger.warning(f"Circuit opened for {self.name or 'host'}: failing fast for {self.reset_timeout:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {'state': self.state, 'consecutive_failures': self.failures,
+                 'times_opened': self.opened, 'rejected': self.rejected}
+        if self.state == OPEN:
+            stats['retry_in_seconds'] = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+        return stats
+
+class CircuitBreakerRegistry:
+    """One breaker per host. Thresholds come from BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS and BREAKER_PROBES."""
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None,
+                 probes: Optional[int] = None, max_hosts: int = 512):
+        self.failure_threshold = failure_threshold or int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+        self.reset_timeout = reset_timeout or float(os.getenv('BREAKER_RESET_SECONDS', '30'))
+        self.probes = probes or int(os.getenv('BREAKER_PROBES', '1'))
+        self.max_hosts = max_hosts
+        self._breakers = OrderedDict()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout,
+                                                            self.probes, name=host)
+            while len(self._breakers) > self.max_hosts:
+                self._breakers.popitem(last=False)
+        self._breakers.move_to_end(host)
+        return breaker
+
+    def check(self, url: str) -> CircuitBreaker:
+        """The host's breaker, or CircuitOpenError if it isn't taking requests"""
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc}: failing fast")
+        if breaker.state == HALF_OPEN:
+            logger.info(f"Circuit half-open for {urlparse(url).netloc}: sending a trial request")
+        return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        return {host: breaker.stats() for host, breaker in self._breakers.items()}
+
+breakers = CircuitBreakerRegistry()
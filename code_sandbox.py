@@ -0,0 +1,427 @@
+import ast
+import asyncio
+import builtins
+import contextlib
+import io
+import logging
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import sysconfig
+import tempfile
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_MODULES = {
+    'math', 'statistics', 're', 'json', 'datetime', 'collections', 'itertools', 'functools',
+    'string', 'decimal', 'fractions', 'numpy', 'pandas'
+}
+
+SAFE_BUILTIN_NAMES = [
+    'abs', 'all', 'any', 'bool', 'dict', 'divmod', 'enumerate', 'filter', 'float', 'format',
+    'frozenset', 'hasattr', 'int', 'isinstance', 'issubclass', 'iter', 'len', 'list',
+    'map', 'max', 'min', 'next', 'print', 'range', 'repr', 'reversed', 'round', 'set', 'slice',
+    'sorted', 'str', 'sum', 'tuple', 'zip', 'True', 'False', 'None',
+    'Exception', 'ValueError', 'TypeError', 'KeyError', 'IndexError', 'ZeroDivisionError', 'StopIteration'
+]
+
+# Attribute and imported names generated code may not use: dunders and private
+# internals, and the io/os modules NumPy and pandas re-export
+BLOCKED_ATTRIBUTES = ('_', 'io', 'os')
+
+# Audit events refused while a job runs; reads are allowed only under READABLE_ROOTS
+BLOCKED_EVENTS = ('socket.', 'subprocess.', 'os.system', 'os.exec', 'os.posix_spawn', 'os.spawn', 'os.fork',
+                  'os.kill', 'os.remove', 'os.rmdir', 'os.rename', 'os.chmod', 'os.chown', 'os.putenv',
+                  'os.unsetenv', 'shutil.', 'ctypes.', 'pty.', 'resource.setrlimit', 'sys.addaudithook')
+READABLE_ROOTS = tuple(sorted({os.path.realpath(path) for path in sysconfig.get_paths().values()} |
+                              {'/usr/share/zoneinfo'}))
+
+# Environment variables workers keep; everything else (API keys included) never reaches them
+SANDBOX_ENV = ('PATH', 'HOME', 'LANG', 'TZ', 'TMPDIR', 'LD_LIBRARY_PATH', 'VIRTUAL_ENV')
+SANDBOX_ENV_PREFIXES = ('LC_', 'PYTHON', 'OMP_', 'OPENBLAS_', 'MKL_', 'NUMEXPR_')
+
+SCHEMA_CODE = (
+    "answer = {'columns': {str(c): str(t) for c, t in df.dtypes.items()}, "
+    "'rows': len(df), 'head': df.head(5).to_csv(index=False)}"
+)
+
+class CPULimitExceeded(Exception):
+    pass
+
+def _restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name.split('.')[0] not in ALLOWED_MODULES:
+        raise ImportError(f"Import of '{name}' is not allowed in the sandbox")
+    return __import__(name, globals, locals, fromlist, level)
+
+def _safe_builtins() -> Dict[str, Any]:
+    safe = {name: getattr(builtins, name) for name in SAFE_BUILTIN_NAMES}
+    safe['__import__'] = _restricted_import
+    return safe
+
+def _is_blocked_name(name: str) -> bool:
+    return any(part.startswith(BLOCKED_ATTRIBUTES) for part in name.split('.'))
+
+def _check_code(tree: ast.AST):
+    """Reject code reaching for interpreter internals or I/O modules before it runs"""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and _is_blocked_name(node.attr):
+            raise PermissionError(f"Attribute '{node.attr}' is not allowed in the sandbox")
+        if isinstance(node, ast.alias) and _is_blocked_name(node.name):
+            raise PermissionError(f"Name '{node.name}' is not allowed in the sandbox")
+        if isinstance(node, ast.Name) and node.id.startswith('__'):
+            raise PermissionError(f"Name '{node.id}' is not allowed in the sandbox")
+
+def _sandbox_environ() -> Dict[str, str]:
+    return {key: value for key, value in os.environ.items()
+            if key in SANDBOX_ENV or key.startswith(SANDBOX_ENV_PREFIXES)}
+
+@contextlib.contextmanager
+def _scrubbed_environ():
+    """Temporarily reduce os.environ to SANDBOX_ENV, so processes spawned meanwhile never see secrets"""
+    saved = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(_sandbox_environ())
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+_job_running = False
+
+def _is_readable(args) -> bool:
+    path, mode, flags = args
+    if not isinstance(path, (str, bytes)):
+        return False
+    if mode is not None:
+        if any(c in mode for c in 'wax+'):
+            return False
+    elif flags & (os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND):
+        return False
+    path = os.path.realpath(os.fsdecode(path))
+    return any(path == root or path.startswith(root + os.sep) for root in READABLE_ROOTS)
+
+def _audit(event: str, args):
+    """Audit hook installed in each worker: no file, network or process access while a job runs"""
+    if not _job_running:
+        return
+    if (event == 'open' and not _is_readable(args)) or event.startswith(BLOCKED_EVENTS):
+        raise PermissionError(f"'{event}' is not allowed in the sandbox")
+
+def _on_cpu_limit(signum, frame):
+    raise CPULimitExceeded("CPU time limit exceeded")
+
+def _cpu_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def _set_cpu_limit(seconds: Optional[float]):
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+        return
+    # RLIMIT_CPU is cumulative for the process, so the per-job limit is relative to what's been used
+    soft = int(_cpu_used() + seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _to_plain(value: Any) -> Any:
+    """Convert NumPy/pandas results into plain picklable, JSON-friendly values"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, 'to_dict') and hasattr(value, 'index'):
+        # DataFrames become records and Series a list; labelled indexes are kept
+        labelled = type(value.index).__name__ != 'RangeIndex'
+        if hasattr(value, 'columns'):
+            value = value.head(1000)
+            return [_to_plain(row) for row in (value.reset_index() if labelled else value).to_dict(orient='records')]
+        return _to_plain(value.to_dict() if labelled else value.tolist())
+    if hasattr(value, 'tolist'):
+        return _to_plain(value.tolist())
+    if hasattr(value, 'item') and not isinstance(value, dict):
+        return _to_plain(value.item())
+    if isinstance(value, dict):
+        return {str(k): _to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_to_plain(v) for v in value]
+    return str(value)
+
+def _load_handle(handle: Dict[str, Any], frames: OrderedDict):
+    """Open a dataset handle as a DataFrame, reusing frames this worker already parsed"""
+    from data_readers import read_frame
+
+    key = handle.get('key') or handle.get('path') or handle.get('shm_name')
+    frame = frames.get(key)
+    if frame is None:
+        if handle['kind'] == 'path':
+            with open(handle['path'], 'rb') as stream:
+                frame = read_frame(stream, handle['name'])
+        else:
+            shm = shared_memory.SharedMemory(name=handle['shm_name'])
+            try:
+                frame = read_frame(io.BytesIO(shm.buf[:handle['size']]), handle['name'])
+            finally:
+                shm.close()
+        frames[key] = frame
+        while len(frames) > 4:
+            frames.popitem(last=False)
+    frames.move_to_end(key)
+    # Copy-on-write is enabled in the worker, so a shallow copy keeps the cached frame intact
+    return frame.copy(deep=False)
+
+def _run_job(job: Dict[str, Any], frames: OrderedDict) -> Dict[str, Any]:
+    global _job_running
+    import numpy as np
+    import pandas as pd
+
+    start = time.perf_counter()
+    stdout = io.StringIO()
+    try:
+        namespace = {'__builtins__': _safe_builtins(), 'np': np, 'pd': pd}
+        for variable, handle in (job.get('datasets') or {}).items():
+            namespace[variable] = _load_handle(handle, frames)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        # The value of a trailing expression is the answer unless the code assigns `answer`
+        tree = ast.parse(job['code'], mode='exec')
+        _check_code(tree)
+        trailing = None
+        if tree.body and isinstance(tree.body[-1], ast.Expr):
+            trailing = ast.Expression(tree.body.pop().value)
+
+        _set_cpu_limit(job.get('cpu_seconds'))
+        try:
+            with contextlib.redirect_stdout(stdout):
+                _job_running = True
+                exec(compile(tree, '<analysis>', 'exec'), namespace)
+                value = eval(compile(trailing, '<analysis>', 'eval'), namespace) if trailing else None
+        finally:
+            _job_running = False
+            _set_cpu_limit(None)
+
+        answer = namespace['answer'] if 'answer' in namespace else value
+        return {
+            'status': 'ok', 'answer': _to_plain(answer), 'stdout': stdout.getvalue()[-4000:],
+            'load_ms': round(load_ms, 2), 'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+        }
+    except CPULimitExceeded as e:
+        return {'status': 'error', 'error': str(e), 'stdout': stdout.getvalue()[-4000:]}
+    except MemoryError:
+        # The heap may be fragmented or half-built; ask for a fresh worker
+        frames.clear()
+        return {'status': 'error', 'error': 'Memory limit exceeded', 'recycle': True}
+    except (Exception, SystemExit) as e:
+        return {'status': 'error', 'error': f"{type(e).__name__}: {str(e)}", 'stdout': stdout.getvalue()[-4000:]}
+
+def _worker_main(conn, memory_mb: int, max_jobs: int):
+    """Worker loop: apply limits once, then run jobs until retired or out of jobs"""
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    # The forkserver already starts with a scrubbed environment; this covers one started elsewhere
+    environ = _sandbox_environ()
+    os.environ.clear()
+    os.environ.update(environ)
+    sys.addaudithook(_audit)
+
+    import pandas
+    pandas.set_option('mode.copy_on_write', True)
+
+    frames = OrderedDict()
+    with tempfile.TemporaryDirectory(prefix='sandbox-') as workdir:
+        os.chdir(workdir)
+        conn.send(('ready', os.getpid()))
+        for _ in range(max_jobs):
+            try:
+                job = conn.recv()
+            except EOFError:
+                break
+            if job is None:
+                break
+            conn.send(_run_job(job, frames))
+        os.chdir('/')
+    conn.close()
+
+@contextlib.contextmanager
+def share_body(body, name: str, key: Optional[str] = None):
+    """
+    Dataset handle for a spooled body that workers open by reference: the spool
+    file path when the body is on disk, otherwise a shared-memory block that is
+    released when the block exits.
+    """
+    if body.path is not None:
+        yield {'kind': 'path', 'path': body.path, 'name': name, 'key': key or body.path}
+        return
+
+    shm = shared_memory.SharedMemory(create=True, size=max(body.size, 1))
+    try:
+        shm.buf[:body.size] = body.view
+        yield {'kind': 'shm', 'shm_name': shm.name, 'size': body.size, 'name': name, 'key': key or shm.name}
+    finally:
+        shm.close()
+        shm.unlink()
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.jobs = 0
+
+class CodeSandbox:
+    """
+    Pool of pre-forked workers with NumPy and pandas already imported (via a
+    forkserver preload), for running generated analysis code. Each worker has
+    an address-space limit, each job a CPU-time and a wall-clock limit, and a
+    worker is replaced after `max_jobs_per_worker` jobs, a timeout or a crash.
+    Workers never see secrets from the environment; imports, builtins and
+    attribute names are restricted, and an audit hook refuses file writes,
+    reads outside the Python installation, network and process access while
+    a job runs. Treat it as defence in depth rather than a hardened jail.
+    """
+
+    def __init__(self, workers: int = 2, max_jobs_per_worker: int = 100, cpu_seconds: float = 10.0,
+                 memory_mb: int = 2048, wall_seconds: float = 30.0):
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.wall_seconds = wall_seconds
+        self._context = None
+        self._idle = None
+        self._live = set()
+        self._starting = None
+        self.jobs_run = 0
+        self.recycled = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.last_overhead_ms = None
+
+    def _get_context(self):
+        if self._context is None:
+            self._context = multiprocessing.get_context('forkserver')
+            self._context.set_forkserver_preload(['numpy', 'pandas', 'data_readers', 'code_sandbox'])
+            # Every worker forks from the forkserver, so starting it without secrets keeps them out of
+            # the workers' /proc/<pid>/environ too
+            from multiprocessing import forkserver
+            with _scrubbed_environ():
+                forkserver.ensure_running()
+        return self._context
+
+    async def _recv(self, conn, timeout: float):
+        """Wait for a message without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(conn.fileno(), lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        finally:
+            loop.remove_reader(conn.fileno())
+        return conn.recv()
+
+    async def _add_worker(self):
+        context = self._get_context()
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(target=_worker_main, args=(child_conn, self.memory_mb, self.max_jobs_per_worker),
+                                  daemon=True)
+        await asyncio.to_thread(process.start)
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._live.add(worker)
+        try:
+            await self._recv(parent_conn, 60.0)
+        except BaseException:
+            await self._discard(worker)
+            raise
+        self._idle.put_nowait(worker)
+
+    async def start(self):
+        """Start the forkserver (paying for the pandas import once) and fork every worker up front"""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            self._starting = asyncio.ensure_future(asyncio.gather(*[self._add_worker() for _ in range(self.workers)]))
+        await self._starting
+        logger.info(f"Sandbox workers ready: {sorted(w.process.pid for w in self._live)}")
+
+    async def _discard(self, worker: _Worker, graceful: bool = False):
+        self._live.discard(worker)
+        try:
+            if graceful:
+                worker.conn.send(None)
+        except OSError:
+            pass
+        worker.conn.close()
+        await asyncio.to_thread(worker.process.join, 1.0 if graceful else 0.0)
+        if worker.process.is_alive():
+            worker.process.kill()
+            await asyncio.to_thread(worker.process.join)
+
+    async def _replace(self, worker: _Worker, graceful: bool):
+        await self._discard(worker, graceful)
+        self.recycled += 1
+        try:
+            await self._add_worker()
+        except Exception as e:
+            logger.error(f"Could not start a replacement sandbox worker: {str(e)}")
+
+    async def run(self, code: str, datasets: Optional[Dict[str, Dict[str, Any]]] = None,
+                  cpu_seconds: Optional[float] = None, wall_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute `code` in a warm worker. `datasets` maps variable names to handles
+        from share_body(); the code leaves its result in `answer` or a trailing expression.
+        """
+        await self.start()
+        wall_seconds = wall_seconds or self.wall_seconds
+        worker = await self._idle.get()
+        start = time.perf_counter()
+        job = {'code': code, 'datasets': datasets or {}, 'cpu_seconds': cpu_seconds or self.cpu_seconds}
+
+        try:
+            worker.conn.send(job)
+            result = await self._recv(worker.conn, wall_seconds)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            asyncio.ensure_future(self._replace(worker, graceful=False))
+            return {'status': 'error', 'error': f"Wall-clock limit of {wall_seconds}s exceeded"}
+        except (EOFError, OSError) as e:
+            self.crashes += 1
+            asyncio.ensure_future(self._replace(worker, graceful=False))
+            return {'status': 'error', 'error': f"Sandbox worker died: {type(e).__name__}"}
+
+        self.jobs_run += 1
+        worker.jobs += 1
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if 'elapsed_ms' in result:
+            self.last_overhead_ms = round(elapsed_ms - result['elapsed_ms'], 2)
+
+        if worker.jobs >= self.max_jobs_per_worker or result.get('recycle'):
+            asyncio.ensure_future(self._replace(worker, graceful=not result.get('recycle')))
+        else:
+            self._idle.put_nowait(worker)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'workers': len(self._live),
+            'idle': self._idle.qsize() if self._idle is not None else 0,
+            'jobs_run': self.jobs_run,
+            'recycled': self.recycled,
+            'timeouts': self.timeouts,
+            'crashes': self.crashes,
+            'last_overhead_ms': self.last_overhead_ms
+        }
+
+    async def close(self):
+        workers = list(self._live)
+        await asyncio.gather(*[self._discard(worker, graceful=True) for worker in workers])
+        self._idle = None
+        self._starting = None
+
+code_sandbox = CodeSandbox()
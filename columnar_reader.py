@@ -0,0 +1,198 @@
+import logging
+import operator
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from csv_aggregator import empty_partial
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow'
+}
+
+FILTER_OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+def detect_columnar_format(name: str) -> Optional[str]:
+    name = name.lower()
+    for ext, fmt in COLUMNAR_EXTENSIONS.items():
+        if name.endswith(ext):
+            return fmt
+    return None
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow data sources")
+
+def _open_source(body):
+    """Memory-map spooled files; wrap in-memory bodies without copying"""
+    if body.path is not None:
+        return pa.memory_map(body.path, 'r')
+    return pa.BufferReader(pa.py_buffer(body.view))
+
+def _row_group_may_match(metadata, row_group: int, filters: List[Tuple[str, str, Any]]) -> bool:
+    """Use row-group min/max statistics to skip groups that can't satisfy the filters"""
+    group = metadata.row_group(row_group)
+    names = [group.column(i).path_in_schema for i in range(group.num_columns)]
+
+    for column, op, value in filters:
+        if column not in names:
+            continue
+        stats = group.column(names.index(column)).statistics
+        if stats is None or not stats.has_min_max:
+            continue
+        low, high = stats.min, stats.max
+        try:
+            if op in ('>', '>=') and not FILTER_OPERATORS[op](high, value):
+                return False
+            if op in ('<', '<=') and not FILTER_OPERATORS[op](low, value):
+                return False
+            if op in ('=', '==') and not (low <= value <= high):
+                return False
+        except TypeError:
+            continue
+
+    return True
+
+def _is_numeric(data_type) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type)
+
+def _comparable(column, value):
+    """`column` in a type `value` can be compared with: dictionaries decoded, numbers stored as text parsed"""
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    if isinstance(value, (int, float)) and not _is_numeric(column.type):
+        column = column.cast(pa.float64())
+    return column
+
+def _apply_filters(table, filters: List[Tuple[str, str, Any]]):
+    comparisons = {
+        '>': pc.greater, '>=': pc.greater_equal, '<': pc.less, '<=': pc.less_equal,
+        '=': pc.equal, '==': pc.equal, '!=': pc.not_equal
+    }
+    for column, op, value in filters:
+        if column not in table.column_names:
+            continue
+        try:
+            mask = comparisons[op](_comparable(table[column], value), value)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+            # Like row-group pruning, a filter that doesn't fit the column's type is skipped rather than fatal
+            logger.warning(f"Skipping filter {column} {op} {value!r} on {table[column].type} column: {str(e)}")
+            continue
+        table = table.filter(mask)
+    return table
+
+def read_table(body, fmt: str, columns: Optional[List[str]] = None,
+               filters: Optional[List[Tuple[str, str, Any]]] = None):
+    """
+    Read a Parquet or Arrow IPC body into a pyarrow Table.
+    `columns` projects the read; `filters` are (column, op, value) tuples applied
+    first at row-group level (Parquet statistics) and then row by row.
+    """
+    _require_pyarrow()
+    filters = filters or []
+    source = _open_source(body)
+
+    if fmt == 'parquet':
+        parquet_file = pq.ParquetFile(source)
+        schema_names = parquet_file.schema_arrow.names
+        if columns:
+            filter_columns = [c for c, _, _ in filters if c in schema_names and c not in columns]
+            columns = [c for c in columns if c in schema_names] + filter_columns
+
+        groups = [i for i in range(parquet_file.num_row_groups)
+                  if _row_group_may_match(parquet_file.metadata, i, filters)]
+        logger.info(f"Reading {len(groups)}/{parquet_file.num_row_groups} row groups, columns={columns or 'all'}")
+        table = parquet_file.read_row_groups(groups, columns=columns or None)
+    else:
+        try:
+            table = ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            source.seek(0)
+            table = ipc.open_stream(source).read_all()
+        if columns:
+            table = table.select([c for c in columns if c in table.column_names]
+                                 + [c for c, _, _ in filters if c in table.column_names and c not in columns])
+
+    return _apply_filters(table, filters)
+
+def aggregate_table(table, group_by: Optional[str] = None) -> Dict[str, Any]:
+    """Aggregate a table into the same partial structure the CSV kernels produce"""
+    _require_pyarrow()
+    partial = empty_partial()
+    # CSV partials count the header line as a row; keep the same convention
+    partial['rows'] = table.num_rows + 1
+
+    numeric = [name for name, field in zip(table.column_names, table.schema) if _is_numeric(field.type)]
+
+    for name in numeric:
+        column = table[name]
+        total = pc.sum(column).as_py() or 0
+        count = len(column) - column.null_count
+        partial['column_sums'][name] = float(total)
+        partial['column_counts'][name] = count
+        partial['total_sum'] += float(total)
+        partial['numeric_count'] += count
+
+    if group_by and group_by in table.column_names:
+        value_columns = [name for name in numeric if name != group_by]
+        grouped = table.group_by(group_by).aggregate(
+            [(name, 'sum') for name in value_columns] + [(group_by, 'count')]
+        ).to_pydict()
+        for i, key in enumerate(grouped[group_by]):
+            key = str(key)
+            partial['group_counts'][key] = grouped[f'{group_by}_count'][i]
+            partial['group_sums'][key] = {
+                name: float(grouped[f'{name}_sum'][i] or 0) for name in value_columns
+            }
+
+    return partial
+
+def extract_projection(question: str, column_names: List[str]) -> Tuple[List[str], List[Tuple[str, str, Any]]]:
+    """Columns mentioned in the question, plus simple `<column> <op> <number>` filters"""
+    question = question or ''
+    columns = [name for name in column_names
+               if re.search(rf'\b{re.escape(name)}\b', question, re.IGNORECASE)]
+
+    filters = []
+    for name, op, value in re.findall(r'([\w.]+)\s*(>=|<=|!=|==|>|<|=)\s*(-?\d+(?:\.\d+)?)', question):
+        matched = next((c for c in column_names if c.lower() == name.lower()), None)
+        if matched:
+            filters.append((matched, op, float(value) if '.' in value else int(value)))
+
+    # Columns only mentioned as filter subjects aren't part of the projection, unless they're all it names
+    # ("sum of score where score > 10"); an empty projection would sum every numeric column
+    filter_columns = {column for column, _, _ in filters}
+    columns = [name for name in columns if name not in filter_columns] or columns
+
+    return columns, filters
+
+def read_schema_names(body, fmt: str) -> List[str]:
+    _require_pyarrow()
+    source = _open_source(body)
+    if fmt == 'parquet':
+        return pq.ParquetFile(source).schema_arrow.names
+    try:
+        return ipc.open_file(source).schema.names
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return ipc.open_stream(source).schema.names
@@ -0,0 +1,250 @@
+import asyncio
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from download_spooler import download_spooler, SpooledBody
+from numeric_scanner import NUMBER_TEXT, scan_csv
+
+logger = logging.getLogger(__name__)
+
+NON_BLANK_LINE = re.compile(rb'^[ \t]*[^\s]', re.MULTILINE)
+QUOTE = re.compile(rb'"')
+
+def split_byte_ranges(path: str, parts: int, max_chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into newline-aligned (start, end) byte ranges.
+    Produces at least `parts` ranges and none larger than roughly `max_chunk_bytes`.
+    Note: quoted CSV fields containing newlines may be cut across ranges.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    count = max(parts, -(-size // max_chunk_bytes))
+    step = max(1, size // count)
+
+    ranges = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < size:
+            end = start + step
+            if end >= size:
+                end = size
+            else:
+                # Move the boundary forward to the end of the current line
+                f.seek(end)
+                f.readline()
+                end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def empty_partial() -> Dict[str, Any]:
+    return {
+        'rows': 0,
+        'total_sum': 0.0,
+        'numeric_count': 0,
+        'column_sums': {},
+        'column_counts': {},
+        'group_sums': {},
+        'group_counts': {}
+    }
+
+
+def _to_float(cell: str) -> Optional[float]:
+    try:
+        return float(cell)
+    except ValueError:
+        # A quoted "1,234" cell, as the all-numbers total reads it
+        if ',' in cell and NUMBER_TEXT.fullmatch(cell.strip()):
+            return float(cell.replace(',', ''))
+        return None
+
+
+def aggregate_rows(rows, header: Optional[List[str]] = None, group_by: Optional[str] = None,
+                   partial: Optional[Dict[str, Any]] = None, count_numbers: bool = True) -> Dict[str, Any]:
+    """Fold parsed CSV rows into a partial aggregate (sums, counts, group-bys)"""
+    partial = partial if partial is not None else empty_partial()
+    group_index = header.index(group_by) if header and group_by in header else None
+
+    column_sums = partial['column_sums']
+    column_counts = partial['column_counts']
+    group_sums = partial['group_sums']
+    group_counts = partial['group_counts']
+
+    for row in rows:
+        if not row:
+            continue
+        partial['rows'] += 1
+
+        # Sum of every number appearing anywhere in the row (legacy answer)
+        if count_numbers:
+            tokens = NUMBER_TEXT.findall('\x1f'.join(row))
+            partial['total_sum'] += sum(float(token.replace(',', '')) for token in tokens)
+            partial['numeric_count'] += len(tokens)
+
+        if not header or row == header:
+            continue
+
+        group_key = row[group_index] if group_index is not None and group_index < len(row) else None
+        if group_key is not None:
+            group_counts[group_key] = group_counts.get(group_key, 0) + 1
+
+        for name, cell in zip(header, row):
+            value = _to_float(cell)
+            if value is None:
+                continue
+            column_sums[name] = column_sums.get(name, 0.0) + value
+            column_counts[name] = column_counts.get(name, 0) + 1
+            if group_key is not None and name != group_by:
+                sums = group_sums.setdefault(group_key, {})
+                sums[name] = sums.get(name, 0.0) + value
+
+    return partial
+
+
+def aggregate_row_stream(rows, group_by: Optional[str] = None) -> Dict[str, Any]:
+    """Aggregate an iterator of rows whose first row is the header"""
+    rows = iter(rows)
+    header = next(rows, None)
+    partial = aggregate_rows([header] if header else [], header, group_by)
+    return aggregate_rows(rows, header, group_by, partial)
+
+
+def aggregate_range(path: str, start: int, end: int, header: Optional[List[str]] = None,
+                    group_by: Optional[str] = None, column_stats: bool = True) -> Dict[str, Any]:
+    """Aggregate one newline-aligned byte range of a CSV file (runs in a worker process)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    return aggregate_buffer(data, header, group_by, column_stats)
+
+
+def aggregate_buffer(data, header: Optional[List[str]] = None, group_by: Optional[str] = None,
+                     column_stats: bool = True) -> Dict[str, Any]:
+    """
+    Aggregate raw CSV bytes. The all-numbers total comes from one scan over the buffer;
+    rows are only parsed when per-column or group-by statistics are wanted.
+    Buffers with quoted fields are parsed as rows throughout, since a quoted "1,234"
+    is one number the delimiter-blind scan would read as two.
+    """
+    if QUOTE.search(data) is not None:
+        reader = csv.reader(io.StringIO(str(data, 'utf-8', errors='replace')))
+        return aggregate_rows(reader, header if column_stats else None, group_by)
+
+    numbers = scan_csv(data)
+
+    if column_stats:
+        reader = csv.reader(io.StringIO(str(data, 'utf-8', errors='replace')))
+        partial = aggregate_rows(reader, header, group_by, count_numbers=False)
+    else:
+        partial = empty_partial()
+        partial['rows'] = len(NON_BLANK_LINE.findall(data))
+
+    partial['total_sum'] = float(numbers.sum())
+    partial['numeric_count'] = int(numbers.size)
+    return partial
+
+
+def merge_partials(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge partial aggregates produced by separate byte ranges"""
+    merged = empty_partial()
+
+    for partial in partials:
+        merged['rows'] += partial['rows']
+        merged['total_sum'] += partial['total_sum']
+        merged['numeric_count'] += partial['numeric_count']
+
+        for key in ('column_sums', 'column_counts', 'group_counts'):
+            target = merged[key]
+            for name, value in partial[key].items():
+                target[name] = target.get(name, 0) + value
+
+        for group, sums in partial['group_sums'].items():
+            target = merged['group_sums'].setdefault(group, {})
+            for name, value in sums.items():
+                target[name] = target.get(name, 0.0) + value
+
+    return merged
+
+
+class ParallelCSVAggregator:
+    def __init__(self, max_workers: Optional[int] = None,
+                 parallel_threshold: int = 32 * 1024 * 1024,
+                 max_chunk_bytes: int = 64 * 1024 * 1024):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.max_chunk_bytes = max_chunk_bytes
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = self._new_pool(self.max_workers)
+        return self._pool
+
+    @staticmethod
+    def _new_pool(workers: int) -> ProcessPoolExecutor:
+        # forkserver, as in parse_scheduler: forking the running server would copy
+        # its threads and event loop state into every worker
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver'))
+
+    async def aggregate_url(self, client, url: str, group_by: Optional[str] = None,
+                            column_stats: bool = True) -> Dict[str, Any]:
+        """Stream a CSV download through the spooler and aggregate it off the event loop"""
+        async with download_spooler.fetch(client, url) as body:
+            return await self.aggregate_body(body, group_by, column_stats)
+
+    async def aggregate_body(self, body: SpooledBody, group_by: Optional[str] = None,
+                             column_stats: bool = True) -> Dict[str, Any]:
+        if not body.in_memory:
+            return await self.aggregate_file(body.path, group_by, column_stats=column_stats)
+
+        def _aggregate():
+            with body.open() as f:
+                header = next(csv.reader([f.readline().decode('utf-8', errors='replace')]), None)
+            return aggregate_buffer(body.view, header, group_by, column_stats)
+
+        return await asyncio.to_thread(_aggregate)
+
+    async def aggregate_file(self, path: str, group_by: Optional[str] = None,
+                             workers: Optional[int] = None, column_stats: bool = True) -> Dict[str, Any]:
+        """Aggregate a CSV file on disk, fanning out to the process pool for large files"""
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            header = next(csv.reader([f.readline()]), None)
+
+        size = os.path.getsize(path)
+        loop = asyncio.get_running_loop()
+
+        if size < self.parallel_threshold and workers is None:
+            return await asyncio.to_thread(aggregate_range, path, 0, size, header, group_by, column_stats)
+
+        workers = workers or self.max_workers
+        ranges = split_byte_ranges(path, workers, self.max_chunk_bytes)
+        logger.info(f"Aggregating {size} bytes in {len(ranges)} ranges across {workers} processes")
+
+        pool = self._get_pool() if workers == self.max_workers else self._new_pool(workers)
+        try:
+            partials = await asyncio.gather(*[
+                loop.run_in_executor(pool, aggregate_range, path, start, end, header, group_by, column_stats)
+                for start, end in ranges
+            ])
+        finally:
+            if pool is not self._pool:
+                pool.shutdown()
+
+        return merge_partials(partials)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+csv_aggregator = ParallelCSVAggregator()
@@ -3,49 +3,123 @@ import json
 import base64
 import logging
 from typing import Dict, Any, Optional, Union
-import io
-import csv
-from bs4 import BeautifulSoup
 import re
 import asyncio
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from urllib.parse import urljoin
+import os
+from urllib.parse import urljoin, urlparse
+from csv_aggregator import csv_aggregator, aggregate_row_stream
+from archive_reader import is_archive, open_data_stream, member_format
+from data_readers import iter_rows, read_frame, detect_format
+import calculator
+import stats_kernels
+import text_analytics
+from chart_renderer import chart_renderer, build_chart_spec
+from numeric_scanner import find_secret_code, scan_pdf
+from table_extractor import extract_tables, select_table, frame_to_partial, mentions
+from columnar_reader import detect_columnar_format, read_table, read_schema_names, aggregate_table, extract_projection
+from download_spooler import download_spooler
+from llm_client import llm_client
+from code_sandbox import code_sandbox, share_body, SCHEMA_CODE
+from dataset_cache import dataset_cache, content_hash
+from render_decision import render_decisions
+from renderer import renderer
+from parse_scheduler import parse_scheduler, page_text, instruction_signature
+from contextlib import asynccontextmanager
 
 logger = logging.getLogger(__name__)
 
+# CSV bodies above this size are summarised with streaming kernels instead of a DataFrame
+STREAMING_STATS_BYTES = 512 * 1024 * 1024
+
+# Answers produced by a fallback inside a handler are credited to that fallback, not the task type
+STRATEGY_BY_METHOD = {
+    'generated_code': 'generated_code',
+    'llm': 'llm',
+    'secret_code_extraction': 'scraping',
+    'table_extraction': 'scraping',
+    'content_extraction': 'scraping'
+}
+
+# Questions asking for a picture of the data rather than a number from it
+CHART_WORDING = re.compile(r'\b(?:charts?|plot(?:s|ted|ting)?|graphs?|histograms?|visuali[sz](?:e|ed|ing|ation))\b',
+                           re.IGNORECASE)
+NUMERIC_ANSWER = re.compile(r'\b(?:sum|total|count|how many|average|mean|median|max(?:imum)?|min(?:imum)?)\b',
+                            re.IGNORECASE)
+
 class DataProcessor:
     def __init__(self):
         self.client = httpx.AsyncClient(timeout=10.0)
     
-    async def process_quiz_task(self, instructions: Dict[str, Any], base_url: str = None) -> Dict[str, Any]:
+    async def process_quiz_task(self, instructions: Dict[str, Any], base_url: str = None,
+                                strategy: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Solve a parsed quiz task. `strategy` (from a previous correct answer on the same
+        page template) is tried first; the result's 'strategy' names the one that produced it.
+        """
         task_type = instructions.get('task_type', 'general')
-        data_source = instructions.get('data_source')
-        question = instructions.get('question')
+        
+        if strategy:
+            logger.info(f"Trying cached strategy: {strategy}")
+            try:
+                result = await self._run_strategy(strategy, instructions, base_url)
+                if result is not None and result.get('status') == 'processed':
+                    result['strategy'] = strategy
+                    return result
+            except Exception as e:
+                logger.error(f"Cached strategy {strategy} failed: {str(e)}")
+            logger.info("Cached strategy did not produce an answer, running full dispatch")
         
         logger.info(f"Processing task type: {task_type}")
         
+        if task_type not in ('scraping', 'data_extraction', 'calculation', 'visualization', 'api_call', 'general'):
+            task_type = 'unknown'
+        elif task_type in ('scraping', 'data_extraction') and not instructions.get('data_source'):
+            task_type = 'unknown'
+        
         try:
-            if task_type == 'scraping' and data_source:
-                return await self._handle_scraping_task(data_source, instructions, base_url)
-            elif task_type == 'data_extraction' and data_source:
-                return await self._handle_data_extraction(data_source, question, base_url)
-            elif task_type == 'calculation':
-                return await self._handle_calculation(instructions)
-            elif task_type == 'api_call':
-                return await self._handle_api_call(data_source, instructions)
-            elif task_type == 'general':
-                return await self._handle_general_task(instructions, base_url)
-            else:
-                return await self._handle_unknown_task(instructions)
-                
+            result = await self._run_strategy(task_type, instructions, base_url)
         except Exception as e:
             logger.error(f"Error processing task: {str(e)}")
             return {'status': 'error', 'error': str(e), 'answer': None}
+        
+        result['strategy'] = STRATEGY_BY_METHOD.get(result.get('method'), task_type)
+        return result
+    
+    async def _run_strategy(self, strategy: str, instructions: Dict[str, Any], base_url: str = None) -> Optional[Dict[str, Any]]:
+        data_source = instructions.get('data_source')
+        question = instructions.get('question')
+        
+        # A chart of a data file is classified by its file wording, so it arrives as extraction or calculation
+        if strategy in ('data_extraction', 'calculation') and data_source and self._wants_chart(instructions):
+            return await self._handle_visualization(instructions, base_url)
+        
+        if strategy == 'scraping':
+            return await self._handle_scraping_task(data_source, instructions, base_url) if data_source else None
+        elif strategy == 'data_extraction':
+            return await self._handle_data_extraction(data_source, question, base_url) if data_source else None
+        elif strategy == 'calculation':
+            return await self._handle_calculation(instructions, base_url)
+        elif strategy == 'visualization':
+            return await self._handle_visualization(instructions, base_url)
+        elif strategy == 'api_call':
+            return await self._handle_api_call(data_source, instructions)
+        elif strategy == 'general':
+            return await self._handle_general_task(instructions, base_url)
+        elif strategy == 'generated_code':
+            return await self._solve_with_generated_code(instructions, instructions.get('task_type') or 'general', base_url)
+        elif strategy == 'llm':
+            return await self._solve_with_llm(instructions, instructions.get('task_type') or 'general')
+        else:
+            return await self._handle_unknown_task(instructions)
     
     async def _handle_scraping_task(self, data_source: str, instructions: Dict[str, Any], base_url: str) -> Dict[str, Any]:
         logger.info(f"Handling scraping task: {data_source}")
         
+        question = instructions.get('question') or ''
+        if detect_format(urlparse(data_source).path) == 'text' and text_analytics.parse_text_query(question):
+            # Plain-text sources are analysed as a stream rather than rendered as a page
+            return await self._process_text_with_analysis(data_source, question, base_url)
+        
         try:
             if data_source.startswith('/') and base_url:
                 data_source = urljoin(base_url, data_source)
@@ -55,13 +129,24 @@ class DataProcessor:
             if not html_content:
                 return {'status': 'error', 'error': 'Failed to scrape data source', 'answer': None}
             
-            secret_code = self._extract_secret_code(html_content)
+            secret_code = await self._extract_secret_code(html_content)
             
             if secret_code:
                 return {
                     'status': 'processed', 'task_type': 'scraping', 'answer': secret_code,
                     'method': 'secret_code_extraction', 'notes': f'Secret code extracted from {data_source}'
                 }
+            
+            tables = await asyncio.to_thread(extract_tables, html_content) if '<table' in html_content.lower() else []
+            if tables and re.search(r'\b(sum|total|add)\b', question, re.IGNORECASE):
+                frame = select_table(tables, question)
+                columns = [name for name in frame['columns'] if mentions(name, question)]
+                total_sum = frame_to_partial(frame, columns or None)['total_sum']
+                logger.info(f"Calculated sum from table {frame['index']}: {total_sum}")
+                return {
+                    'status': 'processed', 'task_type': 'scraping', 'answer': total_sum,
+                    'method': 'table_extraction', 'notes': f'Sum of {columns or "numeric columns"} in table {frame["index"]} of {data_source}'
+                }
             else:
                 return {
                     'status': 'processed', 'task_type': 'scraping', 'answer': html_content.strip(),
@@ -73,36 +158,26 @@ class DataProcessor:
     
     async def _scrape_with_js_detection(self, url: str) -> tuple:
         try:
-            response = await self.client.get(url)
+            # Same history as web_scraper: pages that always changed when rendered skip the static fetch
+            if render_decisions.known_render(url):
+                logger.info(f"Data source is known to need JavaScript rendering: {url}")
+                return await renderer.render(url), True
             
-            if response.status_code == 200:
-                html_content = response.text
-                soup = BeautifulSoup(html_content, 'html.parser')
-                scripts = soup.find_all('script')
-                
-                needs_js = any([
-                    len(soup.get_text().strip()) < 20,
-                    any('document.querySelector' in str(script) for script in scripts),
-                    any('innerHTML' in str(script) for script in scripts),
-                    any('atob' in str(script) for script in scripts),
-                ])
+            async with download_spooler.fetch(self.client, url, raise_for_status=False) as body:
+                status_code = body.status_code
+                html_content = body.text() if status_code == 200 else None
+            
+            if status_code == 200:
+                needs_js, _ = render_decisions.should_render(url, html_content)
                 
                 if needs_js:
                     logger.info(f"Data source needs JavaScript rendering: {url}")
-                    chrome_options = Options()
-                    chrome_options.add_argument("--headless")
-                    chrome_options.add_argument("--no-sandbox")
-                    chrome_options.add_argument("--disable-dev-shm-usage")
-                    
-                    driver = webdriver.Chrome(options=chrome_options)
-                    try:
-                        driver.set_page_load_timeout(5)
-                        driver.get(url)
-                        await asyncio.sleep(1)
-                        rendered_html = driver.page_source
-                        return rendered_html, True
-                    finally:
-                        driver.quit()
+                    rendered_html = await renderer.render(url)
+                    # Judge the change by the extracted instructions, as web_scraper does
+                    changed = (await parse_scheduler.run(instruction_signature, html_content) !=
+                               await parse_scheduler.run(instruction_signature, rendered_html))
+                    render_decisions.record_change(url, changed)
+                    return rendered_html, True
                 else:
                     return html_content, False
             else:
@@ -112,25 +187,13 @@ class DataProcessor:
             logger.error(f"Scraping error for {url}: {str(e)}")
             return None, False
     
-    def _extract_secret_code(self, html_content: str) -> Optional[str]:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        text = soup.get_text().strip()
-        text = re.sub(r'\s+', ' ', text)
-        
-        patterns = [
-            r'secret code is\s*([0-9]{4,})',
-            r'code is\s*([0-9]{4,})',  
-            r'secret[:\s]*([0-9]{4,})',
-            r'code[:\s]*([0-9]{4,})',
-            r'([0-9]{5,})'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if match.isdigit() and len(match) >= 4:
-                    logger.info(f"Found secret code: {match}")
-                    return match
+    async def _extract_secret_code(self, html_content: str) -> Optional[str]:
+        text = await parse_scheduler.run(page_text, html_content)
+        
+        match = find_secret_code(text)
+        if match:
+            logger.info(f"Found secret code: {match}")
+            return match
         
         logger.info("No numeric secret code found")
         return None
@@ -138,41 +201,46 @@ class DataProcessor:
     async def _handle_data_extraction(self, data_source: str, question: str, base_url: str) -> Dict[str, Any]:
         logger.info(f"Extracting data from: {data_source}")
         
-        if data_source.endswith('.csv'):
+        statistic = stats_kernels.detect_statistic(question)
+        path = urlparse(data_source).path
+        if statistic and (detect_columnar_format(path) or detect_format(path) in ('csv', 'json', 'jsonl', 'excel')):
+            return await self._process_statistics_with_analysis(data_source, question, statistic, base_url)
+        
+        if detect_columnar_format(urlparse(data_source).path):
+            return await self._process_columnar_with_analysis(data_source, question, base_url)
+        elif is_archive(urlparse(data_source).path):
+            return await self._process_archive_with_analysis(data_source, question, base_url)
+        elif data_source.endswith('.csv'):
             return await self._process_csv_with_analysis(data_source, question, base_url)
+        elif urlparse(data_source).path.lower().endswith('.pdf'):
+            return await self._process_pdf_with_analysis(data_source, question, base_url)
+        elif detect_format(path) == 'text':
+            return await self._process_text_with_analysis(data_source, question, base_url)
         else:
             return await self._handle_scraping_task(data_source, {'task_type': 'data_extraction'}, base_url)
     
+    def _resolve_data_url(self, url: str, base_url: str = None) -> str:
+        if url.startswith('/') and base_url:
+            return urljoin(base_url, url)
+        elif url.startswith('/'):
+            return urljoin("https://tds-llm-analysis.s-anand.net", url)
+        elif not url.startswith(("http://", "https://")) and base_url:
+            return urljoin(base_url, url)
+        return url
+    
     async def _process_csv_with_analysis(self, csv_url: str, question: str, base_url: str = None) -> Dict[str, Any]:
         try:
-            if csv_url.startswith('/') and base_url:
-                csv_url = urljoin(base_url, csv_url)
-            elif csv_url.startswith('/'):
-                csv_url = urljoin("https://tds-llm-analysis.s-anand.net", csv_url)
-            elif not csv_url.startswith(("http://", "https://")) and base_url:
-                csv_url = urljoin(base_url, csv_url)
+            csv_url = self._resolve_data_url(csv_url, base_url)
             
             logger.info(f"Fetching CSV from: {csv_url}")
-            response = await self.client.get(csv_url)
-            response.raise_for_status()
-            
-            csv_content = response.text
-            csv_reader = csv.reader(io.StringIO(csv_content))
-            rows = list(csv_reader)
+            aggregate = await self._load_dataset(
+                csv_url, 'csv:totals', lambda body: csv_aggregator.aggregate_body(body, column_stats=False)
+            )
             
-            if not rows or len(rows) < 2:
+            if aggregate['rows'] < 2:
                 return {'status': 'error', 'error': 'Empty or invalid CSV file', 'answer': None}
             
-            total_sum = 0
-            for row in rows:
-                for cell in row:
-                    numbers = re.findall(r'-?\d+\.?\d*', str(cell))
-                    for num in numbers:
-                        try:
-                            total_sum += float(num)
-                        except ValueError:
-                            pass
-            
+            total_sum = aggregate['total_sum']
             logger.info(f"Calculated sum from CSV: {total_sum}")
             
             return {
@@ -184,17 +252,279 @@ class DataProcessor:
             logger.error(f"CSV processing error: {str(e)}")
             return {'status': 'error', 'error': str(e), 'answer': None}
     
-    async def _handle_calculation(self, instructions: Dict[str, Any]) -> Dict[str, Any]:
-        question = instructions.get('question', '')
+    async def _process_statistics_with_analysis(self, data_url: str, question: str, statistic: str,
+                                                base_url: str = None) -> Dict[str, Any]:
+        try:
+            data_url = self._resolve_data_url(data_url, base_url)
+            name = urlparse(data_url).path
+            logger.info(f"Computing {statistic} over: {data_url}")
+            
+            frame = dataset_cache.get_by_url(data_url, 'frame')
+            if frame is None:
+                async with self._fetch_dataset(data_url) as (body, digest):
+                    frame = dataset_cache.get_by_hash(digest, 'frame', data_url)
+                    too_big = not body.in_memory and body.size > STREAMING_STATS_BYTES
+                    if frame is None and too_big and detect_format(name) == 'csv':
+                        # Too big to hold as a DataFrame: stream the needed columns through the online kernels
+                        result = await asyncio.to_thread(stats_kernels.compute_streaming_statistic, body.path, statistic, question)
+                    elif frame is None:
+                        def _read(body):
+                            with body.open() as stream:
+                                return read_frame(stream, name)
+                        
+                        frame = await asyncio.to_thread(_read, body)
+                        dataset_cache.put(digest, 'frame', frame, data_url)
+            
+            if frame is not None:
+                result = await asyncio.to_thread(stats_kernels.compute_statistic, frame, statistic, question)
+            
+            answer = result['answer']
+            logger.info(f"{statistic} of {result['columns']}: {answer}")
+            
+            return {
+                'status': 'processed', 'task_type': 'statistics', 'answer': answer,
+                'method': f"stats_{statistic}", 'notes': f"{statistic} of {', '.join(result['columns'])}"
+                         f"{' (estimated from a sample)' if result.get('approximate') else ''}"
+            }
+            
+        except Exception as e:
+            logger.error(f"Statistics error: {str(e)}")
+            return {'status': 'error', 'error': str(e), 'answer': None}
+    
+    async def _process_pdf_with_analysis(self, pdf_url: str, question: str, base_url: str = None) -> Dict[str, Any]:
+        try:
+            pdf_url = self._resolve_data_url(pdf_url, base_url)
+            
+            logger.info(f"Fetching PDF from: {pdf_url}")
+            def _scan(body):
+                with body.open() as stream:
+                    return scan_pdf(stream)
+            
+            numbers = await self._load_dataset(pdf_url, 'pdf:numbers', lambda body: asyncio.to_thread(_scan, body))
+            
+            if numbers.size == 0:
+                return {'status': 'error', 'error': 'No numbers found in PDF', 'answer': None}
+            
+            total_sum = float(numbers.sum())
+            logger.info(f"Calculated sum from PDF: {total_sum}")
+            
+            return {
+                'status': 'processed', 'task_type': 'pdf_processing', 'answer': total_sum,
+                'method': 'sum_calculation', 'notes': f'Sum of {numbers.size} numbers in PDF: {total_sum}'
+            }
+            
+        except Exception as e:
+            logger.error(f"PDF processing error: {str(e)}")
+            return {'status': 'error', 'error': str(e), 'answer': None}
+    
+    async def _process_text_with_analysis(self, text_url: str, question: str, base_url: str = None) -> Dict[str, Any]:
+        try:
+            text_url = self._resolve_data_url(text_url, base_url)
+            query = text_analytics.parse_text_query(question)
+            if query is None:
+                return {'status': 'error', 'error': 'Unrecognised question for a text file', 'answer': None}
+            
+            logger.info(f"Running {query['operation']} over: {text_url}")
+            def _analyze(body):
+                with body.open() as stream:
+                    return text_analytics.analyze_stream(stream, query)
+            
+            result = await self._load_dataset(
+                text_url, text_analytics.query_key(query), lambda body: asyncio.to_thread(_analyze, body)
+            )
+            logger.info(f"Text analysis result: {result['notes']}")
+            
+            return {
+                'status': 'processed', 'task_type': 'text_processing', 'answer': result['answer'],
+                'method': f"text_{query['operation']}", 'notes': result['notes']
+            }
+            
+        except Exception as e:
+            logger.error(f"Text processing error: {str(e)}")
+            return {'status': 'error', 'error': str(e), 'answer': None}
+    
+    async def _process_archive_with_analysis(self, archive_url: str, question: str, base_url: str = None) -> Dict[str, Any]:
+        try:
+            archive_url = self._resolve_data_url(archive_url, base_url)
+            member = self._select_archive_member(question)
+            
+            logger.info(f"Fetching compressed data source from: {archive_url}")
+            def _aggregate(body):
+                with body.open() as source:
+                    with open_data_stream(source, urlparse(archive_url).path, member) as (member_name, stream):
+                        fmt = member_format(member_name)
+                        return member_name, fmt, aggregate_row_stream(iter_rows(stream, fmt, member_name))
+            
+            member_name, fmt, aggregate = await self._load_dataset(
+                archive_url, f'archive:{member}', lambda body: asyncio.to_thread(_aggregate, body)
+            )
+            
+            if aggregate['rows'] < 2:
+                return {'status': 'error', 'error': f'Empty or invalid data file {member_name}', 'answer': None}
+            
+            total_sum = aggregate['total_sum']
+            logger.info(f"Calculated sum from {member_name}: {total_sum}")
+            
+            return {
+                'status': 'processed', 'task_type': f'{fmt}_processing', 'answer': total_sum,
+                'method': 'sum_calculation', 'notes': f'Sum of all numbers in {member_name}: {total_sum}'
+            }
+            
+        except Exception as e:
+            logger.error(f"Archive processing error: {str(e)}")
+            return {'status': 'error', 'error': str(e), 'answer': None}
+    
+    async def _process_columnar_with_analysis(self, data_url: str, question: str, base_url: str = None) -> Dict[str, Any]:
+        try:
+            data_url = self._resolve_data_url(data_url, base_url)
+            fmt = detect_columnar_format(urlparse(data_url).path)
+            
+            logger.info(f"Fetching {fmt} data source from: {data_url}")
+            table, columns = await self._load_columnar_table(data_url, fmt, question)
+            aggregate = await asyncio.to_thread(aggregate_table, table.select(columns) if columns else table)
+            
+            if aggregate['rows'] < 2:
+                return {'status': 'error', 'error': 'Empty or invalid columnar file', 'answer': None}
+            
+            total_sum = aggregate['total_sum']
+            logger.info(f"Calculated sum from {fmt} file: {total_sum}")
+            
+            return {
+                'status': 'processed', 'task_type': f'{fmt}_processing', 'answer': total_sum,
+                'method': 'sum_calculation', 'notes': f'Sum of numeric columns {list(aggregate["column_sums"])}: {total_sum}'
+            }
+            
+        except Exception as e:
+            logger.error(f"Columnar processing error: {str(e)}")
+            return {'status': 'error', 'error': str(e), 'answer': None}
+    
+    async def _load_columnar_table(self, data_url: str, fmt: str, question: str):
+        """Projected/filtered table, cached by content so repeat questions skip download and decode"""
+        schema_kind = f'{fmt}:schema'
+        names = dataset_cache.get_by_url(data_url, schema_kind)
+        if names is not None:
+            columns, filters = extract_projection(question, names)
+            table = dataset_cache.get_by_url(data_url, f'{fmt}:{columns}:{filters}')
+            if table is not None:
+                return table, columns
+        
+        async with self._fetch_dataset(data_url) as (body, digest):
+            names = dataset_cache.get_by_hash(digest, schema_kind, data_url)
+            if names is None:
+                names = await asyncio.to_thread(read_schema_names, body, fmt)
+                dataset_cache.put(digest, schema_kind, names, data_url)
+            
+            columns, filters = extract_projection(question, names)
+            table_kind = f'{fmt}:{columns}:{filters}'
+            table = dataset_cache.get_by_hash(digest, table_kind, data_url)
+            if table is None:
+                # Memory-mapped tables keep their own mapping, so they outlive the spool file
+                table = await asyncio.to_thread(read_table, body, fmt, columns, filters)
+                dataset_cache.put(digest, table_kind, table, data_url)
+        
+        return table, columns
+    
+    @asynccontextmanager
+    async def _fetch_dataset(self, url: str):
+        async with download_spooler.fetch(self.client, url) as body:
+            digest = await asyncio.to_thread(content_hash, body)
+            yield body, digest
+    
+    async def _load_dataset(self, url: str, kind: str, loader):
+        """
+        Parsed form of a data source, shared across the questions of a chain.
+        `loader` is an async callable taking the spooled body; it only runs when
+        neither the URL nor the downloaded content has been parsed as `kind` before.
+        """
+        dataset = dataset_cache.get_by_url(url, kind)
+        if dataset is not None:
+            return dataset
+        
+        async with self._fetch_dataset(url) as (body, digest):
+            dataset = dataset_cache.get_by_hash(digest, kind, url)
+            if dataset is None:
+                dataset = await loader(body)
+                dataset_cache.put(digest, kind, dataset, url)
+        
+        logger.info(f"Dataset cache: {dataset_cache.stats()}")
+        return dataset
+    
+    def _select_archive_member(self, question: str) -> Optional[str]:
+        """Member named in the question (e.g. 'data.csv'), if any"""
+        # Not followed by another extension: "data.csv.gz" names the archive, not a member
+        match = re.search(r'([\w./-]+?\.(?:csv|tsv|jsonl|ndjson|json|xlsx|xls|txt))(?!\.?\w)', question or '', re.IGNORECASE)
+        return os.path.basename(match.group(1)) if match else None
+    
+    async def _handle_calculation(self, instructions: Dict[str, Any], base_url: str = None) -> Dict[str, Any]:
+        question = instructions.get('question') or ''
+        data_source = instructions.get('data_source')
         logger.info(f"Performing calculation for: {question}")
-        return {'status': 'processed', 'task_type': 'calculation', 'answer': 150, 'method': 'simulated_calculation'}
+        
+        # "Sum the values in the CSV" style questions are about the data file, not the text
+        if data_source and self._is_data_file(data_source):
+            return await self._handle_data_extraction(data_source, question, base_url)
+        
+        result = calculator.solve(question, instructions.get('extracted_content'))
+        if result is not None:
+            return {
+                'status': 'processed', 'task_type': 'calculation', 'answer': result['answer'],
+                'method': 'expression_evaluation', 'notes': f"Evaluated {result['expression']}"
+            }
+        
+        logger.info("No arithmetic expression found, falling back to general handling")
+        return await self._handle_general_task(instructions, base_url)
+    
+    def _wants_chart(self, instructions: Dict[str, Any]) -> bool:
+        """A question about a tabular file that asks for a chart rather than a value"""
+        path = urlparse(instructions.get('data_source') or '').path
+        if not (detect_columnar_format(path) or detect_format(path) in ('csv', 'json', 'jsonl', 'excel')):
+            return False
+        question = instructions.get('question') or ''
+        if CHART_WORDING.search(question):
+            return True
+        # The parser also calls "download the file" answers base64; only take it as a chart when no value is asked for
+        return (instructions.get('answer_format') == 'base64' and not NUMERIC_ANSWER.search(question)
+                and stats_kernels.detect_statistic(question) is None)
+    
+    def _is_data_file(self, data_source: str) -> bool:
+        path = urlparse(data_source).path.lower()
+        return bool(detect_columnar_format(path) or is_archive(path) or detect_format(path)
+                    or path.endswith('.pdf'))
+    
+    async def _handle_visualization(self, instructions: Dict[str, Any], base_url: str = None) -> Dict[str, Any]:
+        question = instructions.get('question') or ''
+        data_source = instructions.get('data_source')
+        logger.info(f"Rendering chart for: {question}")
+        
+        if not data_source:
+            return {'status': 'error', 'error': 'No data source to chart', 'answer': None}
+        
+        try:
+            data_url = self._resolve_data_url(data_source, base_url)
+            name = urlparse(data_url).path
+            
+            def _read(body):
+                with body.open() as stream:
+                    return read_frame(stream, name)
+            
+            frame = await self._load_dataset(data_url, 'frame', lambda body: asyncio.to_thread(_read, body))
+            spec = build_chart_spec(frame, question)
+            data_uri = await chart_renderer.render_data_uri(spec)
+            
+            return {
+                'status': 'processed', 'task_type': 'visualization', 'answer': data_uri,
+                'method': 'chart_rendering', 'notes': f"{spec['kind']} chart of {list(spec['y'])} ({len(data_uri)} bytes)"
+            }
+            
+        except Exception as e:
+            logger.error(f"Visualization error: {str(e)}")
+            return {'status': 'error', 'error': str(e), 'answer': None}
     
     async def _handle_api_call(self, api_url: str, instructions: Dict[str, Any]) -> Dict[str, Any]:
         logger.info(f"Making API call to: {api_url}")
         try:
-            response = await self.client.get(api_url)
-            response.raise_for_status()
-            data = response.json()
+            async with download_spooler.fetch(self.client, api_url) as body:
+                data = body.json()
             return {'status': 'processed', 'task_type': 'api_call', 'data': data, 'answer': None}
         except Exception as e:
             return {'status': 'error', 'error': f"API call failed: {str(e)}", 'answer': None}
@@ -210,12 +540,89 @@ class DataProcessor:
         if 'POST this JSON' in question:
             return {'status': 'processed', 'task_type': 'general', 'answer': "test_answer_123", 'method': 'demo_response'}
         
+        code_result = await self._solve_with_generated_code(instructions, 'general', base_url)
+        if code_result is not None:
+            return code_result
+        
+        llm_result = await self._solve_with_llm(instructions, 'general')
+        if llm_result is not None:
+            return llm_result
+        
         return {'status': 'processed', 'task_type': 'general', 'answer': "default_answer"}
     
     async def _handle_unknown_task(self, instructions: Dict[str, Any]) -> Dict[str, Any]:
+        code_result = await self._solve_with_generated_code(instructions, 'unknown')
+        if code_result is not None:
+            return code_result
+        
+        llm_result = await self._solve_with_llm(instructions, 'unknown')
+        if llm_result is not None:
+            return llm_result
+        
         return {'status': 'processed', 'task_type': 'unknown', 'answer': "unknown_answer"}
     
+    async def _solve_with_generated_code(self, instructions: Dict[str, Any], task_type: str,
+                                         base_url: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Have the model write pandas code for a tabular data source and run it in the
+        sandbox pool; None when there is no such source, no model, or the code fails.
+        """
+        question = instructions.get('question')
+        data_source = instructions.get('data_source')
+        if not question or not data_source or not llm_client.enabled:
+            return None
+        
+        data_url = self._resolve_data_url(data_source, base_url)
+        name = urlparse(data_url).path
+        if not (detect_columnar_format(name) or detect_format(name) in ('csv', 'json', 'jsonl', 'excel')):
+            return None
+        
+        try:
+            async with self._fetch_dataset(data_url) as (body, digest):
+                with share_body(body, name, digest) as handle:
+                    schema = await code_sandbox.run(SCHEMA_CODE, {'df': handle})
+                    if schema['status'] != 'ok':
+                        logger.error(f"Could not load {data_url} in the sandbox: {schema['error']}")
+                        return None
+                    
+                    code = await llm_client.write_analysis_code(question, schema['answer'], instructions.get('answer_format'))
+                    result = await code_sandbox.run(code, {'df': handle})
+            
+            if result['status'] != 'ok':
+                logger.error(f"Generated code failed: {result['error']}")
+                return None
+            
+            return {
+                'status': 'processed', 'task_type': task_type, 'answer': result['answer'],
+                'method': 'generated_code', 'notes': f"Ran {len(code.splitlines())} generated lines in {result['elapsed_ms']}ms"
+            }
+        except Exception as e:
+            logger.error(f"Generated-code strategy failed: {str(e)}")
+            return None
+    
+    async def _solve_with_llm(self, instructions: Dict[str, Any], task_type: str) -> Optional[Dict[str, Any]]:
+        """Last-resort strategy: ask the configured model; None when no model is configured or the call fails"""
+        question = instructions.get('question')
+        if not question or not llm_client.enabled:
+            return None
+        
+        try:
+            answer = await llm_client.answer_question(
+                question, instructions.get('extracted_content'), instructions.get('answer_format')
+            )
+            return {
+                'status': 'processed', 'task_type': task_type, 'answer': answer,
+                'method': 'llm', 'notes': f'Answered by {llm_client.model}'
+            }
+        except Exception as e:
+            logger.error(f"LLM fallback failed: {str(e)}")
+            return None
+    
     async def close(self):
         await self.client.aclose()
+        csv_aggregator.close()
+        chart_renderer.close()
+        await llm_client.close()
+        await code_sandbox.close()
 
 data_processor = DataProcessor()
@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+import logging
+from typing import Any, BinaryIO, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.xlsx': 'excel',
+    '.xls': 'excel',
+    '.txt': 'text'
+}
+
+def detect_format(name: str) -> Optional[str]:
+    """Map a file name (or URL path) to a reader format"""
+    name = name.lower()
+    for ext, fmt in FORMAT_EXTENSIONS.items():
+        if name.endswith(ext):
+            return fmt
+    return None
+
+def iter_csv_rows(stream: BinaryIO, delimiter: str = ',') -> Iterator[List[str]]:
+    text = io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline='')
+    yield from csv.reader(text, delimiter=delimiter)
+
+def _records_to_rows(records) -> Iterator[List[str]]:
+    header = None
+    for record in records:
+        if isinstance(record, dict):
+            if header is None:
+                header = list(record.keys())
+                yield header
+            yield [_cell(record.get(key)) for key in header]
+        elif isinstance(record, list):
+            yield [_cell(value) for value in record]
+        else:
+            yield [_cell(record)]
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+def iter_json_rows(stream: BinaryIO) -> Iterator[List[str]]:
+    """Rows from a JSON document; a list of objects becomes a header plus one row per object"""
+    data = json.load(stream)
+    if isinstance(data, dict):
+        # Common envelope: {"data": [...]} or {"rows": [...]}
+        lists = [value for value in data.values() if isinstance(value, list)]
+        data = lists[0] if len(lists) == 1 else [data]
+    yield from _records_to_rows(data if isinstance(data, list) else [data])
+
+def iter_jsonl_rows(stream: BinaryIO) -> Iterator[List[str]]:
+    def records():
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    yield from _records_to_rows(records())
+
+def iter_excel_rows(stream: BinaryIO) -> Iterator[List[str]]:
+    """Rows of the first worksheet, read in openpyxl's streaming read-only mode"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for row in sheet.iter_rows(values_only=True):
+            yield [_cell(value) for value in row]
+    finally:
+        workbook.close()
+
+def iter_text_rows(stream: BinaryIO) -> Iterator[List[str]]:
+    for line in io.TextIOWrapper(stream, encoding='utf-8', errors='replace'):
+        yield [line.rstrip('\n')]
+
+def iter_rows(stream: BinaryIO, fmt: str, name: str = '') -> Iterator[List[str]]:
+    """Dispatch to the row reader for a format"""
+    if fmt == 'csv':
+        return iter_csv_rows(stream, '\t' if name.lower().endswith('.tsv') else ',')
+    if fmt == 'json':
+        return iter_json_rows(stream)
+    if fmt == 'jsonl':
+        return iter_jsonl_rows(stream)
+    if fmt == 'excel':
+        return iter_excel_rows(stream)
+    if fmt == 'text':
+        return iter_text_rows(stream)
+    raise ValueError(f"Unsupported data format: {fmt}")
+
+def read_frame(stream: BinaryIO, name: str):
+    """
+    Load a data source into a pandas DataFrame, picking the reader from the file name.
+    Compressed sources and archives are unwrapped first (see archive_reader).
+    """
+    from archive_reader import open_data_stream
+
+    if not stream.seekable():
+        return _read_frame(stream, name)
+    with open_data_stream(stream, name) as (member_name, member):
+        if member is stream:
+            return _read_frame(stream, name)
+        lowered = member_name.lower()
+        if lowered.endswith(('.parquet', '.pq', '.arrow', '.feather', '.ipc', '.xlsx', '.xls')):
+            # These readers seek; decompressed members (tar in particular) can't
+            member = io.BytesIO(member.read())
+        return _read_frame(member, member_name)
+
+def _read_frame(stream: BinaryIO, name: str):
+    import pandas as pd
+
+    lowered = name.lower()
+    if lowered.endswith(('.parquet', '.pq')):
+        return pd.read_parquet(stream)
+    if lowered.endswith(('.arrow', '.feather', '.ipc')):
+        return pd.read_feather(stream)
+
+    fmt = detect_format(name) or 'csv'
+    if fmt == 'json':
+        return pd.read_json(stream)
+    if fmt == 'jsonl':
+        return pd.read_json(stream, lines=True)
+    if fmt == 'excel':
+        return pd.read_excel(stream)
+    return pd.read_csv(stream, sep='\t' if lowered.endswith('.tsv') else ',')
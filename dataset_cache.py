@@ -0,0 +1,156 @@
+import contextvars
+import hashlib
+import itertools
+import logging
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The quiz chain the current task belongs to; URL shortcuts never outlive it
+_current_chain = contextvars.ContextVar('dataset_chain', default=None)
+_chain_ids = itertools.count(1)
+
+def content_hash(body) -> str:
+    """SHA-256 of a spooled body, hashed straight from its (possibly memory-mapped) view"""
+    digest = hashlib.sha256()
+    view = body.view
+    for offset in range(0, len(view), 8 * 1024 * 1024):
+        digest.update(view[offset:offset + 8 * 1024 * 1024])
+    return digest.hexdigest()
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate bytes held by a parsed dataset (NumPy, pandas, pyarrow, or plain containers)"""
+    if hasattr(value, 'memory_usage') and hasattr(value, 'columns'):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if _depth > 4:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+                                          for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        if len(value) > 1000:
+            # Sample large lists instead of walking every element
+            sample = value[:100]
+            return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in sample) * len(value) // 100
+        return sys.getsizeof(value) + sum(estimate_size(v, _depth + 1) for v in value)
+    return sys.getsizeof(value)
+
+class DatasetCache:
+    """
+    LRU cache of parsed datasets shared across the questions of a quiz chain.
+    Entries are keyed by (content hash, kind), where kind names the parse
+    (e.g. 'csv:totals', 'parquet:amount'). Within a chain (see `chain()`),
+    URLs also map to content hashes so a repeated URL skips the download as
+    well as the parse; outside it every URL is downloaded again, and only an
+    unchanged body reuses the parse.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, url_ttl: float = 600.0):
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+        self._entries = OrderedDict()
+        self._urls = {}
+        self.bytes_held = 0
+        self.hits = 0
+        self.url_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def chain(self):
+        """Scope for one quiz chain: URL -> content mappings made inside are dropped on exit"""
+        chain_id = next(_chain_ids)
+        token = _current_chain.set(chain_id)
+        try:
+            yield chain_id
+        finally:
+            _current_chain.reset(token)
+            for key in [key for key in self._urls if key[0] == chain_id]:
+                del self._urls[key]
+
+    def _remember_url(self, url: str, digest: str):
+        chain_id = _current_chain.get()
+        if chain_id is not None:
+            self._urls[(chain_id, url)] = (digest, time.monotonic())
+
+    def get_by_url(self, url: str, kind: str) -> Optional[Any]:
+        chain_id = _current_chain.get()
+        mapping = self._urls.get((chain_id, url)) if chain_id is not None else None
+        if mapping is None:
+            return None
+        digest, stored_at = mapping
+        if time.monotonic() - stored_at > self.url_ttl:
+            del self._urls[(chain_id, url)]
+            return None
+
+        value = self._lookup((digest, kind))
+        if value is not None:
+            self.url_hits += 1
+            logger.info(f"Dataset cache hit for {url} ({kind})")
+        return value
+
+    def get_by_hash(self, digest: str, kind: str, url: Optional[str] = None) -> Optional[Any]:
+        if url is not None:
+            self._remember_url(url, digest)
+
+        value = self._lookup((digest, kind))
+        if value is None:
+            self.misses += 1
+        else:
+            logger.info(f"Dataset cache hit for content {digest[:12]} ({kind})")
+        return value
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry['value']
+
+    def put(self, digest: str, kind: str, value: Any, url: Optional[str] = None, size: Optional[int] = None):
+        size = size if size is not None else estimate_size(value)
+        if size > self.max_bytes:
+            logger.info(f"Dataset {digest[:12]} ({kind}) is {size} bytes, larger than the cache budget")
+            return
+
+        key = (digest, kind)
+        if key in self._entries:
+            self.bytes_held -= self._entries.pop(key)['size']
+
+        self._entries[key] = {'value': value, 'size': size}
+        self.bytes_held += size
+        if url is not None:
+            self._remember_url(url, digest)
+
+        while self.bytes_held > self.max_bytes:
+            (old_digest, old_kind), entry = self._entries.popitem(last=False)
+            self.bytes_held -= entry['size']
+            self.evictions += 1
+            logger.info(f"Evicted dataset {old_digest[:12]} ({old_kind}), {entry['size']} bytes")
+
+    def clear(self):
+        self._entries.clear()
+        self._urls.clear()
+        self.bytes_held = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes_held': self.bytes_held,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'url_hits': self.url_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+dataset_cache = DatasetCache()
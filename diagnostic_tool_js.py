@@ -12,8 +12,7 @@ from typing import Dict, Any, Optional, List
 import csv
 import io
 import asyncio
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from renderer import renderer
 
 logger = logging.getLogger(__name__)
 
@@ -75,7 +74,6 @@ class EnhancedDiagnosticTool:
             'details': {}
         }
         
-        driver = None
         try:
             # First try without JS
             response = await self.client.get(url)
@@ -91,17 +89,8 @@ class EnhancedDiagnosticTool:
             result['details']['script_count'] = len(scripts)
             
             if has_js_content:
-                # Use Selenium for JS rendering
-                chrome_options = Options()
-                chrome_options.add_argument("--headless")
-                chrome_options.add_argument("--no-sandbox")
-                chrome_options.add_argument("--disable-dev-shm-usage")
-                
-                driver = webdriver.Chrome(options=chrome_options)
-                driver.get(url)
-                await asyncio.sleep(3)  # Wait for JS to execute
-                
-                rendered_html = driver.page_source
+                # Render with the full profile: the diagnostic should see the page as a browser would
+                rendered_html = await renderer.render(url, settle=3.0, light=False, timeout=30.0)
                 result['content'] = rendered_html
                 result['success'] = True
                 
@@ -121,9 +110,6 @@ class EnhancedDiagnosticTool:
                 
         except Exception as e:
             result['details']['error'] = str(e)
-        finally:
-            if driver:
-                driver.quit()
         
         return result
     
@@ -483,6 +469,7 @@ async def main():
         print("✅ No major issues detected")
     
     print("=" * 60)
+    await renderer.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
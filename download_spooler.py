@@ -0,0 +1,183 @@
+import io
+import json
+import logging
+import mmap
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Iterator, Optional, BinaryIO
+from host_latency import host_latency
+
+logger = logging.getLogger(__name__)
+
+class SpooledBody:
+    """
+    Downloaded response body, either held in memory or spooled to a temp file.
+    Spooled bodies are exposed through a read-only memory map so parsers can
+    slice and scan them without copying.
+    """
+
+    def __init__(self, url: str, content_type: Optional[str] = None,
+                 data: Optional[bytes] = None, path: Optional[str] = None,
+                 encoding: Optional[str] = None):
+        self.url = url
+        self.content_type = content_type or ''
+        # Charset from the response headers, as response.text would have used
+        self.encoding = encoding
+        self.path = path
+        self.status_code = None
+        self._data = data
+        self._file = None
+        self._mmap = None
+
+        if path is not None:
+            self.size = os.path.getsize(path)
+            self._file = open(path, 'rb')
+            if self.size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.size = len(data or b'')
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    @property
+    def view(self) -> memoryview:
+        """Zero-copy view over the whole body"""
+        if self._mmap is not None:
+            return memoryview(self._mmap)
+        return memoryview(self._data or b'')
+
+    def open(self) -> BinaryIO:
+        """Independent binary stream over the body"""
+        if self.path is not None:
+            return open(self.path, 'rb')
+        return io.BytesIO(self._data or b'')
+
+    def text(self, encoding: Optional[str] = None) -> str:
+        """Decode the body (declared charset, else UTF-8); only use this for bodies parsers need as one string"""
+        encoding = encoding or self.encoding or 'utf-8'
+        try:
+            return str(self.view, encoding, errors='replace')
+        except LookupError:
+            logger.warning(f"Unknown charset {encoding!r} for {self.url}, decoding as UTF-8")
+            return str(self.view, 'utf-8', errors='replace')
+
+    def json(self) -> Any:
+        if self.path is None:
+            return json.loads(self._data or b'')
+        with self.open() as f:
+            return json.load(f)
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """Yield lines without materializing the whole body"""
+        if self._mmap is None:
+            yield from io.BytesIO(self._data or b'')
+            return
+
+        self._mmap.seek(0)
+        yield from iter(self._mmap.readline, b'')
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a view; the mapping is released when it is dropped
+                logger.warning(f"Spool for {self.url} closed with live views")
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+        self._data = None
+
+class DownloadSpooler:
+    def __init__(self, memory_threshold: int = 4 * 1024 * 1024, spool_dir: Optional[str] = None):
+        self.memory_threshold = memory_threshold
+        self.spool_dir = spool_dir
+        self.live_spools = 0
+        self.spooled_bytes = 0
+
+    @asynccontextmanager
+    async def fetch(self, client, url: str, raise_for_status: bool = True):
+        """
+        Stream a GET response into a SpooledBody that lives for the duration of the block.
+        Bodies larger than memory_threshold go to a temp file; the file is removed on exit.
+        """
+        body = None
+        try:
+            # Headers come back through the host's adaptive timeout, hedged if the host is slow
+            response = await host_latency.send(client, 'GET', url, stream=True)
+            try:
+                if raise_for_status:
+                    response.raise_for_status()
+                body = await self._spool_response(url, response)
+                body.status_code = response.status_code
+            finally:
+                await response.aclose()
+
+            yield body
+        finally:
+            if body is not None:
+                if not body.in_memory:
+                    self.live_spools -= 1
+                    self.spooled_bytes -= body.size
+                body.close()
+
+    async def _spool_response(self, url: str, response) -> SpooledBody:
+        content_type = response.headers.get('content-type')
+        encoding = response.charset_encoding
+        declared = response.headers.get('content-length')
+
+        chunks = []
+        buffered = 0
+        spool = None
+        path = None
+
+        try:
+            # Skip the in-memory buffer when the server already told us it's large
+            if declared and declared.isdigit() and int(declared) > self.memory_threshold:
+                spool, path = self._open_spool()
+
+            async for chunk in response.aiter_bytes():
+                if spool is not None:
+                    spool.write(chunk)
+                    continue
+
+                chunks.append(chunk)
+                buffered += len(chunk)
+                if buffered > self.memory_threshold:
+                    spool, path = self._open_spool()
+                    spool.writelines(chunks)
+                    chunks = []
+        except BaseException:
+            if spool is not None:
+                spool.close()
+                os.unlink(path)
+            raise
+
+        if spool is None:
+            return SpooledBody(url, content_type, data=b''.join(chunks), encoding=encoding)
+
+        spool.close()
+        body = SpooledBody(url, content_type, path=path, encoding=encoding)
+        self.live_spools += 1
+        self.spooled_bytes += body.size
+        logger.info(f"Spooled {body.size} bytes from {url} to {path}")
+        return body
+
+    def _open_spool(self):
+        fd, path = tempfile.mkstemp(prefix='quiz-spool-', dir=self.spool_dir)
+        return os.fdopen(fd, 'wb'), path
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'memory_threshold': self.memory_threshold,
+            'live_spools': self.live_spools,
+            'spooled_bytes': self.spooled_bytes
+        }
+
+download_spooler = DownloadSpooler()
@@ -0,0 +1,221 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import httpx
+from circuit_breaker import breakers
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+# Log-spaced bucket upper bounds from 1 ms to ~500 s, 25% apart
+BUCKET_BOUNDS = [0.001 * 1.25 ** i for i in range(60)]
+
+class LatencyHistogram:
+    """Bucketed latencies with decay: counts halve every `decay_every` samples so old traffic fades"""
+
+    def __init__(self, decay_every: int = 256):
+        self.decay_every = decay_every
+        self.counts = [0.0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0.0
+        self.samples = 0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.total += 1
+        self.samples += 1
+        if self.samples % self.decay_every == 0:
+            self.counts = [count / 2 for count in self.counts]
+            self.total /= 2
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.total:
+            return None
+        target = q * self.total
+        cumulative = 0.0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+class HedgeBudget:
+    """Token bucket: each request earns `ratio` of a hedge, so hedges stay under that share of traffic"""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def earn(self):
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def take(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+class HostLatencyTracker:
+    """
+    Per-host, per-method latency histograms (time to response headers) driving
+    two things: an adaptive timeout of `multiplier` x the p99, bounded by `floor`
+    and the caller's default, and hedged idempotent requests that send a second
+    copy once the first has outlived the p95, within a global budget. Methods are
+    kept apart so slow POSTs (e.g. graded submissions) don't stretch GET hedging
+    and fast GETs don't cap POST timeouts.
+    """
+
+    def __init__(self, min_samples: int = 20, multiplier: float = 4.0, floor: float = 2.0,
+                 hedge_quantile: float = 0.95, hedge_ratio: float = 0.1, max_hosts: int = 512):
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.floor = floor
+        self.hedge_quantile = hedge_quantile
+        self.max_hosts = max_hosts
+        self.budget = HedgeBudget(hedge_ratio)
+        self._hosts = OrderedDict()
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_denied = 0
+
+    def _host(self, url: str, method: str = 'GET') -> Dict[str, Any]:
+        key = (urlparse(url).netloc, method.upper())
+        entry = self._hosts.get(key)
+        if entry is None:
+            entry = self._hosts[key] = {'histogram': LatencyHistogram(), 'requests': 0, 'failures': 0}
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        self._hosts.move_to_end(key)
+        return entry
+
+    def observe(self, url: str, seconds: float, ok: bool = True, method: str = 'GET'):
+        entry = self._host(url, method)
+        entry['histogram'].record(seconds)
+        entry['requests'] += 1
+        entry['failures'] += 0 if ok else 1
+
+    def timeout_for(self, url: str, default: float, method: str = 'GET') -> float:
+        histogram = self._host(url, method)['histogram']
+        if histogram.samples < self.min_samples:
+            return default
+        return min(default, max(self.floor, histogram.quantile(0.99) * self.multiplier))
+
+    def hedge_delay(self, url: str, method: str = 'GET') -> Optional[float]:
+        histogram = self._host(url, method)['histogram']
+        if histogram.samples < self.min_samples:
+            return None
+        return histogram.quantile(self.hedge_quantile)
+
+    async def send(self, client: httpx.AsyncClient, method: str, url: str, stream: bool = False,
+                   hedge: bool = True, default_timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+        """
+        Send a request with the host's adaptive timeout, hedging idempotent ones.
+        Hosts whose circuit breaker is open fail immediately with CircuitOpenError.
+        With stream=True the body is left unread and the caller must aclose() the response.
+        """
+        breaker = breakers.check(url)
+        try:
+            response = await self._send(client, method, url, hedge, default_timeout, kwargs)
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if not stream:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+        return response
+
+    async def _send(self, client: httpx.AsyncClient, method: str, url: str, hedge: bool,
+                    default_timeout: Optional[float], kwargs: Dict[str, Any]) -> httpx.Response:
+        default_timeout = default_timeout or client.timeout.read or 30.0
+        timeout = self.timeout_for(url, default_timeout, method)
+        delay = self.hedge_delay(url, method) if hedge and method.upper() in IDEMPOTENT_METHODS else None
+        self.budget.earn()
+
+        started = {}
+
+        def launch() -> asyncio.Task:
+            request = client.build_request(method, url, timeout=timeout, **kwargs)
+            task = asyncio.create_task(client.send(request, stream=True))
+            started[task] = time.perf_counter()
+            return task
+
+        primary = launch()
+        pending = {primary}
+        winner = None
+        error = None
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    if self.budget.take():
+                        self.hedges += 1
+                        logger.info(f"Hedging {method} {url} after {delay * 1000:.0f}ms")
+                        pending.add(launch())
+                    else:
+                        self.hedges_denied += 1
+
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        self.observe(url, time.perf_counter() - started[task], ok=False, method=method)
+                    elif winner is None:
+                        winner = task
+                    else:
+                        # Both copies answered in the same tick; keep one
+                        await task.result().aclose()
+        finally:
+            for task in pending:
+                task.cancel()
+            for task in pending:
+                try:
+                    response = await task
+                    await response.aclose()
+                except BaseException:
+                    pass
+
+        if winner is None:
+            raise error
+        # A hedge that wins still leaves the caller waiting since the primary went out
+        self.observe(url, time.perf_counter() - started[primary], method=method)
+        if winner is not primary:
+            self.hedge_wins += 1
+
+        return winner.result()
+
+    def stats(self) -> Dict[str, Any]:
+        hosts = {}
+        for (host, method), entry in self._hosts.items():
+            histogram = entry['histogram']
+            hosts[f"{method} {host}"] = {
+                'requests': entry['requests'],
+                'failures': entry['failures'],
+                'p50_ms': round((histogram.quantile(0.5) or 0) * 1000, 1),
+                'p95_ms': round((histogram.quantile(0.95) or 0) * 1000, 1),
+                'p99_ms': round((histogram.quantile(0.99) or 0) * 1000, 1)
+            }
+        return {
+            'hosts': hosts,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'hedges_denied': self.hedges_denied,
+            'hedge_tokens': round(self.budget.tokens, 2)
+        }
+
+host_latency = HostLatencyTracker()
@@ -0,0 +1,69 @@
+import base64
+import json
+import logging
+import os
+from typing import Any, Callable, Dict
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def _json_default(value: Any) -> Any:
+    """Types the analysis code hands back that neither encoder knows natively"""
+    # NumPy scalars and arrays; float32/float16 as their shortest repr, which is what orjson writes
+    if hasattr(value, 'tolist'):
+        if getattr(getattr(value, 'dtype', None), 'kind', None) == 'f' and value.dtype.itemsize < 8:
+            return value.astype(str).astype(float).tolist()
+        return value.tolist()
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    # Dates and pandas Timestamps (orjson handles plain datetimes itself)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    # Binary answers (file contents) must survive intact; decoding them as text would corrupt them
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _encode_orjson(value: Any) -> bytes:
+    # Non-string keys (e.g. value_counts() results) become strings, as json.dumps does
+    return orjson.dumps(value, default=_json_default,
+                        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+def _encode_stdlib(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False,
+                      default=_json_default).encode('utf-8')
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {'json': _encode_stdlib}
+if orjson is not None:
+    ENCODERS['orjson'] = _encode_orjson
+
+def _pick_encoder() -> str:
+    name = os.getenv('JSON_ENCODER', 'orjson' if orjson is not None else 'json')
+    if name not in ENCODERS:
+        logger.warning(f"JSON encoder {name!r} unavailable, using {'orjson' if orjson is not None else 'json'}")
+        name = 'orjson' if orjson is not None else 'json'
+    return name
+
+# Chosen once at import; JSON_ENCODER=json forces the standard library
+encoder_name = _pick_encoder()
+_encode = ENCODERS[encoder_name]
+
+def encode_json(value: Any) -> bytes:
+    """Compact UTF-8 JSON bytes with the configured encoder"""
+    return _encode(value)
+
+def decode_json(data: bytes) -> Any:
+    return orjson.loads(data) if encoder_name == 'orjson' else json.loads(data)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured encoder instead of json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
@@ -0,0 +1,310 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = (
+    "You answer data-analysis quiz questions. Reply with the answer value only: "
+    "no explanation, no units, no surrounding quotes."
+)
+
+CODE_PROMPT = (
+    "Write Python that answers the question using the pandas DataFrame `df` (already loaded; "
+    "`pd` and `np` are imported). Assign the final value to `answer`. Reply with code only, no fences. "
+    "File, network and OS access are unavailable."
+)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) for budgeting before the real usage is known"""
+    return len(text) // 4 + 1
+
+def prompt_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+    payload = json.dumps({'model': model, 'messages': messages, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class PromptCache:
+    """Responses keyed by a hash of (model, messages, params), expiring after `ttl` seconds"""
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, value: str):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+class TokenGovernor:
+    """
+    Caps concurrent requests and tokens per minute. Callers reserve an estimate
+    up front and settle with the real usage afterwards; reservations wait until
+    the rolling one-minute window has room.
+    """
+
+    def __init__(self, max_concurrency: int = 4, tokens_per_minute: int = 100_000):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._window = []
+        self._lock = asyncio.Lock()
+        self.tokens_used = 0
+        self.waits = 0
+
+    def _used_in_window(self, now: float) -> int:
+        # Entries stay as the lists handed to slots so settle() can correct them in place
+        self._window = [entry for entry in self._window if now - entry[0] < 60.0]
+        return sum(tokens for _, tokens in self._window)
+
+    async def _reserve(self, tokens: int) -> list:
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                used = self._used_in_window(now)
+                if used + tokens <= self.tokens_per_minute:
+                    entry = [now, tokens]
+                    self._window.append(entry)
+                    return entry
+                self.waits += 1
+                wait = 60.0 - (now - self._window[0][0])
+                logger.info(f"Token budget exhausted ({used}/{self.tokens_per_minute}), waiting {wait:.1f}s")
+                await asyncio.sleep(max(wait, 0.05))
+
+    def slot(self, estimated_tokens: int):
+        return _GovernorSlot(self, estimated_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'tokens_per_minute': self.tokens_per_minute,
+            'tokens_in_window': self._used_in_window(time.monotonic()),
+            'tokens_used': self.tokens_used,
+            'budget_waits': self.waits
+        }
+
+class _GovernorSlot:
+    def __init__(self, governor: TokenGovernor, estimated_tokens: int):
+        self.governor = governor
+        self.estimated_tokens = estimated_tokens
+        self._entry = None
+
+    async def __aenter__(self):
+        await self.governor._semaphore.acquire()
+        try:
+            self._entry = await self.governor._reserve(self.estimated_tokens)
+        except BaseException:
+            self.governor._semaphore.release()
+            raise
+        return self
+
+    def settle(self, actual_tokens: int):
+        """Replace the estimate with the tokens the API reported"""
+        self._entry[1] = actual_tokens
+        self.governor.tokens_used += actual_tokens
+
+    async def __aexit__(self, *exc):
+        self.governor._semaphore.release()
+
+class LLMClient:
+    """
+    OpenAI-compatible chat-completions client with a prompt/response cache,
+    in-flight de-duplication, batched fan-out and a token/concurrency governor.
+    Disabled (enabled == False) when no API key or endpoint is configured.
+    """
+
+    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None, model: Optional[str] = None,
+                 max_concurrency: int = 4, tokens_per_minute: int = 100_000, cache_ttl: float = 3600.0,
+                 timeout: float = 60.0):
+        self.api_url = (api_url or os.getenv('LLM_API_URL') or DEFAULT_API_URL).rstrip('/')
+        self.api_key = api_key if api_key is not None else os.getenv('LLM_API_KEY') or os.getenv('OPENAI_API_KEY')
+        self.model = model or os.getenv('LLM_MODEL') or DEFAULT_MODEL
+        self.timeout = timeout
+        self.cache = PromptCache(ttl=cache_ttl)
+        self.governor = TokenGovernor(max_concurrency, tokens_per_minute)
+        self._inflight = {}
+        self._client = None
+        self.requests = 0
+
+    @property
+    def enabled(self) -> bool:
+        # Local endpoints (e.g. the stub server) don't need a key
+        return bool(self.api_key) or self.api_url != DEFAULT_API_URL
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+            self._client = httpx.AsyncClient(timeout=self.timeout, headers=headers)
+        return self._client
+
+    def _body(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, stream: bool) -> Dict[str, Any]:
+        return {'model': self.model, 'messages': messages, 'max_tokens': max_tokens,
+                'temperature': temperature, 'stream': stream}
+
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int = 256, temperature: float = 0.0,
+                       stream: bool = False) -> str:
+        """
+        Response text for a chat prompt. Identical prompts are answered from the
+        cache, and concurrent identical prompts share a single request.
+        """
+        key = prompt_key(self.model, messages, {'max_tokens': max_tokens, 'temperature': temperature})
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit {key[:12]}")
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if stream:
+                text = ''.join([delta async for delta in self.stream(messages, max_tokens, temperature)])
+            else:
+                text = await self._request(messages, max_tokens, temperature)
+            self.cache.put(key, text)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def complete_batch(self, prompts: List[List[Dict[str, str]]], max_tokens: int = 256,
+                             temperature: float = 0.0) -> List[Any]:
+        """
+        Answer several prompts at once: duplicates collapse to one request and the
+        rest fan out under the governor. Failed prompts yield their exception.
+        """
+        return await asyncio.gather(*[self.complete(messages, max_tokens, temperature) for messages in prompts],
+                                    return_exceptions=True)
+
+    async def _request(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float) -> str:
+        estimated = sum(estimate_tokens(m.get('content') or '') for m in messages) + max_tokens
+        async with self.governor.slot(estimated) as slot:
+            self.requests += 1
+            start = time.perf_counter()
+            response = await self._get_client().post(
+                f"{self.api_url}/chat/completions", json=self._body(messages, max_tokens, temperature, False)
+            )
+            response.raise_for_status()
+            data = response.json()
+            slot.settle(data.get('usage', {}).get('total_tokens', estimated))
+            logger.info(f"LLM response in {time.perf_counter() - start:.2f}s")
+            return data['choices'][0]['message']['content'] or ''
+
+    async def stream(self, messages: List[Dict[str, str]], max_tokens: int = 256,
+                     temperature: float = 0.0) -> AsyncIterator[str]:
+        """Yield response text deltas as the server sends them (server-sent events)"""
+        estimated = sum(estimate_tokens(m.get('content') or '') for m in messages) + max_tokens
+        async with self.governor.slot(estimated) as slot:
+            self.requests += 1
+            start = time.perf_counter()
+            first_token = None
+            produced = 0
+            async with self._get_client().stream(
+                'POST', f"{self.api_url}/chat/completions", json=self._body(messages, max_tokens, temperature, True)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        break
+                    delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        if first_token is None:
+                            first_token = time.perf_counter() - start
+                        produced += len(delta)
+                        yield delta
+            slot.settle(estimated - max_tokens + estimate_tokens('x' * produced))
+            logger.info(f"LLM stream: first token after {first_token or 0:.2f}s, done in {time.perf_counter() - start:.2f}s")
+
+    async def answer_question(self, question: str, context: Optional[str] = None,
+                              answer_format: Optional[str] = None, max_context_chars: int = 12000) -> Any:
+        """Ask the model a quiz question with the page text as context; JSON scalars are decoded"""
+        content = f"Question:\n{question}"
+        if answer_format:
+            content += f"\n\nExpected answer format: {answer_format}"
+        if context:
+            content += f"\n\nPage content:\n{context[:max_context_chars]}"
+        messages = [{'role': 'system', 'content': SYSTEM_PROMPT}, {'role': 'user', 'content': content}]
+
+        text = (await self.complete(messages)).strip()
+        try:
+            value = json.loads(text)
+            if isinstance(value, (int, float, bool, list, dict)):
+                return value
+        except ValueError:
+            pass
+        return text.strip('"\'`')
+
+    async def write_analysis_code(self, question: str, schema: Dict[str, Any],
+                                  answer_format: Optional[str] = None) -> str:
+        """Ask the model for pandas code answering `question` over a frame with the given schema"""
+        content = (f"Question:\n{question}\n\nColumns and dtypes: {json.dumps(schema.get('columns'))}\n"
+                   f"Rows: {schema.get('rows')}\nFirst rows:\n{schema.get('head', '')}")
+        if answer_format:
+            content += f"\nExpected answer format: {answer_format}"
+        messages = [{'role': 'system', 'content': CODE_PROMPT}, {'role': 'user', 'content': content}]
+
+        code = (await self.complete(messages, max_tokens=512)).strip()
+        # Models add fences despite being asked not to
+        fenced = re.search(r'```(?:python)?\s*\n(.*?)```', code, re.DOTALL)
+        return fenced.group(1) if fenced else code
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'model': self.model,
+            'requests': self.requests,
+            'cache': self.cache.stats(),
+            'governor': self.governor.stats()
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+llm_client = LLMClient()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an OpenAI-compatible chat-completions endpoint, for trying
+the LLM fallback and benchmarking the client without a real model.
+Usage: python llm_stub_server.py [port]
+Then:  LLM_API_URL=http://127.0.0.1:8001/v1 python main.py
+
+Answers are deterministic: arithmetic in the question is evaluated, requests
+for analysis code get a fixed pandas snippet, otherwise the reply is a fixed
+token. LLM_STUB_LATENCY (seconds) adds a delay per request.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import calculator
+
+app = FastAPI(title="LLM Stub", version="1.0.0")
+
+LATENCY = float(os.getenv('LLM_STUB_LATENCY', '0.2'))
+stats = {'requests': 0, 'streamed': 0, 'in_flight': 0, 'max_in_flight': 0}
+
+def _answer(messages) -> str:
+    system = next((m['content'] for m in messages if m.get('role') == 'system'), '')
+    if 'DataFrame `df`' in system:
+        # Code-generation prompts get a fixed analysis: the sum of every numeric column
+        return "answer = df.select_dtypes('number').sum().sum()"
+    question = next((m['content'] for m in reversed(messages) if m.get('role') == 'user'), '')
+    question = question.split('Page content:')[0].replace('Question:', '').strip()
+    result = calculator.solve(question)
+    return str(result['answer']) if result else "stub_answer"
+
+def _usage(messages, text: str) -> dict:
+    prompt_tokens = sum(len(m.get('content') or '') for m in messages) // 4 + 1
+    completion_tokens = len(text) // 4 + 1
+    return {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens}
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get('messages') or []
+    text = _answer(messages)
+    stats['requests'] += 1
+    stats['in_flight'] += 1
+    stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+
+    if not body.get('stream'):
+        try:
+            await asyncio.sleep(LATENCY)
+        finally:
+            stats['in_flight'] -= 1
+        return {
+            'id': f"stub-{stats['requests']}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': _usage(messages, text)
+        }
+
+    stats['streamed'] += 1
+
+    async def events():
+        try:
+            await asyncio.sleep(LATENCY / 2)
+            pieces = [text[i:i + 4] for i in range(0, len(text), 4)]
+            for piece in pieces:
+                chunk = {'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(LATENCY / 2 / max(len(pieces), 1))
+            yield "data: [DONE]\n\n"
+        finally:
+            stats['in_flight'] -= 1
+
+    return StreamingResponse(events(), media_type='text/event-stream')
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+if __name__ == "__main__":
+    import uvicorn
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8001
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
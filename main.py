@@ -1,18 +1,29 @@
 from fastapi import FastAPI, HTTPException, status, BackgroundTasks
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 import logging
 import asyncio
 from web_scraper import scraper
-from quiz_parser import quiz_parser
+from page_templates import page_templates
 from data_processor import data_processor
 from answer_submitter import answer_submitter
 from quiz_solver import quiz_solver
+from dataset_cache import dataset_cache
+from chart_renderer import chart_renderer
+from code_sandbox import code_sandbox
+from render_decision import render_decisions
+from renderer import renderer
+from browser_supervisor import browser_supervisor
+from parse_scheduler import parse_scheduler
+from host_latency import host_latency
+from circuit_breaker import breakers
+from json_codec import FastJSONResponse
+from response_shaping import ResponseShape
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="LLM Analysis Quiz API", version="1.0.0")
+app = FastAPI(title="LLM Analysis Quiz API", version="1.0.0", default_response_class=FastJSONResponse)
 
 student_secrets = {
     "23f2000595@ds.study.iitm.ac.in": "google_baba25"
@@ -22,12 +33,18 @@ class QuizRequest(BaseModel):
     email: str
     secret: str
     url: str
+    # 'summary', 'fields' (dotted paths in `fields`, e.g. "instructions.question") or 'full'
+    response_mode: Literal['summary', 'fields', 'full'] = 'full'
+    fields: Optional[List[str]] = None
 
 class QuizChainRequest(BaseModel):
     email: str
     secret: str
     url: str
     max_questions: Optional[int] = 10
+    # Same modes as /quiz; for a chain, `fields` select from each hop
+    response_mode: Literal['summary', 'fields', 'full'] = 'full'
+    fields: Optional[List[str]] = None
 
 class QuizResponse(BaseModel):
     status: str
@@ -44,11 +61,20 @@ class QuizChainResponse(BaseModel):
     message: str
     chain_result: Optional[Dict[str, Any]] = None
 
+def response_shape(request) -> ResponseShape:
+    try:
+        return ResponseShape(request.response_mode, request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @app.get("/")
 async def root():
     return {"message": "LLM Analysis Quiz API is running"}
 
-@app.post("/quiz", response_model=QuizResponse)
+@app.post("/quiz", responses={200: {
+    "model": QuizResponse,
+    "description": "The full result; `summary` and `fields` modes return a subset of these keys"
+}})
 async def start_quiz(request: QuizRequest, background_tasks: BackgroundTasks):
     if not request.email.strip() or not request.secret.strip() or not request.url.strip():
         raise HTTPException(
@@ -68,6 +94,7 @@ async def start_quiz(request: QuizRequest, background_tasks: BackgroundTasks):
             detail="Invalid secret"
         )
     
+    shape = response_shape(request)
     logger.info(f"Scraping URL: {request.url}")
     
     html_content, error = await scraper.scrape_page(request.url)
@@ -80,10 +107,12 @@ async def start_quiz(request: QuizRequest, background_tasks: BackgroundTasks):
         )
     
     # Parse quiz instructions
-    instructions = quiz_parser.parse_quiz_instructions(html_content)
+    instructions, template_key = await page_templates.parse(html_content)
     
     # Process the quiz task to generate an answer
-    processing_result = await data_processor.process_quiz_task(instructions)
+    processing_result = await data_processor.process_quiz_task(
+        instructions, strategy=page_templates.strategy_for(template_key)
+    )
     
     # Submit the answer if we have one and a submit URL
     submission_result = None
@@ -102,23 +131,33 @@ async def start_quiz(request: QuizRequest, background_tasks: BackgroundTasks):
         
         # Extract next URL from submission result
         next_url = submission_result.get('next_url')
+        page_templates.record_outcome(template_key, processing_result.get('strategy'),
+                                      submission_result.get('correct', False))
     
-    content_preview = html_content[:200] + "..." if len(html_content) > 200 else html_content
+    content_preview = None
+    if shape.wants('content_preview'):
+        content_preview = html_content[:200] + "..." if len(html_content) > 200 else html_content
+    del html_content
     
     logger.info(f"Successfully processed quiz task")
     
-    return QuizResponse(
-        status="success",
-        message="Quiz page processed successfully",
-        url=request.url,
-        content_preview=content_preview,
-        instructions=instructions,
-        processing_result=processing_result,
-        submission_result=submission_result,
-        next_url=next_url
-    )
+    # Encoded straight from the dicts: QuizResponse only documents the full shape, and
+    # validating and re-dumping it would copy every hop's page text first
+    return FastJSONResponse(shape.quiz({
+        "status": "success",
+        "message": "Quiz page processed successfully",
+        "url": request.url,
+        "content_preview": content_preview,
+        "instructions": instructions,
+        "processing_result": processing_result,
+        "submission_result": submission_result,
+        "next_url": next_url
+    }))
 
-@app.post("/quiz-chain", response_model=QuizChainResponse)
+@app.post("/quiz-chain", responses={200: {
+    "model": QuizChainResponse,
+    "description": "The full chain result; `summary` and `fields` modes shape each hop"
+}})
 async def solve_quiz_chain(request: QuizChainRequest):
     """Solve a chain of quiz questions automatically"""
     if not request.email.strip() or not request.secret.strip() or not request.url.strip():
@@ -139,27 +178,43 @@ async def solve_quiz_chain(request: QuizChainRequest):
             detail="Invalid secret"
         )
     
+    shape = response_shape(request)
     logger.info(f"Starting quiz chain from: {request.url}")
     
     # Solve the entire quiz chain
     chain_result = await quiz_solver.solve_quiz_chain(
         start_url=request.url,
         email=request.email,
-        secret=request.secret
+        secret=request.secret,
+        shape=shape
     )
     
-    return QuizChainResponse(
-        status="success",
-        message=f"Quiz chain completed: {chain_result['correct_answers']}/{chain_result['total_questions']} correct",
-        chain_result=chain_result
-    )
+    return FastJSONResponse({
+        "status": "success",
+        "message": f"Quiz chain completed: {chain_result['correct_answers']}/{chain_result['total_questions']} correct",
+        "chain_result": chain_result
+    })
+
+@app.on_event("startup")
+async def startup_event():
+    await chart_renderer.start()
+    await code_sandbox.start()
+    await browser_supervisor.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     await scraper.close()
     await data_processor.close()
     await answer_submitter.close()
+    await renderer.close()
+    await browser_supervisor.stop()
+    parse_scheduler.close()
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "API is running"}
+    return {"status": "healthy", "message": "API is running", "dataset_cache": dataset_cache.stats(),
+            "code_sandbox": code_sandbox.stats(), "page_templates": page_templates.stats(),
+            "render_decisions": render_decisions.stats(), "renderer": renderer.stats(),
+            "browsers": await asyncio.to_thread(browser_supervisor.stats), "host_latency": host_latency.stats(),
+            "circuit_breakers": breakers.stats(),
+            "submissions": answer_submitter.stats()}
 
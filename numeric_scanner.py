@@ -0,0 +1,97 @@
+import logging
+import re
+from typing import BinaryIO, Optional, Union
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sign, optional thousands groups, decimals and exponent: -1,234.5e-3
+_NUMBER = r'[-+]?(?:\d{1,3}(?:,\d{3})+(?!\d)|\d+)(?:\.\d*)?(?:[eE][-+]?\d+)?|[-+]?\.\d+(?:[eE][-+]?\d+)?'
+# Same without thousands groups, for raw CSV where commas are delimiters
+_PLAIN_NUMBER = r'[-+]?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|[-+]?\.\d+(?:[eE][-+]?\d+)?'
+
+NUMBER_BYTES = re.compile(_NUMBER.encode())
+PLAIN_NUMBER_BYTES = re.compile(_PLAIN_NUMBER.encode())
+NUMBER_TEXT = re.compile(_NUMBER)
+PLAIN_NUMBER_TEXT = re.compile(_PLAIN_NUMBER)
+
+HTML_NON_CONTENT = re.compile(rb'<!--.*?-->|<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+HTML_TAG = re.compile(rb'<[^>]*>')
+
+# One pass for all secret-code phrasings; the group that matched gives its priority
+SECRET_CODE = re.compile(
+    r'(?:(?P<p1>secret code is\s*)|(?P<p2>code is\s*)|(?P<p3>secret[:\s]*)|(?P<p4>code[:\s]*))?(?P<code>[0-9]{4,})',
+    re.IGNORECASE
+)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+def tokens_to_array(tokens, thousands: bool = True) -> np.ndarray:
+    """Convert matched numeric tokens (bytes or str) to a float64 array"""
+    if not tokens:
+        return np.empty(0, dtype=np.float64)
+    if thousands:
+        comma, empty = (b',', b'') if isinstance(tokens[0], bytes) else (',', '')
+        tokens = [token.replace(comma, empty) for token in tokens]
+    return np.fromiter(map(float, tokens), dtype=np.float64, count=len(tokens))
+
+def scan_numbers(buffer: Buffer, thousands: bool = True) -> np.ndarray:
+    """
+    Every number in a byte buffer (bytes, memoryview or mmap) as a float64 array.
+    Set thousands=False for raw CSV, where '1,234' is two cells.
+    """
+    pattern = NUMBER_BYTES if thousands else PLAIN_NUMBER_BYTES
+    return tokens_to_array(pattern.findall(buffer), thousands)
+
+def scan_text(text: str, thousands: bool = True) -> np.ndarray:
+    pattern = NUMBER_TEXT if thousands else PLAIN_NUMBER_TEXT
+    return tokens_to_array(pattern.findall(text), thousands)
+
+def scan_csv(buffer: Buffer) -> np.ndarray:
+    return scan_numbers(buffer, thousands=False)
+
+def scan_html(html: Union[str, Buffer]) -> np.ndarray:
+    """Numbers in the visible text of an HTML document"""
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    text = HTML_TAG.sub(b' ', HTML_NON_CONTENT.sub(b' ', html))
+    return scan_numbers(text)
+
+def scan_pdf(stream: BinaryIO) -> np.ndarray:
+    """Numbers in the extracted text of every PDF page"""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(stream)
+    arrays = [scan_text(page.extract_text() or '') for page in reader.pages]
+    return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.float64)
+
+def scan_file(path: str, thousands: bool = True, chunk_size: int = 16 * 1024 * 1024) -> np.ndarray:
+    """Scan a file in newline-aligned chunks so no token is split across reads"""
+    arrays = []
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            chunk += f.readline()
+            arrays.append(scan_numbers(chunk, thousands))
+    return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.float64)
+
+def find_secret_code(text: str) -> Optional[str]:
+    """
+    Best secret-code candidate in one scan. Priority: 'secret code is N', 'code is N',
+    'secret N', 'code N', then any bare number of 5+ digits; earliest wins within a tier.
+    """
+    best = None
+    best_rank = 6
+
+    for match in SECRET_CODE.finditer(text):
+        rank = next((i for i, name in enumerate(('p1', 'p2', 'p3', 'p4'), 1) if match.group(name) is not None), 5)
+        if rank == 5 and len(match.group('code')) < 5:
+            continue
+        if rank < best_rank:
+            best, best_rank = match.group('code'), rank
+            if rank == 1:
+                break
+
+    return best
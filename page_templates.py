@@ -0,0 +1,144 @@
+import bisect
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from parse_scheduler import parse_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Values that change between pages of the same template: URLs, paths, long tokens and numbers
+SLOT = re.compile(
+    r'https?://[^\s"\'<>]+'
+    r'|(?<![\w.<])/[\w.-]+(?:/[\w.-]+)*(?:\?[^\s"\'<>]*)?'
+    r'|[A-Za-z0-9+/_-]{24,}={0,2}'
+    r'|(?<![\d.])\d+(?:\.\d+)?'
+)
+
+def fingerprint(html: str) -> Tuple[str, List[str]]:
+    """Hash of the page with every slot value masked, plus the slot values in document order"""
+    slots = SLOT.findall(html)
+    skeleton = SLOT.sub('\x00', html)
+    skeleton = re.sub(r'\s+', ' ', skeleton)
+    return hashlib.sha1(skeleton.encode('utf-8', errors='replace')).hexdigest()[:16], slots
+
+def learn_template(instructions: Dict[str, Any], slots: List[str]) -> Dict[str, Any]:
+    """
+    Express each instruction string as literal parts and slot indexes, so the
+    same fields can be rebuilt from another page's slots without parsing it.
+    """
+    positions = {}
+    for index, value in enumerate(slots):
+        positions.setdefault(value, []).append(index)
+
+    template = {}
+    for field, value in instructions.items():
+        if not isinstance(value, str):
+            template[field] = value
+            continue
+        parts = []
+        position = 0
+        cursor = 0
+        for match in SLOT.finditer(value):
+            candidates = positions.get(match.group(0))
+            if not candidates:
+                continue
+            # Field text follows document order, so take the next occurrence after the previous slot
+            after = bisect.bisect_left(candidates, cursor)
+            index = candidates[after] if after < len(candidates) else candidates[0]
+            cursor = index + 1
+            parts.append(value[position:match.start()])
+            parts.append(index)
+            position = match.end()
+        parts.append(value[position:])
+        template[field] = parts
+    return template
+
+def fill_template(template: Dict[str, Any], slots: List[str]) -> Dict[str, Any]:
+    instructions = {}
+    for field, value in template.items():
+        if isinstance(value, list):
+            instructions[field] = ''.join(slots[part] if isinstance(part, int) else part for part in value)
+        else:
+            instructions[field] = value
+    return instructions
+
+class PageTemplateCache:
+    """
+    Caches parsed quiz instructions by page fingerprint. A template is learned
+    from the first page with a fingerprint and verified against the full parser
+    on the second; after that, pages with the fingerprint are filled from their
+    own slot values without running the parser. The strategy that produced a
+    correct answer is remembered per fingerprint as well.
+    """
+
+    def __init__(self, max_templates: int = 256):
+        self.max_templates = max_templates
+        self._templates = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.relearned = 0
+        self.strategy_hits = 0
+
+    async def parse(self, html: str) -> Tuple[Dict[str, Any], str]:
+        """Instructions for a quiz page and its fingerprint"""
+        key, slots = await parse_scheduler.run(fingerprint, html)
+        entry = self._templates.get(key)
+
+        if entry is not None and entry['verified']:
+            self._templates.move_to_end(key)
+            self.hits += 1
+            entry['hits'] += 1
+            instructions = fill_template(entry['template'], slots)
+            logger.info(f"Page template {key} hit ({entry['hits']} uses), skipped instruction parsing")
+            return instructions, key
+
+        self.misses += 1
+        instructions = await parse_scheduler.parse_instructions(html)
+
+        if entry is None:
+            self._templates[key] = {'template': learn_template(instructions, slots), 'verified': False,
+                                    'strategy': None, 'hits': 0}
+            while len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+        elif fill_template(entry['template'], slots) == instructions:
+            entry['verified'] = True
+            logger.info(f"Page template {key} verified")
+        else:
+            # Repeated values on the first page can map a field to the wrong slot; learn again from this one
+            self.relearned += 1
+            entry['template'] = learn_template(instructions, slots)
+
+        return instructions, key
+
+    def strategy_for(self, key: str) -> Optional[str]:
+        entry = self._templates.get(key)
+        strategy = entry['strategy'] if entry is not None else None
+        if strategy is not None:
+            self.strategy_hits += 1
+        return strategy
+
+    def record_outcome(self, key: str, strategy: Optional[str], correct: bool):
+        """Remember the strategy behind a correct answer; forget it after a wrong one"""
+        entry = self._templates.get(key)
+        if entry is None:
+            return
+        if correct and strategy:
+            entry['strategy'] = strategy
+        elif not correct and entry['strategy'] == strategy:
+            entry['strategy'] = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'templates': len(self._templates),
+            'verified': sum(1 for entry in self._templates.values() if entry['verified']),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'relearned': self.relearned,
+            'strategy_hits': self.strategy_hits
+        }
+
+page_templates = PageTemplateCache()
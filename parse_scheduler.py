@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+from bs4 import BeautifulSoup
+from quiz_parser import QuizParser
+
+logger = logging.getLogger(__name__)
+
+def parse_instructions(html: str) -> Dict[str, Any]:
+    """Quiz instructions for a page; a fresh parser per call since QuizParser keeps the soup on itself"""
+    return QuizParser().parse_quiz_instructions(html)
+
+def instruction_signature(html: str) -> tuple:
+    """What the solver reads from a quiz page; a render only matters if it changes this"""
+    return tuple(sorted(parse_instructions(html).items()))
+
+def page_text(html: str) -> str:
+    """Visible text of a page with whitespace collapsed"""
+    return re.sub(r'\s+', ' ', BeautifulSoup(html, 'html.parser').get_text().strip())
+
+class ParseScheduler:
+    """
+    Runs HTML parsing off the event loop according to page size: small pages
+    inline (a thread hop costs more than the parse), medium pages on a parse
+    thread, and large pages in a worker process so the parse doesn't hold the
+    GIL the loop needs. Only the parse result (plain dicts/strings) crosses back,
+    never the soup.
+    """
+
+    def __init__(self, inline_bytes: int = 32 * 1024, process_bytes: int = 1024 * 1024,
+                 threads: int = 2, processes: int = 1):
+        self.inline_bytes = inline_bytes
+        self.process_bytes = process_bytes
+        self.processes = processes
+        self._threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='parse')
+        self._pool = None
+        self.counts = {'inline': 0, 'thread': 0, 'process': 0}
+        self.max_inline_ms = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes,
+                                             mp_context=multiprocessing.get_context('forkserver'))
+        return self._pool
+
+    async def run(self, function: Callable[[str], Any], html: str) -> Any:
+        """`function(html)` on the executor its size calls for; `function` must be module-level for the process pool"""
+        size = len(html)
+        loop = asyncio.get_running_loop()
+
+        if size < self.inline_bytes:
+            self.counts['inline'] += 1
+            start = time.perf_counter()
+            result = function(html)
+            self.max_inline_ms = max(self.max_inline_ms, (time.perf_counter() - start) * 1000)
+            return result
+
+        if size >= self.process_bytes and self.processes:
+            self.counts['process'] += 1
+            try:
+                return await loop.run_in_executor(self._get_pool(), function, html)
+            except BrokenProcessPool:
+                logger.warning("Parse worker died, retrying on a parse thread")
+                self._pool = None
+
+        self.counts['thread'] += 1
+        return await loop.run_in_executor(self._threads, function, html)
+
+    async def parse_instructions(self, html: str) -> Dict[str, Any]:
+        return await self.run(parse_instructions, html)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'inline_bytes': self.inline_bytes,
+            'process_bytes': self.process_bytes,
+            'counts': dict(self.counts),
+            'max_inline_ms': round(self.max_inline_ms, 2)
+        }
+
+    def close(self):
+        self._threads.shutdown(wait=False)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+parse_scheduler = ParseScheduler()
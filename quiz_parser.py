@@ -95,7 +95,7 @@ class QuizParser:
         download_links = self.soup.find_all('a', href=True)
         for link in download_links:
             href = link.get('href', '')
-            if any(ext in href.lower() for ext in ['.pdf', '.csv', '.xlsx', '.json', '.txt']):
+            if any(ext in href.lower() for ext in ['.pdf', '.csv', '.xlsx', '.json', '.txt', '.gz', '.tgz', '.zip', '.parquet', '.arrow', '.feather']):
                 return href
         
         # Look for API endpoints
@@ -111,7 +111,7 @@ class QuizParser:
             r'[Ss]crape\s+([^\s]+)',
             r'[Vv]isit\s+([^\s]+)',
             r'[Gg]o\s+to\s+([^\s]+)',
-            r'/(?:[\w-]+\.)+(?:csv|pdf|json|txt)\??\S*',
+            r'/(?:[\w-]+\.)+(?:csv|pdf|json|txt|gz|tgz|zip|parquet|arrow|feather)\??\S*',
             r'/([\w/-]+)\??\S*'
         ]
         
@@ -120,7 +120,7 @@ class QuizParser:
             for match in matches:
                 if isinstance(match, tuple):
                     match = match[0]
-                if match.startswith('/') or any(ext in match.lower() for ext in ['.csv', '.pdf', '.json', '.txt']):
+                if match.startswith('/') or any(ext in match.lower() for ext in ['.csv', '.pdf', '.json', '.txt', '.gz', '.tgz', '.zip', '.parquet', '.arrow', '.feather']):
                     return match
         
         return None
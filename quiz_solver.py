@@ -1,10 +1,13 @@
 import logging
 import asyncio
+import time
 from typing import Dict, Any, List, Optional
 from web_scraper import scraper
-from quiz_parser import quiz_parser
+from page_templates import page_templates
 from data_processor import data_processor
 from answer_submitter import answer_submitter
+from response_shaping import ResponseShape, FULL_SHAPE
+from dataset_cache import dataset_cache
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +16,17 @@ class QuizSolver:
         self.visited_urls = set()
         self.max_attempts = 10  # Prevent infinite loops
     
-    async def solve_quiz_chain(self, start_url: str, email: str, secret: str) -> Dict[str, Any]:
+    async def solve_quiz_chain(self, start_url: str, email: str, secret: str,
+                               shape: ResponseShape = FULL_SHAPE) -> Dict[str, Any]:
         """
-        Solve a chain of quiz questions automatically - OPTIMIZED FOR SPEED
+        Solve a chain of quiz questions automatically - OPTIMIZED FOR SPEED.
+        Each hop's result is cut down to `shape` as soon as it finishes.
         """
+        # Data URLs repeated within this chain skip the download; a later chain fetches them again
+        with dataset_cache.chain():
+            return await self._solve_chain(start_url, email, secret, shape)
+    
+    async def _solve_chain(self, start_url: str, email: str, secret: str, shape: ResponseShape) -> Dict[str, Any]:
         current_url = start_url
         results = {
             'start_url': start_url,
@@ -42,8 +52,9 @@ class QuizSolver:
             
             # Process current quiz with timeout
             try:
+                deadline = time.monotonic() + 30.0
                 quiz_result = await asyncio.wait_for(
-                    self._process_single_quiz(current_url, email, secret),
+                    self._process_single_quiz(current_url, email, secret, deadline),
                     timeout=30.0  # 30 second timeout per quiz
                 )
             except asyncio.TimeoutError:
@@ -55,14 +66,16 @@ class QuizSolver:
                     'next_url': None
                 }
             
-            results['chain'].append(quiz_result)
-            
             if quiz_result.get('correct'):
                 results['correct_answers'] += 1
             
             # Get next URL
             current_url = quiz_result.get('next_url')
             
+            results['chain'].append(shape.hop(quiz_result))
+            # Don't carry the unshaped hop (page text included) through the next one
+            del quiz_result
+            
             if not current_url:
                 results['completed'] = True
                 logger.info("Quiz chain completed - no more URLs")
@@ -76,7 +89,8 @@ class QuizSolver:
         
         return results
     
-    async def _process_single_quiz(self, url: str, email: str, secret: str) -> Dict[str, Any]:
+    async def _process_single_quiz(self, url: str, email: str, secret: str,
+                                   deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Process a single quiz question
         """
@@ -97,12 +111,14 @@ class QuizSolver:
                 result['error'] = f"Scraping failed: {error}"
                 return result
             
-            # Step 2: Parse instructions
-            instructions = quiz_parser.parse_quiz_instructions(html_content)
+            # Step 2: Parse instructions (reused from the page template when seen before)
+            instructions, template_key = await page_templates.parse(html_content)
             result['instructions'] = instructions
             
             # Step 3: Process task and generate answer (pass base_url for relative URLs)
-            processing_result = await data_processor.process_quiz_task(instructions, base_url=url)
+            processing_result = await data_processor.process_quiz_task(
+                instructions, base_url=url, strategy=page_templates.strategy_for(template_key)
+            )
             result['answer'] = processing_result.get('answer')
             
             # Step 4: Submit answer if we have one and a submit URL
@@ -118,11 +134,13 @@ class QuizSolver:
                     email=email,
                     secret=secret,
                     quiz_url=url,
-                    answer=result['answer']
+                    answer=result['answer'],
+                    deadline=deadline
                 )
                 
                 result['correct'] = submission_result.get('correct', False)
                 result['next_url'] = submission_result.get('next_url')
+                page_templates.record_outcome(template_key, processing_result.get('strategy'), result['correct'])
                 result['submission_result'] = submission_result
                 result['success'] = True
                 
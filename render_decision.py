@@ -0,0 +1,186 @@
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_BLOCK = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+HIDDEN_BLOCK = re.compile(r'<(style|noscript|template)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+TAG = re.compile(r'<[^>]+>')
+DOM_WRITE = re.compile(r'\.(?:innerHTML|outerHTML|innerText|textContent)\s*\+?=|document\.write\s*\(|'
+                       r'\.(?:appendChild|insertAdjacentHTML|replaceChildren|append)\s*\(')
+DECODE = re.compile(r'\batob\s*\(|\bdecodeURIComponent\s*\(|\bJSON\.parse\s*\(')
+FETCH = re.compile(r'\bfetch\s*\(|\bXMLHttpRequest\b|\$\.(?:ajax|get|getJSON)\s*\(|\baxios\b')
+APP_ROOT = re.compile(r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>|\bng-app\b|\bdata-reactroot\b',
+                      re.IGNORECASE)
+NOSCRIPT_WARNING = re.compile(r'<noscript[^>]*>[^<]*(?:enable|requires?|needs?)\s+javascript', re.IGNORECASE)
+CONTENT_MARKER = re.compile(r'\b(?:submit|secret|question|answer|download|scrape)\b|\bQ\d+\.', re.IGNORECASE)
+
+def visible_text(html: str) -> str:
+    """Page text without scripts, styles or tags, whitespace collapsed"""
+    html = SCRIPT_BLOCK.sub(' ', html)
+    html = HIDDEN_BLOCK.sub(' ', html)
+    return re.sub(r'\s+', ' ', TAG.sub(' ', html)).strip()
+
+def extract_features(html: str) -> Dict[str, Any]:
+    """Cheap static signals about whether a page's content only exists after JavaScript runs"""
+    scripts = SCRIPT_BLOCK.findall(html)
+    inline = '\n'.join(body for _, body in scripts)
+    text = visible_text(html)
+    return {
+        'text_length': len(text),
+        'content_markers': len(CONTENT_MARKER.findall(text)),
+        'inline_scripts': sum(1 for _, body in scripts if body.strip()),
+        'external_scripts': sum(1 for attrs, _ in scripts if 'src=' in attrs.lower()),
+        'dom_writes': len(DOM_WRITE.findall(inline)),
+        'decodes': len(DECODE.findall(inline)),
+        'fetches': len(FETCH.findall(inline)),
+        'app_root': bool(APP_ROOT.search(html)),
+        'noscript_warning': bool(NOSCRIPT_WARNING.search(html))
+    }
+
+def render_score(features: Dict[str, Any]) -> float:
+    """0..1 estimate that rendering will change what we extract from the page"""
+    score = 0.0
+    if features['text_length'] < 20:
+        score += 0.45
+    elif features['text_length'] < 200:
+        score += 0.15
+
+    if features['dom_writes']:
+        score += 0.25
+        if features['decodes'] or features['fetches']:
+            score += 0.25
+    if features['app_root']:
+        score += 0.4
+    if features['noscript_warning']:
+        score += 0.3
+    if features['external_scripts'] and not features['inline_scripts'] and features['text_length'] < 200:
+        score += 0.15
+
+    # The page already carries what the quiz parser looks for
+    if features['content_markers'] >= 2 and features['text_length'] >= 100:
+        score -= 0.35
+    return min(max(score, 0.0), 1.0)
+
+def page_key(url: str) -> str:
+    """Host plus path with digits masked, so pages from the same generator share a decision"""
+    parsed = urlparse(url)
+    return f"{parsed.netloc}{re.sub(r'[0-9]+', '#', parsed.path or '/')}"
+
+class RenderDecisionEngine:
+    """
+    Decides whether a fetched page needs a browser render. Unseen page keys are
+    scored on static features; every render records whether it changed the
+    extracted content, and once a key has enough observations that history
+    decides directly (with an occasional re-check so stale decisions recover).
+    """
+
+    def __init__(self, render_threshold: float = 0.5, min_observations: int = 2,
+                 recheck_every: int = 25, max_keys: int = 2048):
+        self.render_threshold = render_threshold
+        self.min_observations = min_observations
+        self.recheck_every = recheck_every
+        self.max_keys = max_keys
+        self._history = OrderedDict()
+        self.decisions = 0
+        self.renders = 0
+        self.learned_decisions = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    def _entry(self, url: str) -> Dict[str, int]:
+        key = page_key(url)
+        entry = self._history.get(key)
+        if entry is None:
+            entry = self._history[key] = {'renders': 0, 'changed': 0, 'skips': 0}
+            while len(self._history) > self.max_keys:
+                self._history.popitem(last=False)
+        self._history.move_to_end(key)
+        return entry
+
+    def _learned(self, entry: Dict[str, int]) -> Optional[bool]:
+        if entry['renders'] < self.min_observations:
+            return None
+        ratio = entry['changed'] / entry['renders']
+        if ratio >= 0.8:
+            return True
+        if ratio <= 0.2:
+            return False
+        return None
+
+    def known_render(self, url: str) -> bool:
+        """
+        True when this key reliably needs rendering, so the static fetch can be
+        skipped; every `recheck_every`th call says False so a static copy is still
+        fetched and compared now and then.
+        """
+        entry = self._history.get(page_key(url))
+        if entry is None or self._learned(entry) is not True:
+            return False
+        entry['direct'] = entry.get('direct', 0) + 1
+        if entry['direct'] % self.recheck_every == 0:
+            return False
+        self.decisions += 1
+        self.learned_decisions += 1
+        self.renders += 1
+        return True
+
+    def should_render(self, url: str, html: str) -> Tuple[bool, str]:
+        """Decision for a statically fetched page, with a short reason for the logs"""
+        self.decisions += 1
+        entry = self._entry(url)
+        learned = self._learned(entry)
+
+        if learned is not None:
+            self.learned_decisions += 1
+            if learned:
+                decision, reason = True, f"learned: {entry['changed']}/{entry['renders']} renders changed content"
+            else:
+                entry['skips'] += 1
+                if entry['skips'] % self.recheck_every == 0:
+                    decision, reason = True, "re-checking learned static decision"
+                else:
+                    decision, reason = False, f"learned: {entry['renders'] - entry['changed']}/{entry['renders']} renders unchanged"
+        else:
+            score = render_score(extract_features(html))
+            decision = score >= self.render_threshold
+            reason = f"static score {score:.2f}"
+
+        if decision:
+            self.renders += 1
+        logger.info(f"Render decision for {page_key(url)}: {'render' if decision else 'static'} ({reason})")
+        return decision, reason
+
+    def record(self, url: str, static_html: Optional[str], rendered_html: Optional[str],
+               extract: Callable[[str], Any] = visible_text) -> Optional[bool]:
+        """Note whether rendering changed what `extract` pulls out of the page"""
+        if not static_html or not rendered_html:
+            return None
+        changed = extract(static_html) != extract(rendered_html)
+        self.record_change(url, changed)
+        return changed
+
+    def record_change(self, url: str, changed: bool):
+        """Note a render outcome the caller already compared"""
+        entry = self._entry(url)
+        entry['renders'] += 1
+        entry['changed'] += int(changed)
+        if changed:
+            self.changed += 1
+        else:
+            self.unchanged += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'keys': len(self._history),
+            'decisions': self.decisions,
+            'renders': self.renders,
+            'learned_decisions': self.learned_decisions,
+            'renders_changed_content': self.changed,
+            'renders_unchanged': self.unchanged
+        }
+
+render_decisions = RenderDecisionEngine()
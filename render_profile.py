@@ -0,0 +1,121 @@
+import logging
+import os
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+from selenium.webdriver.chrome.options import Options
+from browser_supervisor import BROWSER_MARKER
+
+logger = logging.getLogger(__name__)
+
+# Resources a render never needs for page_source text, as Network.setBlockedURLs wildcard patterns
+RESOURCE_PATTERNS = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'stylesheet': ['css'],
+    'media': ['mp4', 'webm', 'mp3', 'ogg', 'wav', 'm4a', 'mov'],
+}
+THIRD_PARTY_HOSTS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'fonts.googleapis.com', 'fonts.gstatic.com', 'facebook.net', 'hotjar.com', 'segment.io',
+    'cdn.segment.com', 'clarity.ms', 'newrelic.com', 'nr-data.net', 'sentry-cdn.com'
+]
+THIRD_PARTY = 'third_party'
+
+VIEWPORT = (800, 600)
+
+def parse_allowlist(spec: Optional[str]) -> Dict[str, Set[str]]:
+    """
+    Parse "host=image,stylesheet;other.host=font" into {host: {resource types}}.
+    Hosts listed here get those resource types even under the light profile.
+    """
+    allowlist = {}
+    for entry in (spec or '').split(';'):
+        host, _, kinds = entry.partition('=')
+        if host.strip():
+            allowlist[host.strip().lower()] = {kind.strip() for kind in kinds.split(',') if kind.strip()}
+    return allowlist
+
+RENDER_ALLOWLIST = parse_allowlist(os.getenv('RENDER_ALLOWLIST'))
+
+def allowed_types(url: str, allowlist: Optional[Dict[str, Set[str]]] = None) -> Set[str]:
+    """Resource types the allowlist lets through for this URL's host (and its parent domains)"""
+    allowlist = RENDER_ALLOWLIST if allowlist is None else allowlist
+    host = (urlparse(url).hostname or '').lower()
+    allowed = set()
+    for listed, kinds in allowlist.items():
+        if host == listed or host.endswith('.' + listed):
+            allowed |= kinds
+    return allowed
+
+def blocked_url_patterns(url: str, allowlist: Optional[Dict[str, Set[str]]] = None) -> List[str]:
+    allowed = allowed_types(url, allowlist)
+    patterns = []
+    for kind, extensions in RESOURCE_PATTERNS.items():
+        if kind in allowed:
+            continue
+        for extension in extensions:
+            # Patterns match the whole URL, so cache-busting query strings need their own entry
+            patterns.extend([f'*.{extension}', f'*.{extension}?*'])
+    if THIRD_PARTY not in allowed:
+        patterns.extend(f'*://*{host}/*' for host in THIRD_PARTY_HOSTS)
+    return patterns
+
+def should_block(request_url: str, resource_type: str, page_url: str,
+                 allowlist: Optional[Dict[str, Set[str]]] = None) -> bool:
+    """The same rules as blocked_url_patterns, for backends that see each request with its resource type"""
+    allowed = allowed_types(page_url, allowlist)
+    if resource_type in RESOURCE_PATTERNS and resource_type not in allowed:
+        return True
+    if THIRD_PARTY in allowed:
+        return False
+    host = (urlparse(request_url).hostname or '').lower()
+    return any(host == listed or host.endswith('.' + listed) for listed in THIRD_PARTY_HOSTS)
+
+def chrome_options(light: bool = True, url: Optional[str] = None,
+                   allowlist: Optional[Dict[str, Set[str]]] = None) -> Options:
+    """
+    Headless Chrome options shared by every render. The light profile also turns
+    off image loading/decoding, remote fonts and other background work, and uses a
+    small viewport, unless `url`'s host is allowlisted for images or fonts; the
+    full profile is a plain headless browser.
+    """
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-proxy-server")
+    options.add_argument("--disable-extensions")
+    options.add_argument(BROWSER_MARKER)
+    if light:
+        allowed = allowed_types(url, allowlist) if url else set()
+        options.add_argument(f"--window-size={VIEWPORT[0]},{VIEWPORT[1]}")
+        if 'image' not in allowed:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        if 'font' not in allowed:
+            options.add_argument("--disable-remote-fonts")
+        options.add_argument("--mute-audio")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-sync")
+    return options
+
+def apply_profile(driver, url: str, allowlist: Optional[Dict[str, Set[str]]] = None) -> int:
+    """
+    Block non-essential requests for the next navigation through the DevTools
+    protocol. Returns the number of blocked patterns (0 when CDP is unavailable).
+    """
+    patterns = blocked_url_patterns(url, allowlist)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        allowed = allowed_types(url, allowlist)
+        if allowed:
+            logger.info(f"Render profile for {urlparse(url).hostname}: allowing {sorted(allowed)}")
+        return len(patterns)
+    except Exception as e:
+        # Non-Chromium drivers have no CDP; the browser flags still apply
+        logger.warning(f"Could not install request blocking: {str(e)}")
+        return 0
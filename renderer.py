@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+from browser_supervisor import BROWSER_MARKER, browser_supervisor
+from circuit_breaker import breakers
+from render_profile import VIEWPORT, apply_profile, chrome_options, should_block
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+logger = logging.getLogger(__name__)
+
+class PlaywrightBackend:
+    """
+    One Chromium process driven over the DevTools protocol from the event loop.
+    Each render gets its own browser context (separate cookies, storage and
+    cache), so concurrent renders share the process without seeing each other.
+    """
+
+    name = 'playwright'
+
+    def __init__(self, max_contexts: int = 4):
+        self.max_contexts = max_contexts
+        self._semaphore = asyncio.Semaphore(max_contexts)
+        self._playwright = None
+        self._browser = None
+        self._session = None
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        try:
+            with browser_supervisor.launching():
+                self._browser = await self._playwright.chromium.launch(
+                    headless=True, args=["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", BROWSER_MARKER]
+                )
+                self._session = await asyncio.to_thread(browser_supervisor.track_new_browser, 'playwright')
+        except BaseException:
+            await self._playwright.stop()
+            self._playwright = None
+            raise
+
+    async def render(self, url: str, settle: float, light: bool, timeout: float) -> str:
+        async with self._semaphore:
+            context = await self._browser.new_context(
+                viewport={'width': VIEWPORT[0], 'height': VIEWPORT[1]} if light else None
+            )
+            try:
+                if light:
+                    async def route(route):
+                        request = route.request
+                        if should_block(request.url, request.resource_type, url):
+                            await route.abort()
+                        else:
+                            await route.continue_()
+                    await context.route('**/*', route)
+                page = await context.new_page()
+                await page.goto(url, timeout=timeout * 1000, wait_until='load')
+                await asyncio.sleep(settle)
+                return await page.content()
+            finally:
+                await context.close()
+
+    async def close(self):
+        if self._browser is not None:
+            await browser_supervisor.close_browser(self._session, self._browser.close)
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+class SeleniumBackend:
+    """Fallback: a chromedriver session per render, run on a worker thread so the event loop keeps going"""
+
+    name = 'selenium'
+
+    def __init__(self, max_contexts: int = 4):
+        self.max_contexts = max_contexts
+        self._semaphore = asyncio.Semaphore(max_contexts)
+
+    async def start(self):
+        pass
+
+    def _render_sync(self, url: str, settle: float, light: bool, timeout: float) -> str:
+        from selenium import webdriver
+        with browser_supervisor.launching():
+            driver = webdriver.Chrome(options=chrome_options(light=light, url=url))
+            # page_load_timeout doesn't cover hung renderers or a stuck chromedriver; the deadline does
+            session = browser_supervisor.track_driver(driver, deadline=timeout + settle + 10.0, label=url)
+        try:
+            if light:
+                apply_profile(driver, url)
+            driver.set_page_load_timeout(timeout)
+            driver.get(url)
+            time.sleep(settle)
+            return driver.page_source
+        finally:
+            browser_supervisor.quit_driver(session, driver)
+
+    async def render(self, url: str, settle: float, light: bool, timeout: float) -> str:
+        async with self._semaphore:
+            return await asyncio.to_thread(self._render_sync, url, settle, light, timeout)
+
+    async def close(self):
+        pass
+
+class Renderer:
+    """
+    Renders pages in headless Chrome behind one async interface. Uses Playwright
+    when it is installed and its browser launches, otherwise Selenium.
+    RENDER_BACKEND=selenium|playwright forces a backend.
+    """
+
+    def __init__(self, backend: Optional[str] = None, max_contexts: int = 4):
+        self.preferred = backend or os.getenv('RENDER_BACKEND')
+        self.max_contexts = max_contexts
+        self._backend = None
+        self._lock = asyncio.Lock()
+        self.renders = 0
+        self.failures = 0
+        self.render_seconds = 0.0
+
+    async def _get_backend(self):
+        if self._backend is not None:
+            return self._backend
+        async with self._lock:
+            if self._backend is None:
+                if self.preferred != 'selenium' and async_playwright is not None:
+                    backend = PlaywrightBackend(self.max_contexts)
+                    try:
+                        await backend.start()
+                        self._backend = backend
+                    except Exception as e:
+                        logger.warning(f"Playwright browser unavailable, falling back to Selenium: {str(e)}")
+                elif self.preferred == 'playwright':
+                    logger.warning("Playwright is not installed, falling back to Selenium")
+                if self._backend is None:
+                    self._backend = SeleniumBackend(self.max_contexts)
+                logger.info(f"Renderer using {self._backend.name} backend")
+        return self._backend
+
+    async def render(self, url: str, settle: float = 1.0, light: bool = True, timeout: float = 5.0) -> str:
+        """
+        HTML of `url` after its scripts have run: the page is loaded, then given
+        `settle` seconds for late DOM writes. `light` applies the resource-blocking
+        render profile.
+        """
+        # A host known to be down fails here instead of after a browser page-load timeout
+        breakers.check(url).release()
+        backend = await self._get_backend()
+        start = time.perf_counter()
+        try:
+            html = await backend.render(url, settle, light, timeout)
+        except Exception:
+            self.failures += 1
+            raise
+        elapsed = time.perf_counter() - start
+        self.renders += 1
+        self.render_seconds += elapsed
+        logger.info(f"Rendered {url} with {backend.name} in {elapsed:.2f}s")
+        return html
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self._backend.name if self._backend is not None else None,
+            'max_contexts': self.max_contexts,
+            'renders': self.renders,
+            'failures': self.failures,
+            'mean_render_seconds': round(self.render_seconds / self.renders, 3) if self.renders else 0.0
+        }
+
+    async def close(self):
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+renderer = Renderer()
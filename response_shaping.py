@@ -0,0 +1,71 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SUMMARY = 'summary'
+FIELDS = 'fields'
+FULL = 'full'
+
+# What a summary keeps of a /quiz response; page text, previews and raw results are left out
+QUIZ_SUMMARY = ('status', 'message', 'url', 'next_url', 'instructions.question', 'instructions.task_type',
+                'submission_result.status', 'submission_result.correct', 'submission_result.reason',
+                'submission_result.error')
+
+# ...and of each /quiz-chain hop. Answers are left out too: file answers can be megabytes of base64
+HOP_SUMMARY = ('url', 'success', 'error', 'correct', 'next_url', 'instructions.question',
+               'submission_result.reason')
+
+# A response's own status line always survives field selection
+QUIZ_ALWAYS = ('status', 'message')
+
+def _parse_paths(paths: Iterable[str]) -> List[Tuple[str, ...]]:
+    parsed = [tuple(path.split('.')) for path in paths if path]
+    # A parent requested whole covers its children, and project() must never write a child into the caller's dict
+    covered = set(parsed)
+    return [path for path in parsed if not any(path[:i] in covered for i in range(1, len(path)))]
+
+_QUIZ_SUMMARY = _parse_paths(QUIZ_SUMMARY)
+_HOP_SUMMARY = _parse_paths(HOP_SUMMARY)
+
+def project(record: Dict[str, Any], paths: List[Tuple[str, ...]]) -> Dict[str, Any]:
+    """New dict holding only the dotted `paths` of `record`; missing paths are skipped, `record` isn't touched"""
+    shaped = {}
+    for path in paths:
+        value = record
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = shaped
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+    return shaped
+
+class ResponseShape:
+    """
+    How much of a quiz result goes back to the caller: 'full' (everything),
+    'summary' (status and correctness), or 'fields' (the given dotted paths,
+    e.g. "instructions.question"). Chain hops are shaped as soon as they finish,
+    so the chain never holds page text it won't return.
+    """
+
+    def __init__(self, mode: str = FULL, fields: Optional[List[str]] = None):
+        if mode not in (SUMMARY, FIELDS, FULL):
+            raise ValueError(f"Unknown response mode: {mode}")
+        if mode == FIELDS and not fields:
+            raise ValueError("response_mode 'fields' needs a non-empty fields list")
+        self.mode = mode
+        self._quiz_paths = _QUIZ_SUMMARY if mode == SUMMARY else _parse_paths(list(QUIZ_ALWAYS) + (fields or []))
+        self._hop_paths = _HOP_SUMMARY if mode == SUMMARY else _parse_paths(fields or [])
+
+    def wants(self, name: str) -> bool:
+        """Whether a top-level /quiz field is returned, so callers can skip building it"""
+        return self.mode == FULL or any(path[0] == name for path in self._quiz_paths)
+
+    def quiz(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        return response if self.mode == FULL else project(response, self._quiz_paths)
+
+    def hop(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        return result if self.mode == FULL else project(result, self._hop_paths)
+
+FULL_SHAPE = ResponseShape()
@@ -0,0 +1,430 @@
+import logging
+import math
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Column access across the frame types produced by the data readers
+# ---------------------------------------------------------------------------
+
+def column_names(frame) -> List[str]:
+    """Column names of a pandas DataFrame, pyarrow Table or table_extractor frame"""
+    if isinstance(frame, dict):
+        return list(frame['columns'])
+    if hasattr(frame, 'column_names'):
+        return list(frame.column_names)
+    return [str(c) for c in frame.columns]
+
+def numeric_column_names(frame) -> List[str]:
+    if isinstance(frame, dict):
+        return [name for name in frame['columns'] if frame['types'].get(name) == 'number']
+    if hasattr(frame, 'column_names'):
+        import pyarrow as pa
+        return [f.name for f in frame.schema
+                if pa.types.is_integer(f.type) or pa.types.is_floating(f.type) or pa.types.is_decimal(f.type)]
+    return [str(c) for c in frame.select_dtypes('number').columns]
+
+def column_array(frame, name: str) -> np.ndarray:
+    """A column as float64 (nulls -> NaN), zero-copy where the source allows it"""
+    if isinstance(frame, dict):
+        return np.asarray(frame['data'][name], dtype=np.float64)
+    if hasattr(frame, 'column_names'):
+        return frame[name].to_numpy().astype(np.float64, copy=False)
+    column = next(c for c in frame.columns if str(c) == name)
+    return frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+# ---------------------------------------------------------------------------
+# Vectorized in-memory kernels (NaNs are ignored; pairs drop rows where either is NaN)
+# ---------------------------------------------------------------------------
+
+def _clean(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values[~np.isnan(values)]
+
+def _paired(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    return x[mask], y[mask]
+
+def mean(values: np.ndarray) -> float:
+    return float(np.mean(_clean(values)))
+
+def variance(values: np.ndarray, ddof: int = 1) -> float:
+    return float(np.var(_clean(values), ddof=ddof))
+
+def std(values: np.ndarray, ddof: int = 1) -> float:
+    return float(np.std(_clean(values), ddof=ddof))
+
+def percentile(values: np.ndarray, q: float) -> float:
+    return float(np.percentile(_clean(values), q))
+
+def median(values: np.ndarray) -> float:
+    return float(np.median(_clean(values)))
+
+def covariance(x: np.ndarray, y: np.ndarray, ddof: int = 1) -> float:
+    x, y = _paired(x, y)
+    return float(np.dot(x - x.mean(), y - y.mean()) / (len(x) - ddof))
+
+def correlation(x: np.ndarray, y: np.ndarray) -> float:
+    """Pearson correlation coefficient"""
+    x, y = _paired(x, y)
+    dx, dy = x - x.mean(), y - y.mean()
+    return float(np.dot(dx, dy) / math.sqrt(np.dot(dx, dx) * np.dot(dy, dy)))
+
+def spearman(x: np.ndarray, y: np.ndarray) -> float:
+    """Spearman rank correlation (average ranks for ties)"""
+    x, y = _paired(x, y)
+    return correlation(_rank(x), _rank(y))
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    order = np.argsort(values, kind='mergesort')
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.arange(1, len(values) + 1)
+    # Average the ranks of tied values
+    unique, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    if len(unique) != len(values):
+        sums = np.bincount(inverse, weights=ranks)
+        ranks = (sums / counts)[inverse]
+    return ranks
+
+def linregress(x: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    """Ordinary least squares y = slope * x + intercept"""
+    x, y = _paired(x, y)
+    dx, dy = x - x.mean(), y - y.mean()
+    sxx, sxy, syy = np.dot(dx, dx), np.dot(dx, dy), np.dot(dy, dy)
+    slope = sxy / sxx
+    return {
+        'slope': float(slope),
+        'intercept': float(y.mean() - slope * x.mean()),
+        'r_squared': float(sxy * sxy / (sxx * syy)) if syy else 1.0
+    }
+
+# ---------------------------------------------------------------------------
+# Streaming / online kernels for data that doesn't fit in memory
+# ---------------------------------------------------------------------------
+
+class RunningStats:
+    """Welford's online mean/variance, with Chan's merge for combining partial results"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, chunk: np.ndarray):
+        """Fold a whole chunk in at once: vectorized stats for the chunk, then a pairwise merge"""
+        chunk = _clean(chunk)
+        if chunk.size == 0:
+            return
+        other = RunningStats()
+        other.count = chunk.size
+        other.mean = float(chunk.mean())
+        other.m2 = float(np.dot(chunk - other.mean, chunk - other.mean))
+        other.min = float(chunk.min())
+        other.max = float(chunk.max())
+        self.merge(other)
+
+    def push(self, value: float):
+        """Classic one-value Welford step"""
+        if math.isnan(value):
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'RunningStats'):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def variance(self, ddof: int = 1) -> float:
+        return self.m2 / (self.count - ddof) if self.count > ddof else math.nan
+
+    def std(self, ddof: int = 1) -> float:
+        return math.sqrt(self.variance(ddof))
+
+class RunningCovariance:
+    """Online co-moment for covariance, Pearson correlation and regression over paired chunks"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def update(self, x: np.ndarray, y: np.ndarray):
+        x, y = _paired(x, y)
+        n = x.size
+        if n == 0:
+            return
+        mean_x, mean_y = float(x.mean()), float(y.mean())
+        dx, dy = x - mean_x, y - mean_y
+        m2_x, m2_y, c_xy = float(np.dot(dx, dx)), float(np.dot(dy, dy)), float(np.dot(dx, dy))
+
+        total = self.count + n
+        delta_x, delta_y = mean_x - self.mean_x, mean_y - self.mean_y
+        weight = self.count * n / total
+        self.m2_x += m2_x + delta_x * delta_x * weight
+        self.m2_y += m2_y + delta_y * delta_y * weight
+        self.c_xy += c_xy + delta_x * delta_y * weight
+        self.mean_x += delta_x * n / total
+        self.mean_y += delta_y * n / total
+        self.count = total
+
+    def covariance(self, ddof: int = 1) -> float:
+        return self.c_xy / (self.count - ddof)
+
+    def correlation(self) -> float:
+        return self.c_xy / math.sqrt(self.m2_x * self.m2_y)
+
+    def linregress(self) -> Dict[str, float]:
+        slope = self.c_xy / self.m2_x
+        return {
+            'slope': slope,
+            'intercept': self.mean_y - slope * self.mean_x,
+            'r_squared': self.c_xy * self.c_xy / (self.m2_x * self.m2_y) if self.m2_y else 1.0
+        }
+
+def streaming_quantile(chunks: Callable[[], Iterator[np.ndarray]], q: float,
+                       sample_size: int = 100_000, max_candidates: int = 5_000_000, max_attempts: int = 4,
+                       report: Optional[Dict[str, Any]] = None) -> float:
+    """
+    Exact q-th percentile in bounded memory with two passes over `chunks`
+    (a callable returning a fresh iterator of arrays).
+    Pass 1 keeps a reservoir sample to estimate a narrow bracket around the
+    quantile; pass 2 counts values below it and keeps only values inside it,
+    then selects the exact order statistic. The bracket widens if it misses
+    and narrows if it holds too many values, for up to `max_attempts` passes;
+    after that the reservoir estimate is returned and `report` (if given) gets
+    'approximate': True.
+    """
+    rng = np.random.default_rng(0)
+    sample = np.empty(0, dtype=np.float64)
+    count = 0
+
+    for chunk in chunks():
+        chunk = _clean(chunk)
+        count += chunk.size
+        if sample.size < sample_size:
+            sample = np.concatenate([sample, chunk[:sample_size - sample.size]])
+            chunk = chunk[sample_size - sample.size:] if sample.size >= sample_size else chunk[:0]
+        if chunk.size:
+            # Reservoir replacement, vectorized per chunk
+            positions = rng.integers(0, count, size=chunk.size)
+            keep = positions < sample_size
+            sample[positions[keep]] = chunk[keep]
+
+    if count == 0:
+        return math.nan
+
+    target = (count - 1) * q / 100.0
+    margin = 0.01
+    for attempt in range(max_attempts):
+        low_q, high_q = max(0.0, q - 100 * margin), min(100.0, q + 100 * margin)
+        low = np.percentile(sample, low_q) if low_q > 0 else -math.inf
+        high = np.percentile(sample, high_q) if high_q < 100 else math.inf
+        # Ties at the quantile can pin both ends to one value; then only counts are needed
+        tied = low == high
+
+        below = 0
+        candidates = []
+        candidate_count = 0
+        for chunk in chunks():
+            chunk = _clean(chunk)
+            below += int(np.count_nonzero(chunk < low))
+            inside = (chunk >= low) & (chunk <= high)
+            if tied:
+                candidate_count += int(np.count_nonzero(inside))
+                continue
+            inside = chunk[inside]
+            candidate_count += inside.size
+            if candidate_count > max_candidates:
+                break
+            candidates.append(inside)
+
+        lower_index, upper_index = int(math.floor(target)) - below, int(math.ceil(target)) - below
+        if tied and 0 <= lower_index and upper_index < candidate_count:
+            return float(low)
+        if not tied and candidate_count <= max_candidates and 0 <= lower_index and upper_index < candidate_count:
+            values = np.concatenate(candidates) if candidates else np.empty(0)
+            pair = np.partition(values, [lower_index, upper_index])
+            fraction = target - math.floor(target)
+            return float(pair[lower_index] + (pair[upper_index] - pair[lower_index]) * fraction)
+
+        if candidate_count > max_candidates:
+            margin /= 2
+        else:
+            margin *= 4
+        logger.info(f"Quantile bracket missed, retrying with margin {margin}")
+
+    # Loading every value would break the memory bound; answer from the sample instead
+    logger.warning(f"Quantile bracket failed after {max_attempts} attempts, "
+                   f"estimating from a {sample.size}-value sample of {count}")
+    if report is not None:
+        report.update(approximate=True, sample_size=int(sample.size))
+    return float(np.percentile(sample, q))
+
+# ---------------------------------------------------------------------------
+# Question-level dispatch
+# ---------------------------------------------------------------------------
+
+STATISTIC_KEYWORDS = [
+    (r'\bspearman\b', 'spearman'),
+    (r'\bcorrelat(?:ion|ed|e)\b', 'correlation'),
+    (r'\b(?:regression|slope|intercept)\b', 'linregress'),
+    (r'\bcovariance\b', 'covariance'),
+    (r'\b(?:standard deviation|std(?:dev)?)\b', 'std'),
+    (r'\bvariance\b', 'variance'),
+    (r'\b(?:percentile|quantile|quartile)\b', 'percentile'),
+    (r'\bmedian\b', 'median'),
+    (r'\baverage\b|\b(?:the|arithmetic|sample)\s+mean\b|\bmean\s+(?:of|value)\b', 'mean')
+]
+
+PAIRED_STATISTICS = ('correlation', 'spearman', 'covariance', 'linregress')
+
+def detect_statistic(question: str) -> Optional[str]:
+    """First statistic the question asks for, most specific wording first"""
+    question = (question or '').lower()
+    return next((stat for pattern, stat in STATISTIC_KEYWORDS if re.search(pattern, question)), None)
+
+def percentile_from_question(question: str) -> float:
+    question = (question or '').lower()
+    match = re.search(r'(\d+(?:\.\d+)?)\s*(?:st|nd|rd|th)?\s*(?:percentile|quantile)', question)
+    if match:
+        return float(match.group(1))
+    if re.search(r'\b(?:first|lower) quartile\b|\bq1\b', question):
+        return 25.0
+    if re.search(r'\b(?:third|upper) quartile\b|\bq3\b', question):
+        return 75.0
+    return 50.0
+
+def select_columns(names: List[str], numeric: List[str], question: str, needed: int) -> List[str]:
+    """Numeric columns in the order the question mentions them, padded with the first numeric columns"""
+    question = (question or '').lower()
+    # Whole-word mentions only: column "id" isn't named by "provided"
+    positions = ((re.search(rf'(?<!\w){re.escape(name.lower())}(?!\w)', question), name) for name in numeric if name)
+    mentioned = sorted((match.start(), name) for match, name in positions if match)
+    columns = [name for _, name in mentioned]
+    for name in numeric:
+        if len(columns) >= needed:
+            break
+        if name not in columns:
+            columns.append(name)
+    if len(columns) < needed:
+        raise ValueError(f"Need {needed} numeric column(s), found {len(columns)}")
+    return columns[:needed]
+
+def regression_order(columns: List[str], question: str) -> List[str]:
+    """[x, y] for a regression; "y on x", "y against x" and "y from x" name the dependent column first"""
+    first, second = columns
+    pattern = rf'{re.escape(first.lower())}\s+(?:on|against|from|vs\.?|versus)\s+{re.escape(second.lower())}'
+    return [second, first] if re.search(pattern, (question or '').lower()) else columns
+
+def _regression_answer(result: Dict[str, float], question: str) -> float:
+    question = (question or '').lower()
+    if 'intercept' in question:
+        return result['intercept']
+    if 'r squared' in question or 'r-squared' in question or 'r2' in question:
+        return result['r_squared']
+    return result['slope']
+
+def compute_statistic(frame, statistic: str, question: str) -> Dict[str, Any]:
+    """Evaluate a statistic over an in-memory frame, choosing columns from the question"""
+    needed = 2 if statistic in PAIRED_STATISTICS else 1
+    columns = select_columns(column_names(frame), numeric_column_names(frame), question, needed)
+    if statistic == 'linregress':
+        columns = regression_order(columns, question)
+    arrays = [column_array(frame, name) for name in columns]
+    ddof = 0 if 'population' in (question or '').lower() else 1
+
+    if statistic == 'mean':
+        answer = mean(arrays[0])
+    elif statistic == 'median':
+        answer = median(arrays[0])
+    elif statistic == 'std':
+        answer = std(arrays[0], ddof)
+    elif statistic == 'variance':
+        answer = variance(arrays[0], ddof)
+    elif statistic == 'percentile':
+        answer = percentile(arrays[0], percentile_from_question(question))
+    elif statistic == 'correlation':
+        answer = correlation(*arrays)
+    elif statistic == 'spearman':
+        answer = spearman(*arrays)
+    elif statistic == 'covariance':
+        answer = covariance(*arrays, ddof=ddof)
+    elif statistic == 'linregress':
+        answer = _regression_answer(linregress(*arrays), question)
+    else:
+        raise ValueError(f"Unknown statistic: {statistic}")
+
+    return {'statistic': statistic, 'columns': columns, 'answer': float(answer)}
+
+def csv_column_chunks(path: str, columns: List[str], chunk_rows: int = 1_000_000) -> Iterator[List[np.ndarray]]:
+    import pandas as pd
+
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+        yield [pd.to_numeric(chunk[name], errors='coerce').to_numpy(dtype=np.float64) for name in columns]
+
+def compute_streaming_statistic(path: str, statistic: str, question: str, chunk_rows: int = 1_000_000) -> Dict[str, Any]:
+    """Same as compute_statistic for a CSV file on disk, in bounded memory"""
+    import pandas as pd
+
+    header = pd.read_csv(path, nrows=1000)
+    names = [str(c) for c in header.columns]
+    numeric = [str(c) for c in header.select_dtypes('number').columns]
+    needed = 2 if statistic in PAIRED_STATISTICS else 1
+    columns = select_columns(names, numeric, question, needed)
+    if statistic == 'linregress':
+        columns = regression_order(columns, question)
+    ddof = 0 if 'population' in (question or '').lower() else 1
+
+    def chunks():
+        return csv_column_chunks(path, columns, chunk_rows)
+
+    report = {}
+    if statistic in ('percentile', 'median'):
+        q = 50.0 if statistic == 'median' else percentile_from_question(question)
+        answer = streaming_quantile(lambda: (arrays[0] for arrays in chunks()), q, report=report)
+    elif statistic in PAIRED_STATISTICS:
+        if statistic == 'spearman':
+            raise ValueError("Spearman correlation needs ranks and is not available in streaming mode")
+        running = RunningCovariance()
+        for x, y in chunks():
+            running.update(x, y)
+        if statistic == 'correlation':
+            answer = running.correlation()
+        elif statistic == 'covariance':
+            answer = running.covariance(ddof)
+        else:
+            answer = _regression_answer(running.linregress(), question)
+    else:
+        running = RunningStats()
+        for (values,) in chunks():
+            running.update(values)
+        if statistic == 'mean':
+            answer = running.mean
+        elif statistic == 'std':
+            answer = running.std(ddof)
+        else:
+            answer = running.variance(ddof)
+
+    return {'statistic': statistic, 'columns': columns, 'answer': float(answer), 'streaming': True,
+            'approximate': report.get('approximate', False)}
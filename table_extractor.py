@@ -0,0 +1,254 @@
+import logging
+import re
+from html import unescape
+from typing import Any, Dict, List, Optional
+import numpy as np
+from csv_aggregator import empty_partial
+from numeric_scanner import NUMBER_TEXT
+
+logger = logging.getLogger(__name__)
+
+# "1,234", "$5", "-3.5", "12%", "(42)", "€ 1,000.50"
+NUMERIC_CELL = re.compile(
+    r'^(\()?\s*([-+−])?\s*[$€£¥₹]?\s*([-+−])?\s*'
+    r'(\d{1,3}(?:,\d{3})+|\d+|(?=\.\d))(\.\d+)?\s*%?\s*(\))?$'
+)
+
+def coerce_number(cell: str) -> Optional[float]:
+    """Parse a formatted numeric cell; percentages keep their face value (12% -> 12.0)"""
+    match = NUMERIC_CELL.match(cell.strip())
+    if not match:
+        return None
+    open_paren, sign, inner_sign, integer, fraction, close_paren = match.groups()
+    if bool(open_paren) != bool(close_paren):
+        return None
+
+    value = float((integer or '0').replace(',', '') + (fraction or ''))
+    if (sign or inner_sign or '') in ('-', '−') or open_paren:
+        value = -value
+    return value
+
+FORMATTING = str.maketrans('', '', '$€£¥₹% ')
+
+def _strip_formatting(cell: str) -> str:
+    stripped = cell.translate(FORMATTING)
+    if ',' in stripped:
+        # Only commas in valid thousands groups ("1,234"); "1,2,3" is a list, not 123
+        return stripped.replace(',', '') if NUMBER_TEXT.fullmatch(stripped) else ','
+    return stripped
+
+def coerce_column(cells: List[str]) -> Optional[np.ndarray]:
+    """
+    Convert a column of cells to float64 (blank -> NaN), or None if any cell isn't numeric.
+    Plain formatting is stripped and converted in one NumPy call; cells NumPy rejects
+    (parentheses, unicode minus) go through coerce_number.
+    """
+    if not any(cells):
+        return None
+    stripped = [_strip_formatting(cell) for cell in cells]
+    try:
+        values = np.array([cell or 'nan' for cell in stripped], dtype=np.float64)
+    except ValueError:
+        pass
+    else:
+        # NumPy also reads "nan" / "inf" text; only blank cells may come out non-finite
+        blank = np.array([not cell for cell in stripped])
+        return None if (~np.isfinite(values) & ~blank).any() else values
+
+    values = [coerce_number(cell) if cell else np.nan for cell in cells]
+    if any(value is None for value in values):
+        return None
+    return np.array(values, dtype=np.float64)
+
+# Rows are split on <tr> and cell bodies run until the next sibling tag, so unclosed <td>/<tr> still parse
+TABLE_BOUNDARY = re.compile(r'<(/?)table\b[^>]*>', re.IGNORECASE)
+SECTION = re.compile(r'</?(thead|tbody|tfoot)\b[^>]*>', re.IGNORECASE)
+ROW_START = re.compile(r'<tr\b[^>]*>', re.IGNORECASE)
+ROW_END = re.compile(r'</tr\s*>|</?t(?:head|body|foot)\b', re.IGNORECASE)
+CELL = re.compile(r'<t([dh])\b([^>]*)>(.*?)(?=<t[dh]\b|</t[dh]\s*>|$)', re.IGNORECASE | re.DOTALL)
+CAPTION = re.compile(r'<caption\b[^>]*>(.*?)</caption\s*>', re.IGNORECASE | re.DOTALL)
+COLSPAN = re.compile(r'colspan\s*=\s*["\']?(\d+)', re.IGNORECASE)
+OTHER_TAG = re.compile(r'<[^>]*>')
+NON_CONTENT = re.compile(r'<!--.*?-->|<(script|style|template)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+def _clean(text: str) -> str:
+    if '<' in text:
+        text = OTHER_TAG.sub(' ', text)
+    if '&' in text:
+        text = unescape(text)
+    return ' '.join(text.split())
+
+def _split_tables(html: str) -> List[str]:
+    """Table bodies in document order of their closing tags; nested tables are cut out of their parents"""
+    tables = []
+    stack = []
+    pieces = []
+    position = 0
+
+    for match in TABLE_BOUNDARY.finditer(html):
+        if stack:
+            pieces[-1].append(html[position:match.start()])
+        position = match.end()
+
+        if not match.group(1):
+            stack.append(match.start())
+            pieces.append([])
+        elif stack:
+            stack.pop()
+            tables.append(''.join(pieces.pop()))
+
+    while pieces:
+        if stack:
+            pieces[-1].append(html[position:])
+            position = len(html)
+            stack.pop()
+        tables.append(''.join(pieces.pop()))
+
+    return tables
+
+def _parse_table(content: str) -> Dict[str, Any]:
+    caption = CAPTION.search(content)
+    rows = []
+
+    # Text before the first <tr> and after each row body may open or close a <thead>
+    chunks = ROW_START.split(content)
+    in_thead = _section_after(chunks[0], False)
+
+    for chunk in chunks[1:]:
+        end = ROW_END.search(chunk)
+        body = chunk[:end.start()] if end else chunk
+
+        cells = []
+        all_th = True
+        for kind, attrs, text in CELL.findall(body):
+            text = _clean(text)
+            span = COLSPAN.search(attrs) if attrs else None
+            cells.extend([text] * (int(span.group(1)) if span else 1))
+            all_th = all_th and kind in 'hH'
+
+        if cells:
+            rows.append({'cells': cells, 'header': in_thead, 'all_th': all_th})
+        if end:
+            in_thead = _section_after(chunk[end.start():], in_thead)
+
+    return {'rows': rows, 'caption': _clean(caption.group(1)) if caption else ''}
+
+def _section_after(text: str, in_thead: bool) -> bool:
+    for match in SECTION.finditer(text):
+        in_thead = match.group(1).lower() == 'thead' and not match.group(0).startswith('</')
+    return in_thead
+
+def _build_frame(index: int, raw: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    rows = raw['rows']
+    if not rows:
+        return None
+
+    # Header: explicit <thead>/<th> rows, else a non-numeric first row over numeric data
+    header_rows = 0
+    while header_rows < len(rows) and (rows[header_rows]['header'] or rows[header_rows]['all_th']):
+        header_rows += 1
+    if header_rows == 0 and len(rows) > 1:
+        first, second = rows[0]['cells'], rows[1]['cells']
+        if all(coerce_number(c) is None for c in first if c) and any(coerce_number(c) is not None for c in second):
+            header_rows = 1
+
+    width = max(len(row['cells']) for row in rows)
+    if header_rows:
+        header = rows[header_rows - 1]['cells']
+        columns = [header[i] if i < len(header) and header[i] else f'column_{i + 1}' for i in range(width)]
+    else:
+        columns = [f'column_{i + 1}' for i in range(width)]
+
+    # De-duplicate repeated names (colspan headers, blank headers)
+    seen = {}
+    for i, name in enumerate(columns):
+        if name in seen:
+            seen[name] += 1
+            columns[i] = f'{name}_{seen[name]}'
+        else:
+            seen[name] = 0
+
+    body = [row['cells'] + [''] * (width - len(row['cells'])) for row in rows[header_rows:]]
+    data = {}
+    types = {}
+    for i, name in enumerate(columns):
+        cells = [row[i] for row in body]
+        values = coerce_column(cells)
+        if values is not None:
+            data[name] = values
+            types[name] = 'number'
+        else:
+            data[name] = cells
+            types[name] = 'text'
+
+    return {
+        'index': index,
+        'caption': raw['caption'],
+        'columns': columns,
+        'types': types,
+        'data': data,
+        'num_rows': len(body)
+    }
+
+def extract_tables(html: str) -> List[Dict[str, Any]]:
+    """
+    Extract every HTML table as a typed columnar frame:
+    {'index', 'caption', 'columns', 'types', 'data', 'num_rows'}, where numeric
+    columns are float64 NumPy arrays (blank cells become NaN).
+    """
+    if '<table' not in html and '<TABLE' not in html:
+        return []
+
+    frames = []
+    for content in _split_tables(NON_CONTENT.sub('', html)):
+        frame = _build_frame(len(frames), _parse_table(content))
+        if frame is not None:
+            frames.append(frame)
+
+    logger.info(f"Extracted {len(frames)} tables")
+    return frames
+
+ORDINALS = {'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5, 'last': -1}
+
+def mentions(name: str, text: str) -> bool:
+    """Whether `name` appears in `text` as a whole word, so column 'id' isn't mentioned by 'provided'"""
+    return bool(name) and re.search(rf'(?<!\w){re.escape(name.lower())}(?!\w)', text.lower()) is not None
+
+def select_table(frames: List[Dict[str, Any]], question: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Choose the table a question refers to: 'table 2' / 'second table', matching column names, or the largest"""
+    if not frames:
+        return None
+
+    question = (question or '').lower()
+    match = re.search(r'table\s*#?\s*(\d+)', question)
+    if match and 1 <= int(match.group(1)) <= len(frames):
+        return frames[int(match.group(1)) - 1]
+    match = re.search(r'\b(first|second|third|fourth|fifth|last)\s+table', question)
+    if match:
+        position = ORDINALS[match.group(1)]
+        if position == -1 or position <= len(frames):
+            return frames[position if position == -1 else position - 1]
+
+    def score(frame):
+        mentioned = sum(1 for name in frame['columns'] if mentions(name, question))
+        caption = 1 if mentions(frame['caption'], question) else 0
+        return (mentioned + caption, frame['num_rows'])
+
+    return max(frames, key=score)
+
+def frame_to_partial(frame: Dict[str, Any], columns: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Aggregate a frame's numeric columns into the CSV kernel partial structure"""
+    partial = empty_partial()
+    partial['rows'] = frame['num_rows'] + 1
+
+    for name in columns or frame['columns']:
+        if frame['types'].get(name) != 'number':
+            continue
+        values = frame['data'][name]
+        present = values[~np.isnan(values)]
+        partial['column_sums'][name] = float(present.sum())
+        partial['column_counts'][name] = int(present.size)
+        partial['total_sum'] += float(present.sum())
+        partial['numeric_count'] += int(present.size)
+
+    return partial
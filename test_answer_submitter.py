@@ -0,0 +1,108 @@
+import asyncio
+import time
+import httpx
+from answer_submitter import AnswerSubmitter
+
+def submit(host, handler, answer=42, **options):
+    async def run():
+        submitter = AnswerSubmitter(**{'base_delay': 0.001, 'max_delay': 0.001, **options})
+        await submitter.client.aclose()
+        submitter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await submitter.submit_answer(f'http://{host}.test/submit', 'a@b.c', 's',
+                                                 'http://quiz.test/1', answer)
+        finally:
+            await submitter.close()
+    return asyncio.run(run())
+
+def responses(*statuses):
+    remaining = list(statuses)
+
+    def handler(request):
+        status = remaining.pop(0)
+        if status is None:
+            raise httpx.ConnectError('connection refused', request=request)
+        return httpx.Response(status, json={'correct': True, 'url': None} if status == 200 else None)
+    return handler
+
+def test_transient_failures_are_retried():
+    handler = responses(503, None, 200)
+    result = submit('transient', handler)
+    assert result['status'] == 'submitted' and result['correct'] and result['attempts'] == 3
+
+def test_client_errors_fail_at_once():
+    handler = responses(400, 200)
+    result = submit('rejected', handler)
+    assert result['status'] == 'error' and not result['retryable'] and result['attempts'] == 1
+
+def test_retries_stop_at_max_attempts():
+    handler = responses(429, 429, 429)
+    result = submit('throttled', handler, max_attempts=3)
+    assert result['status'] == 'error' and result['retryable'] and result['attempts'] == 3
+
+def test_unserializable_answer_is_an_error_result():
+    def handler(request):
+        raise AssertionError('nothing should be sent')
+    result = submit('unserializable', handler, answer=object())
+    assert result['status'] == 'error' and not result['retryable'] and result['attempts'] == 0
+
+def test_int_keyed_answers_serialize():
+    seen = []
+
+    def handler(request):
+        seen.append(request.content)
+        return httpx.Response(200, json={'correct': True})
+    assert submit('intkeys', handler, answer={1: 'a'})['status'] == 'submitted'
+    assert b'"1":"a"' in seen[0]
+
+def test_retry_after_is_capped_at_max_delay():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503, headers={'retry-after': '600'})
+        return httpx.Response(200, json={'correct': True})
+
+    start = time.monotonic()
+    result = submit('slowdown', handler, max_delay=0.01)
+    assert result['status'] == 'submitted' and result['attempts'] == 2
+    assert time.monotonic() - start < 5
+
+def test_submissions_without_a_deadline_get_a_total_budget():
+    def handler(request):
+        return httpx.Response(503, headers={'retry-after': '1'})
+
+    start = time.monotonic()
+    result = submit('budget', handler, max_attempts=100, max_delay=1.0, max_total=2.5)
+    assert result['status'] == 'error' and result['retryable'] and result['attempts'] <= 2
+    assert time.monotonic() - start < 5
+
+def test_cancelled_owner_does_not_cancel_identical_waiters():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return httpx.Response(200, json={'correct': True})
+
+    async def run():
+        submitter = AnswerSubmitter()
+        await submitter.client.aclose()
+        submitter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        args = ('http://cancelled.test/submit', 'a@b.c', 's', 'http://quiz.test/1', 42)
+        try:
+            owner = asyncio.create_task(submitter.submit_answer(*args))
+            await asyncio.sleep(0.05)
+            waiter = asyncio.create_task(submitter.submit_answer(*args))
+            await asyncio.sleep(0.05)
+            owner.cancel()
+            result = await asyncio.wait_for(waiter, 5)
+            return owner.cancelled(), result
+        finally:
+            await submitter.close()
+
+    owner_cancelled, result = asyncio.run(run())
+    assert owner_cancelled
+    assert result['status'] == 'submitted' and len(calls) == 2
@@ -0,0 +1,59 @@
+import gzip
+import io
+import tarfile
+import zipfile
+from archive_reader import open_data_stream, select_member
+from data_processor import DataProcessor
+
+def zip_bytes(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def tar_bytes(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+def read_member(data: bytes, name: str, member=None):
+    with open_data_stream(io.BytesIO(data), name, member) as (member_name, stream):
+        return member_name, stream.read()
+
+def test_select_member_prefers_named_then_data_files():
+    names = ['README.md', 'dir/data.csv', 'other.json']
+    assert select_member(names, 'other.json') == 'other.json'
+    assert select_member(names, 'data.csv') == 'dir/data.csv'
+    assert select_member(names) == 'dir/data.csv'
+
+def test_select_member_falls_back_when_named_member_is_missing():
+    assert select_member(['README.md', 'values.csv'], 'data.csv') == 'values.csv'
+
+def test_select_member_extension_filter_has_no_fallback():
+    assert select_member(['values.csv'], '.json') is None
+
+def test_zip_missing_member_falls_back_to_first_data_file():
+    data = zip_bytes({'README.md': b'hi', 'values.csv': b'a\n1\n'})
+    assert read_member(data, 'data.zip', 'data.csv') == ('values.csv', b'a\n1\n')
+
+def test_tar_missing_member_falls_back_to_first_data_file():
+    data = tar_bytes({'README.md': b'hi', 'values.csv': b'a\n1\n'})
+    assert read_member(data, 'data.tar.gz', 'data.csv') == ('values.csv', b'a\n1\n')
+
+def test_tar_named_member_after_other_data_files():
+    data = tar_bytes({'first.csv': b'a\n1\n', 'wanted.csv': b'a\n2\n'})
+    assert read_member(data, 'data.tar.gz', 'wanted.csv') == ('wanted.csv', b'a\n2\n')
+
+def test_gzip_member_is_the_inner_name():
+    assert read_member(gzip.compress(b'a\n1\n'), 'data.csv.gz') == ('data.csv', b'a\n1\n')
+
+def test_question_member_ignores_archive_names():
+    processor = DataProcessor.__new__(DataProcessor)
+    assert processor._select_archive_member('Sum the values in data.csv.gz') is None
+    assert processor._select_archive_member('Open the archive and sum data.csv.') == 'data.csv'
+    assert processor._select_archive_member('Use files/report.json inside it') == 'report.json'
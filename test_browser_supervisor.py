@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from browser_supervisor import BROWSER_MARKER, BrowserSupervisor
+
+def spawn_browser():
+    return subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)', BROWSER_MARKER])
+
+def test_reap_spares_a_browser_still_being_launched():
+    supervisor = BrowserSupervisor()
+    with supervisor.launching():
+        process = spawn_browser()
+        try:
+            assert supervisor.reap() == 0
+            assert process.poll() is None
+            session = supervisor.register([process.pid])
+        except BaseException:
+            process.kill()
+            raise
+    assert supervisor.reap() == 0
+    supervisor._kill_tree(supervisor.unregister(session)['roots'])
+    assert process.wait(5) is not None
+
+def test_reap_kills_unregistered_browsers():
+    supervisor = BrowserSupervisor()
+    process = spawn_browser()
+    try:
+        assert supervisor.reap() == 1
+        assert process.wait(5) is not None
+    finally:
+        process.kill()
@@ -0,0 +1,46 @@
+import pytest
+from calculator import evaluate, extract_expression, solve
+
+def test_arithmetic_and_word_operators():
+    assert solve('What is (12 + 8) times 3?')['answer'] == 60
+    assert solve('Compute 2 to the power of 10 minus 24')['answer'] == 1000
+    assert solve('What is 7 ÷ 2?')['answer'] == 3.5
+
+def test_aggregate_phrases():
+    assert solve('What is the average of 3, 5 and 10?')['answer'] == 6
+    assert solve('Find the sum of 1,000 and 234')['answer'] == 1234
+
+def test_rejects_unsafe_expressions():
+    for expression in ('__import__("os")', 'open("x")', '[].__class__', 'x + 1'):
+        with pytest.raises(ValueError):
+            evaluate(expression)
+
+def test_nested_powers_are_bounded_before_evaluation():
+    for expression in ('((9**999)**999)**999', '9**999 * 9**999', 'product(10**1000, 10**1000)', '2**5000'):
+        with pytest.raises(ValueError):
+            evaluate(expression)
+    assert evaluate('9**999').bit_length() == 3167
+
+def test_dates_times_and_ids_are_not_arithmetic():
+    assert extract_expression('Due 2024-10-15') is None
+    assert extract_expression('Order 12-34-56 placed 10/15/2024 at 10:30') is None
+    assert solve('What is 2024-10-15?') is None
+
+def test_page_text_only_when_question_asks_to_calculate():
+    page = 'Posted 2024-10-15. The expression is (12 + 8) * 3'
+    assert solve('What is the answer?', page) is None
+    assert solve('Calculate the expression on the page', page)['answer'] == 60
+
+def test_sequences_only_as_function_arguments():
+    for expression in ('[0]*10**6', '(1, 2) + (3, 4)', '[1, 2]'):
+        with pytest.raises(ValueError):
+            evaluate(expression)
+    assert evaluate('sum([1, 2], (3, 4))') == 10
+    with pytest.raises(ValueError):
+        evaluate('sum(range(1, 10**9))')
+
+def test_number_ranges_are_not_subtraction():
+    assert solve('What is the sum of the numbers 1-10?')['answer'] == 55
+    assert solve('Average of the integers from 1 to 100')['answer'] == 50.5
+    assert solve('What is the count of numbers 5 through 7?')['answer'] == 3
+    assert solve('What is the sum of 10-3?')['answer'] == 7
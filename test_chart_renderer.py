@@ -0,0 +1,51 @@
+import asyncio
+import pandas as pd
+from chart_renderer import build_chart_spec, to_data_uri
+
+FRAME = pd.DataFrame({'id': [1, 2, 3], 'region': ['n', 's', 'n'], 'sales': [10, 20, 30]})
+
+def test_substring_of_a_word_does_not_select_a_column():
+    spec = build_chart_spec(FRAME, 'Plot the provided sales data as a bar chart')
+    assert spec['y'] == {'sales': [40, 20]}
+    assert spec['x'] == ['n', 's']
+
+def test_named_column_is_plotted():
+    spec = build_chart_spec(FRAME, 'Draw a line chart of id')
+    assert spec['kind'] == 'line' and list(spec['y']) == ['id']
+
+def test_scatter_uses_two_named_numeric_columns():
+    spec = build_chart_spec(FRAME, 'scatter plot of id against sales as svg')
+    assert spec['kind'] == 'scatter' and spec['format'] == 'svg'
+    assert spec['xlabel'] == 'id' and list(spec['y']) == ['sales']
+
+def test_to_data_uri():
+    assert to_data_uri(b'<svg/>', 'svg') == 'data:image/svg+xml;base64,PHN2Zy8+'
+
+def test_chart_kind_matches_whole_words():
+    assert build_chart_spec(FRAME, 'Chart sales by region before the deadline')['kind'] == 'bar'
+    assert build_chart_spec(FRAME, 'Chart the sales of all copies by region')['kind'] == 'bar'
+    assert build_chart_spec(FRAME, 'Draw pie charts of sales by region')['kind'] == 'pie'
+    assert build_chart_spec(FRAME, 'Plot sales as lines')['kind'] == 'line'
+
+def test_chart_questions_about_data_files_are_routed_to_visualization():
+    from data_processor import DataProcessor
+    processor = DataProcessor.__new__(DataProcessor)
+    routed = []
+
+    async def visualize(instructions, base_url=None):
+        routed.append(instructions['question'])
+        return {'status': 'processed', 'answer': 'data:image/png;base64,'}
+    processor._handle_visualization = visualize
+
+    chart = {'question': 'Plot a line chart of the data at /data/sales.csv', 'data_source': '/data/sales.csv',
+             'answer_format': 'number'}
+    picture = {'question': 'Download the file and return it as an image', 'data_source': '/data/sales.csv',
+               'answer_format': 'base64'}
+    for instructions in (chart, picture):
+        for strategy in ('data_extraction', 'calculation'):
+            asyncio.run(processor._run_strategy(strategy, instructions))
+    assert len(routed) == 4
+
+    assert not processor._wants_chart({'question': 'What is the total of the file?', 'data_source': '/d.csv',
+                                       'answer_format': 'base64'})
+    assert not processor._wants_chart({'question': 'Plot it', 'data_source': '/report.pdf'})
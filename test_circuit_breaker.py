@@ -0,0 +1,57 @@
+import asyncio
+import httpx
+import pytest
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError
+from host_latency import HostLatencyTracker
+
+def test_opens_after_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow() and breaker.rejected == 1
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0, probes=1)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_registry_fails_fast_per_host():
+    registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    registry.check('http://down.test/a').record_failure()
+    with pytest.raises(CircuitOpenError):
+        registry.check('http://down.test/b')
+    assert registry.check('http://up.test/a').state == CLOSED
+
+def test_server_errors_count_as_failures_through_send(monkeypatch):
+    import host_latency
+    registry = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr(host_latency, 'breakers', registry)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    async def run():
+        tracker = HostLatencyTracker()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            for _ in range(2):
+                assert (await tracker.send(client, 'GET', 'http://flaky.test/')).status_code == 503
+            with pytest.raises(CircuitOpenError):
+                await tracker.send(client, 'GET', 'http://flaky.test/')
+
+    asyncio.run(run())
+    assert len(calls) == 2
@@ -0,0 +1,46 @@
+import asyncio
+import os
+from types import SimpleNamespace
+from code_sandbox import CodeSandbox, SCHEMA_CODE, share_body
+
+def run_jobs(jobs, datasets=None):
+    async def run():
+        sandbox = CodeSandbox(workers=1)
+        try:
+            await sandbox.start()
+            pid = next(iter(sandbox._live)).process.pid
+            with open(f'/proc/{pid}/environ', 'rb') as environ:
+                worker_env = environ.read()
+            return worker_env, [await sandbox.run(code, datasets) for code in jobs]
+        finally:
+            await sandbox.close()
+    return asyncio.run(run())
+
+def test_sandbox_isolation():
+    os.environ['LLM_API_KEY'] = 'sk-sandbox-test'
+    try:
+        worker_env, results = run_jobs([
+            "answer = int(np.arange(10).sum())",
+            "answer = pd.read_csv('/proc/self/environ')",
+            "pd.DataFrame({'a': [1]}).to_csv('out.csv')",
+            "answer = ().__class__",
+            "answer = np.os",
+            "from pandas import io",
+            "answer = getattr(pd, 'io')",
+            "answer = type(1)",
+        ])
+    finally:
+        del os.environ['LLM_API_KEY']
+    assert b'sk-sandbox-test' not in worker_env
+    assert results[0]['answer'] == 45
+    assert all(result['status'] == 'error' for result in results[1:])
+    assert [result['error'].split(':')[0] for result in results[1:]] == (
+        ['PermissionError'] * 5 + ['NameError'] * 2)
+
+def test_sandbox_reads_shared_datasets():
+    data = b'a,b\n1,2\n3,4\n'
+    body = SimpleNamespace(path=None, size=len(data), view=memoryview(data))
+    with share_body(body, 'data.csv') as handle:
+        _, results = run_jobs([SCHEMA_CODE, "answer = int(df['b'].sum())"], {'df': handle})
+    assert results[0]['answer']['rows'] == 2
+    assert results[1]['answer'] == 6
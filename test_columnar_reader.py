@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+import pyarrow as pa
+import pyarrow.parquet as pq
+from columnar_reader import _row_group_may_match, aggregate_table, extract_projection, read_table
+
+TABLE = pa.table({
+    'id': list(range(100)),
+    'region': pa.array(['n', 's'] * 50).dictionary_encode(),
+    'code': [str(i % 10) for i in range(100)],
+    'price': [float(i) for i in range(100)],
+})
+
+def parquet_body(table=TABLE, row_group_size=10):
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink, row_group_size=row_group_size)
+    data = sink.getvalue().to_pybytes()
+    return SimpleNamespace(path=None, size=len(data), view=memoryview(data))
+
+def test_projection_keeps_mentioned_columns_and_filters():
+    names = TABLE.column_names
+    assert extract_projection('Sum the price where id > 89', names) == (['price'], [('id', '>', 89)])
+    # A question naming only its filter column keeps it rather than summing everything
+    assert extract_projection('Sum of price where price >= 95', names) == (['price'], [('price', '>=', 95)])
+
+def test_row_groups_are_skipped_by_statistics():
+    metadata = pq.ParquetFile(pa.BufferReader(parquet_body().view)).metadata
+    groups = [i for i in range(metadata.num_row_groups) if _row_group_may_match(metadata, i, [('id', '>', 89)])]
+    assert groups == [9]
+    assert _row_group_may_match(metadata, 0, [('code', '>', 5)])
+
+def test_read_table_projects_and_filters():
+    table = read_table(parquet_body(), 'parquet', ['price'], [('id', '>', 89)])
+    assert table.column_names == ['price', 'id'] and table.num_rows == 10
+
+def test_filters_that_dont_fit_the_column_type_are_cast_or_skipped():
+    body = parquet_body()
+    # Numbers stored as text are compared as numbers
+    assert read_table(body, 'parquet', None, [('code', '=', 3)]).num_rows == 10
+    # A number against text that isn't numeric is skipped instead of failing the question
+    assert read_table(body, 'parquet', None, [('region', '>', 1)]).num_rows == 100
+
+def test_aggregate_partial_with_groups():
+    partial = aggregate_table(TABLE.select(['region', 'price']), group_by='region')
+    assert partial['rows'] == 101 and partial['total_sum'] == sum(range(100))
+    assert partial['column_sums'] == {'price': 4950.0}
+    assert partial['group_counts'] == {'n': 50, 's': 50}
+    assert partial['group_sums']['s'] == {'price': float(sum(range(1, 100, 2)))}
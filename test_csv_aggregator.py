@@ -0,0 +1,63 @@
+import asyncio
+import csv
+import io
+from csv_aggregator import ParallelCSVAggregator, aggregate_buffer, aggregate_row_stream, merge_partials, split_byte_ranges
+
+QUOTED = b'name,amount\n"a","1,234"\nb,5\n"c, d",6\n'
+PLAIN = b'name,amount,other\nx,1,2.5\ny,3,\nz,,4\n'
+
+def rows(data: bytes):
+    return csv.reader(io.StringIO(data.decode()))
+
+def test_quoted_thousands_agree_between_buffer_and_row_paths():
+    buffered = aggregate_buffer(QUOTED, ['name', 'amount'])
+    streamed = aggregate_row_stream(rows(QUOTED))
+    assert buffered['total_sum'] == streamed['total_sum'] == 1245
+    assert buffered['column_sums'] == streamed['column_sums'] == {'amount': 1245}
+
+def test_quoted_buffer_without_column_stats():
+    assert aggregate_buffer(QUOTED, column_stats=False)['total_sum'] == 1245
+
+def test_plain_buffer_matches_row_path():
+    buffered = aggregate_buffer(memoryview(PLAIN), ['name', 'amount', 'other'])
+    streamed = aggregate_row_stream(rows(PLAIN))
+    assert buffered['total_sum'] == streamed['total_sum'] == 10.5
+    assert buffered['numeric_count'] == streamed['numeric_count'] == 4
+    assert buffered['column_sums'] == {'amount': 4, 'other': 6.5}
+
+def test_group_by():
+    partial = aggregate_row_stream(rows(b'g,v\na,1\nb,2\na,3\n'), group_by='g')
+    assert partial['group_counts'] == {'a': 2, 'b': 1}
+    assert partial['group_sums'] == {'a': {'v': 4}, 'b': {'v': 2}}
+
+def test_split_byte_ranges_are_line_aligned(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(b''.join(b'%d,%d\n' % (i, i * 2) for i in range(1000)))
+    ranges = split_byte_ranges(str(path), parts=4, max_chunk_bytes=1024)
+    data = path.read_bytes()
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(data[end - 1:end] == b'\n' for _, end in ranges)
+    merged = merge_partials([aggregate_buffer(data[start:end], column_stats=False) for start, end in ranges])
+    assert merged['total_sum'] == sum(i * 3 for i in range(1000))
+
+def test_parallel_file_aggregation_matches_row_path(tmp_path):
+    data = b'g,v\n' + b''.join(b'%s,%d\n' % (b'ab'[i % 2:i % 2 + 1], i) for i in range(2000))
+    path = tmp_path / 'data.csv'
+    path.write_bytes(data)
+    aggregator = ParallelCSVAggregator(max_workers=2, max_chunk_bytes=2048)
+    try:
+        parallel = asyncio.run(aggregator.aggregate_file(str(path), group_by='g', workers=2))
+        assert aggregator._pool._mp_context.get_start_method() == 'forkserver'
+    finally:
+        aggregator.close()
+    streamed = aggregate_row_stream(rows(data), group_by='g')
+    assert parallel['total_sum'] == streamed['total_sum'] == sum(range(2000))
+    assert parallel['group_counts'] == streamed['group_counts'] == {'a': 1000, 'b': 1000}
+    assert parallel['group_sums'] == streamed['group_sums']
+
+def test_ad_hoc_worker_count_uses_a_short_lived_pool(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(b'v\n' + b''.join(b'%d\n' % i for i in range(500)))
+    aggregator = ParallelCSVAggregator(max_workers=2, max_chunk_bytes=512)
+    result = asyncio.run(aggregator.aggregate_file(str(path), workers=3))
+    assert result['total_sum'] == sum(range(500)) and aggregator._pool is None
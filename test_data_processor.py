@@ -0,0 +1,45 @@
+import asyncio
+import httpx
+import data_processor
+from render_decision import RenderDecisionEngine
+from data_processor import DataProcessor
+
+def scrape(monkeypatch, handler, render, decisions):
+    monkeypatch.setattr(data_processor, 'render_decisions', decisions)
+    monkeypatch.setattr(data_processor.renderer, 'render', render)
+
+    async def run():
+        processor = DataProcessor()
+        processor.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await processor._scrape_with_js_detection('http://data.test/page')
+        finally:
+            await processor.client.aclose()
+    return asyncio.run(run())
+
+def test_known_render_skips_the_static_fetch(monkeypatch):
+    decisions = RenderDecisionEngine()
+    monkeypatch.setattr(decisions, 'known_render', lambda url: True)
+    fetched = []
+
+    async def render(url):
+        return '<p>rendered</p>'
+
+    def handler(request):
+        fetched.append(request)
+        return httpx.Response(200, text='<p>static</p>')
+
+    assert scrape(monkeypatch, handler, render, decisions) == ('<p>rendered</p>', True)
+    assert fetched == []
+
+def test_render_change_is_judged_by_instructions(monkeypatch):
+    decisions = RenderDecisionEngine()
+    monkeypatch.setattr(decisions, 'should_render', lambda url, html: (True, 'test'))
+
+    async def render(url):
+        # Markup split differently: the tag-stripped text differs, what the solver reads doesn't
+        return '<p>stat</p><p>ic</p>'
+
+    html, rendered = scrape(monkeypatch, lambda request: httpx.Response(200, text='<p>static</p>'), render, decisions)
+    assert rendered and html == '<p>stat</p><p>ic</p>'
+    assert decisions.changed == 0 and decisions.unchanged == 1
@@ -0,0 +1,29 @@
+import gzip
+import io
+import zipfile
+from data_readers import detect_format, iter_rows, read_frame
+
+CSV = b'a,b\n1,2\n3,4\n'
+
+def test_detect_format():
+    assert detect_format('/x/data.TSV') == 'csv'
+    assert detect_format('rows.ndjson') == 'jsonl'
+    assert detect_format('data.csv.gz') is None
+
+def test_iter_rows_json_envelope():
+    rows = list(iter_rows(io.BytesIO(b'{"data": [{"a": 1, "b": null}, {"a": 2, "b": [1]}]}'), 'json'))
+    assert rows == [['a', 'b'], ['1', ''], ['2', '[1]']]
+
+def test_read_frame_plain_csv():
+    assert read_frame(io.BytesIO(CSV), 'data.csv')['b'].sum() == 6
+
+def test_read_frame_gzip_csv():
+    assert read_frame(io.BytesIO(gzip.compress(CSV)), '/files/data.csv.gz')['a'].sum() == 4
+
+def test_read_frame_zip_archive():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('README.txt', 'notes')
+        archive.writestr('rows.jsonl', b'{"a": 5}\n{"a": 6}\n')
+    buffer.seek(0)
+    assert read_frame(buffer, 'bundle.zip')['a'].sum() == 11
@@ -0,0 +1,55 @@
+import asyncio
+import numpy as np
+from dataset_cache import DatasetCache, content_hash, estimate_size
+
+class Body:
+    def __init__(self, data: bytes):
+        self.view = memoryview(data)
+
+def test_content_hash_matches_hashlib():
+    import hashlib
+    data = b'x' * (9 * 1024 * 1024)
+    assert content_hash(Body(data)) == hashlib.sha256(data).hexdigest()
+
+def test_url_shortcut_only_inside_a_chain():
+    cache = DatasetCache()
+    with cache.chain():
+        cache.put('d1', 'csv:totals', {'sum': 1}, url='http://data.test/a.csv')
+        assert cache.get_by_url('http://data.test/a.csv', 'csv:totals') == {'sum': 1}
+    # A later chain must download again; unchanged content still hits by hash
+    with cache.chain():
+        assert cache.get_by_url('http://data.test/a.csv', 'csv:totals') is None
+        assert cache.get_by_hash('d1', 'csv:totals', 'http://data.test/a.csv') == {'sum': 1}
+    assert cache.get_by_url('http://data.test/a.csv', 'csv:totals') is None
+
+def test_changed_content_is_not_served_from_an_old_chain():
+    cache = DatasetCache()
+    with cache.chain():
+        cache.put('old', 'csv:totals', 1, url='http://data.test/a.csv')
+    with cache.chain():
+        assert cache.get_by_hash('new', 'csv:totals', 'http://data.test/a.csv') is None
+
+def test_concurrent_chains_are_isolated():
+    cache = DatasetCache()
+
+    async def chain(digest):
+        with cache.chain():
+            cache.put(digest, 'k', digest, url='http://data.test/same')
+            await asyncio.sleep(0)
+            return cache.get_by_url('http://data.test/same', 'k')
+
+    async def run():
+        return await asyncio.gather(chain('a'), chain('b'))
+
+    assert asyncio.run(run()) == ['a', 'b']
+
+def test_lru_eviction_by_size():
+    cache = DatasetCache(max_bytes=100)
+    cache.put('a', 'k', None, size=60)
+    cache.put('b', 'k', None, size=60)
+    assert cache.stats()['entries'] == 1 and cache.evictions == 1
+    cache.put('huge', 'k', None, size=1000)
+    assert cache.stats()['entries'] == 1
+
+def test_estimate_size_uses_nbytes():
+    assert estimate_size(np.zeros(1000)) == 8000
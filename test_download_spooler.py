@@ -0,0 +1,26 @@
+import asyncio
+import httpx
+from download_spooler import DownloadSpooler
+
+def fetch_text(body: bytes, content_type: str, memory_threshold: int = 1024) -> str:
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(
+            200, content=body, headers={'content-type': content_type}))
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with DownloadSpooler(memory_threshold=memory_threshold).fetch(client, 'http://spool.test/d') as spooled:
+                return spooled.text()
+    return asyncio.run(run())
+
+def test_text_uses_declared_charset():
+    text = 'café, naïve'
+    assert fetch_text(text.encode('latin-1'), 'text/plain; charset=iso-8859-1') == text
+
+def test_text_uses_declared_charset_when_spooled_to_disk():
+    text = 'é' * 4096
+    assert fetch_text(text.encode('latin-1'), 'text/csv; charset=latin-1', memory_threshold=100) == text
+
+def test_text_defaults_to_utf8():
+    assert fetch_text('café'.encode('utf-8'), 'text/plain') == 'café'
+
+def test_unknown_charset_falls_back_to_utf8():
+    assert fetch_text('café'.encode('utf-8'), 'text/plain; charset=no-such-codec') == 'café'
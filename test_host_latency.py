@@ -0,0 +1,41 @@
+import asyncio
+import httpx
+from host_latency import HostLatencyTracker
+
+def test_methods_keep_separate_histograms():
+    tracker = HostLatencyTracker(min_samples=5, floor=0.1)
+    for _ in range(10):
+        tracker.observe('http://grader.test/submit', 0.01, method='GET')
+        tracker.observe('http://grader.test/submit', 20.0, method='POST')
+    # Fast GETs don't cap slow POSTs, and slow POSTs don't stretch GET timeouts or hedges
+    assert tracker.timeout_for('http://grader.test/submit', 60.0, 'POST') == 60.0
+    assert tracker.timeout_for('http://grader.test/submit', 60.0, 'GET') == 0.1
+    assert tracker.hedge_delay('http://grader.test/submit', 'GET') < 0.1
+    assert set(tracker.stats()['hosts']) == {'GET grader.test', 'POST grader.test'}
+
+def test_hedge_win_records_latency_from_the_primary_start():
+    tracker = HostLatencyTracker(min_samples=5)
+    url = 'http://hedge.test/page'
+    for _ in range(10):
+        tracker.observe(url, 0.05)
+    delay = tracker.hedge_delay(url)
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200, text='ok')
+
+    recorded = []
+    observe = tracker.observe
+    tracker.observe = lambda url, seconds, ok=True, method='GET': (recorded.append(seconds),
+                                                                   observe(url, seconds, ok, method))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await tracker.send(client, 'GET', url)
+
+    assert asyncio.run(run()).text == 'ok'
+    assert tracker.hedge_wins == 1
+    assert recorded == [recorded[0]] and recorded[0] >= delay
@@ -0,0 +1,35 @@
+import base64
+import datetime
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from json_codec import ENCODERS, decode_json, encode_json
+
+VALUES = [
+    np.int64(5), np.float64(1.5), np.bool_(True), np.float32(0.1), np.arange(3), np.array([[1.5, 2], [3, 4]]),
+    np.array([0.1, 0.2], dtype=np.float32), datetime.datetime(2024, 1, 2, 3, 4, 5, 123456),
+    datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc), datetime.date(2024, 1, 2),
+    pd.Timestamp('2024-01-02 03:04:05'), {1: 'a', 2.5: 'b'}, {'tags': {'x'}}, 'café', b'\x89PNG\r\n\x1a\n\xff',
+]
+
+def test_round_trips():
+    assert decode_json(encode_json({'n': np.int64(7), 'x': np.array([1.5, 2.5])})) == {'n': 7, 'x': [1.5, 2.5]}
+    assert decode_json(encode_json(np.float32(0.1))) == 0.1
+    assert decode_json(encode_json(datetime.datetime(2024, 1, 2, 3, 4, 5))) == '2024-01-02T03:04:05'
+    assert decode_json(encode_json(pd.Timestamp('2024-01-02'))) == '2024-01-02T00:00:00'
+
+def test_bytes_are_base64_not_mangled_text():
+    data = b'\x89PNG\r\n\x1a\n\xff\x00'
+    assert base64.b64decode(decode_json(encode_json({'file': data}))['file']) == data
+
+@pytest.mark.skipif('orjson' not in ENCODERS, reason='orjson not installed')
+def test_orjson_matches_the_json_path():
+    for value in VALUES:
+        assert ENCODERS['orjson'](value) == ENCODERS['json'](value), value
+    assert json.loads(ENCODERS['orjson'](VALUES)) == json.loads(ENCODERS['json'](VALUES))
+
+def test_unknown_types_raise_type_error():
+    for encoder in ENCODERS.values():
+        with pytest.raises(TypeError):
+            encoder({'x': object()})
@@ -0,0 +1,20 @@
+from numeric_scanner import find_secret_code, scan_csv, scan_html, scan_numbers, scan_text
+
+def test_scan_numbers_with_thousands():
+    assert scan_numbers(b'total 1,234.5 and -2e3, .5').tolist() == [1234.5, -2000.0, 0.5]
+
+def test_scan_csv_treats_commas_as_delimiters():
+    assert scan_csv(memoryview(b'a,b\n1,234\n')).tolist() == [1.0, 234.0]
+
+def test_scan_text_leaves_partial_groups_alone():
+    assert scan_text('1,2345').tolist() == [1.0, 2345.0]
+
+def test_scan_html_skips_markup_and_scripts():
+    html = '<p id="x1">Sum 10 and 20</p><script>var a = 99;</script><!-- 7 -->'
+    assert scan_html(html).tolist() == [10.0, 20.0]
+
+def test_find_secret_code_priority():
+    assert find_secret_code('id 123456, the secret code is 4321') == '4321'
+    assert find_secret_code('code: 9876 later secret 5555') == '5555'
+    assert find_secret_code('order 12345') == '12345'
+    assert find_secret_code('page 12') is None
@@ -0,0 +1,47 @@
+import asyncio
+from page_templates import PageTemplateCache, fingerprint
+from parse_scheduler import parse_scheduler
+
+def page(number: int, path: str, heading: str = 'b') -> str:
+    return (f'<html><body><{heading}>Quiz {number}</{heading}><p>Download <a href="{path}">file</a>. '
+            f'What is the sum of the value column?</p><p>Post your answer to https://example.com/submit</p>'
+            f'</body></html>')
+
+def parse_pages(cache, pages):
+    async def run():
+        return [await cache.parse(html) for html in pages]
+    return asyncio.run(run())
+
+def parsed(html):
+    return asyncio.run(parse_scheduler.parse_instructions(html))
+
+def test_pages_of_one_template_share_a_fingerprint():
+    (key_1, slots_1), (key_2, slots_2) = fingerprint(page(1, '/data/a.csv')), fingerprint(page(2, '/data/b.csv'))
+    assert key_1 == key_2 and slots_1 != slots_2
+    assert fingerprint(page(1, '/data/a.csv').replace('sum', 'mean'))[0] != key_1
+
+def test_second_page_verifies_and_later_pages_are_filled():
+    cache = PageTemplateCache()
+    pages = [page(1, '/data/a.csv'), page(2, '/data/b.csv'), page(3, '/data/c.csv')]
+    results = parse_pages(cache, pages)
+    assert cache.stats()['misses'] == 2 and cache.stats()['verified'] == 1 and cache.hits == 1
+    # The filled instructions carry the third page's own values, as the parser would
+    assert results[2][0] == parsed(pages[2])
+    assert results[2][0]['data_source'] == '/data/c.csv' and 'Quiz 3' in results[2][0]['question']
+
+def test_mismatch_falls_back_to_the_parser_and_relearns():
+    cache = PageTemplateCache()
+    # "1" in <h1> repeats the quiz number on the first page, so the first template maps it to the wrong slot
+    pages = [page(n, f'/data/{n}.csv', heading='h1') for n in (1, 2, 3, 4)]
+    results = parse_pages(cache, pages)
+    assert cache.relearned == 1
+    assert [instructions for instructions, _ in results] == [parsed(html) for html in pages]
+    assert cache.misses == 3 and cache.hits == 1
+
+def test_strategy_is_kept_after_a_correct_answer_only():
+    cache = PageTemplateCache()
+    [(_, key)] = parse_pages(cache, [page(1, '/data/a.csv')])
+    cache.record_outcome(key, 'data_extraction', True)
+    assert cache.strategy_for(key) == 'data_extraction'
+    cache.record_outcome(key, 'data_extraction', False)
+    assert cache.strategy_for(key) is None
@@ -0,0 +1,49 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import pytest
+from parse_scheduler import ParseScheduler, page_text
+
+def where(html: str) -> str:
+    if multiprocessing.parent_process() is not None:
+        return 'process'
+    return 'inline' if threading.current_thread() is threading.main_thread() else 'thread'
+
+def fail(html: str) -> str:
+    raise ValueError(f"cannot parse {len(html)} bytes")
+
+def die_in_worker(html: str) -> str:
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return 'thread'
+
+def run(scheduler, function, sizes):
+    async def go():
+        try:
+            return [await scheduler.run(function, 'x' * size) for size in sizes]
+        finally:
+            scheduler.close()
+    return asyncio.run(go())
+
+def test_size_thresholds_pick_the_executor():
+    scheduler = ParseScheduler(inline_bytes=10, process_bytes=100)
+    assert run(scheduler, where, [9, 10, 99, 100]) == ['inline', 'thread', 'thread', 'process']
+    assert scheduler.counts == {'inline': 1, 'thread': 2, 'process': 1}
+
+def test_no_process_pool_when_disabled():
+    scheduler = ParseScheduler(inline_bytes=10, process_bytes=100, processes=0)
+    assert run(scheduler, where, [1000]) == ['thread']
+
+def test_worker_errors_reach_the_caller():
+    for size in (1, 50, 500):
+        with pytest.raises(ValueError, match=f'cannot parse {size} bytes'):
+            run(ParseScheduler(inline_bytes=10, process_bytes=100), fail, [size])
+
+def test_dead_worker_falls_back_to_a_thread():
+    scheduler = ParseScheduler(inline_bytes=10, process_bytes=100)
+    assert run(scheduler, die_in_worker, [500]) == ['thread']
+    assert scheduler.counts == {'inline': 0, 'thread': 1, 'process': 1}
+
+def test_page_text_collapses_whitespace():
+    assert page_text('<p>Hello\n\n  <b>world</b></p>') == 'Hello world'
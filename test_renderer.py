@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+import renderer as renderer_module
+from circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from renderer import Renderer, SeleniumBackend
+
+class StubBackend:
+    name = 'stub'
+
+    def __init__(self, render):
+        self._render = render
+        self.calls = []
+
+    async def render(self, url, settle, light, timeout):
+        self.calls.append((url, timeout))
+        return await self._render(url)
+
+    async def close(self):
+        pass
+
+def test_falls_back_to_selenium_when_playwright_cannot_launch(monkeypatch):
+    async def broken_start(self):
+        raise RuntimeError('no browser binary')
+
+    monkeypatch.setattr(renderer_module, 'async_playwright', object())
+    monkeypatch.setattr(renderer_module.PlaywrightBackend, 'start', broken_start)
+    monkeypatch.setattr(SeleniumBackend, '_render_sync', lambda self, url, settle, light, timeout: f'<p>{url}</p>')
+
+    async def run():
+        renderer = Renderer()
+        html = await renderer.render('http://fallback.test/page', settle=0)
+        return renderer, html
+
+    renderer, html = asyncio.run(run())
+    assert html == '<p>http://fallback.test/page</p>'
+    assert renderer.stats()['backend'] == 'selenium' and renderer.renders == 1
+
+def test_forced_selenium_skips_playwright(monkeypatch):
+    async def fail_start(self):
+        raise AssertionError('playwright should not be tried')
+
+    monkeypatch.setattr(renderer_module, 'async_playwright', object())
+    monkeypatch.setattr(renderer_module.PlaywrightBackend, 'start', fail_start)
+    assert asyncio.run(Renderer(backend='selenium')._get_backend()).name == 'selenium'
+
+def test_render_timeouts_count_as_failures():
+    async def hang(url):
+        raise asyncio.TimeoutError()
+
+    renderer = Renderer()
+    renderer._backend = StubBackend(hang)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(renderer.render('http://slow.test/page', timeout=0.5))
+    assert renderer._backend.calls == [('http://slow.test/page', 0.5)]
+    assert renderer.failures == 1 and renderer.renders == 0
+
+def test_open_breaker_fails_before_the_browser(monkeypatch):
+    registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(renderer_module, 'breakers', registry)
+    registry.check('http://down.test/').record_failure()
+
+    async def render(url):
+        return '<p>unreachable</p>'
+
+    renderer = Renderer()
+    renderer._backend = StubBackend(render)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(renderer.render('http://down.test/page'))
+    assert renderer._backend.calls == []
+    # Other hosts still render
+    assert asyncio.run(renderer.render('http://up.test/page', settle=0)) == '<p>unreachable</p>'
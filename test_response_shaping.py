@@ -0,0 +1,43 @@
+import pytest
+from response_shaping import ResponseShape, project
+
+RESULT = {
+    'status': 'success', 'message': 'done', 'url': 'http://quiz.test/1', 'page_text': 'x' * 1000,
+    'instructions': {'question': 'Sum it', 'task_type': 'csv', 'raw': '<html>'},
+    'submission_result': {'status': 'submitted', 'correct': True, 'reason': None, 'response': {'big': 1}}
+}
+
+def test_project_keeps_paths_without_touching_the_record():
+    shaped = project(RESULT, [('instructions', 'question'), ('missing', 'path'), ('url',)])
+    assert shaped == {'instructions': {'question': 'Sum it'}, 'url': 'http://quiz.test/1'}
+    assert RESULT['instructions']['raw'] == '<html>'
+
+def test_full_mode_returns_the_same_object():
+    assert ResponseShape().quiz(RESULT) is RESULT
+
+def test_summary_drops_page_text_and_raw_results():
+    shaped = ResponseShape('summary').quiz(RESULT)
+    assert 'page_text' not in shaped and 'raw' not in shaped['instructions']
+    assert shaped['submission_result'] == {'status': 'submitted', 'correct': True, 'reason': None}
+
+def test_fields_keep_the_status_line_and_parent_paths_cover_children():
+    shape = ResponseShape('fields', ['instructions', 'instructions.question'])
+    shaped = shape.quiz(RESULT)
+    assert shaped == {'status': 'success', 'message': 'done', 'instructions': RESULT['instructions']}
+    assert shape.wants('instructions') and not shape.wants('page_text')
+    assert shape.hop(RESULT) == {'instructions': RESULT['instructions']}
+
+def test_invalid_modes_are_rejected():
+    with pytest.raises(ValueError):
+        ResponseShape('everything')
+    with pytest.raises(ValueError):
+        ResponseShape('fields')
+
+def test_quiz_endpoints_document_but_do_not_declare_response_models():
+    from main import app
+    routes = {route.path: route for route in app.routes if hasattr(route, 'response_model')}
+    assert routes['/quiz'].response_model is None and routes['/quiz-chain'].response_model is None
+    schema = app.openapi()
+    for path, model in (('/quiz', 'QuizResponse'), ('/quiz-chain', 'QuizChainResponse')):
+        content = schema['paths'][path]['post']['responses']['200']['content']['application/json']
+        assert content['schema']['$ref'].endswith(model)
@@ -0,0 +1,74 @@
+import math
+import numpy as np
+import pandas as pd
+from stats_kernels import (RunningCovariance, RunningStats, compute_statistic, detect_statistic,
+                           percentile_from_question, select_columns, streaming_quantile)
+
+def chunked(values: np.ndarray, size: int):
+    return lambda: (values[i:i + size] for i in range(0, len(values), size))
+
+def test_streaming_quantile_matches_numpy():
+    values = np.random.default_rng(1).normal(size=200_000)
+    for q in (0, 25, 50, 99.5, 100):
+        assert streaming_quantile(chunked(values, 30_000), q, sample_size=5_000) == np.percentile(values, q)
+
+def test_streaming_quantile_terminates_on_six_million_identical_values():
+    chunks = lambda: (np.full(1_000_000, 7.0) for _ in range(6))
+    assert streaming_quantile(chunks, 50) == 7.0
+    assert streaming_quantile(chunks, 90) == 7.0
+
+def test_streaming_quantile_ties_next_to_other_values():
+    values = np.concatenate([np.full(5_000, 5.0), np.arange(1_000, dtype=np.float64)])
+    for q in (10, 50, 90):
+        result = streaming_quantile(chunked(values, 700), q, sample_size=500, max_candidates=100)
+        assert result == np.percentile(values, q)
+
+def test_streaming_quantile_falls_back_to_a_bounded_estimate():
+    values = np.arange(100_000, dtype=np.float64)
+    passes = []
+
+    def chunks():
+        passes.append(1)
+        return (values[i:i + 10_000] for i in range(0, len(values), 10_000))
+
+    report = {}
+    result = streaming_quantile(chunks, 50, sample_size=2_000, max_candidates=10, max_attempts=2, report=report)
+    assert report == {'approximate': True, 'sample_size': 2_000}
+    assert abs(result - np.percentile(values, 50)) < 5_000
+    # The reservoir pass plus max_attempts bracket passes, and no pass that loads everything
+    assert len(passes) == 3
+
+def test_streaming_quantile_ignores_nan_and_handles_empty():
+    assert streaming_quantile(chunked(np.array([np.nan, 1.0, 3.0]), 2), 50) == 2.0
+    assert math.isnan(streaming_quantile(lambda: iter([]), 50))
+
+def test_running_stats_merge_matches_numpy():
+    values = np.random.default_rng(2).uniform(size=10_000)
+    left, right = RunningStats(), RunningStats()
+    left.update(values[:3_000])
+    right.update(values[3_000:])
+    left.merge(right)
+    assert math.isclose(left.mean, values.mean())
+    assert math.isclose(left.variance(), values.var(ddof=1))
+
+def test_running_covariance_correlation():
+    x = np.arange(100, dtype=np.float64)
+    stats = RunningCovariance()
+    stats.update(x, 3 * x + 1)
+    assert math.isclose(stats.correlation(), 1.0)
+    assert math.isclose(stats.linregress()['slope'], 3.0)
+
+def test_question_parsing():
+    assert detect_statistic('What is the standard deviation of price?') == 'std'
+    assert detect_statistic('Pearson correlation between a and b') == 'correlation'
+    assert percentile_from_question('the 90th percentile') == 90.0
+    assert percentile_from_question('upper quartile') == 75.0
+
+def test_select_columns_whole_words_in_question_order():
+    numeric = ['id', 'score', 'age']
+    assert select_columns(numeric, numeric, 'Average of the provided score', 1) == ['score']
+    assert select_columns(numeric, numeric, 'correlation of age and score', 2) == ['age', 'score']
+
+def test_compute_statistic_on_frame():
+    frame = pd.DataFrame({'id': [1, 2, 3, 4], 'score': [10.0, 20.0, 30.0, 40.0]})
+    assert compute_statistic(frame, 'mean', 'mean of the provided score')['answer'] == 25.0
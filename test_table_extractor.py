@@ -0,0 +1,46 @@
+import math
+from table_extractor import coerce_column, coerce_number, extract_tables, frame_to_partial, mentions, select_table
+
+def test_coerce_number_formats():
+    assert coerce_number('$1,234.50') == 1234.5
+    assert coerce_number('(42)') == -42
+    assert coerce_number('−3') == -3
+    assert coerce_number('12%') == 12
+    assert coerce_number('1,2,3') is None
+    assert coerce_number('nan') is None
+
+def test_coerce_column_thousands_and_blanks():
+    values = coerce_column(['1,234', '', '$5', '(2)'])
+    assert values[0] == 1234 and math.isnan(values[1]) and values[2] == 5 and values[3] == -2
+
+def test_coerce_column_rejects_comma_lists():
+    assert coerce_column(['1,2,3', '4']) is None
+    assert coerce_column(['12,34', '4']) is None
+
+def test_coerce_column_rejects_nan_and_inf_text():
+    assert coerce_column(['nan', '1']) is None
+    assert coerce_column(['1', 'inf']) is None
+    assert coerce_column(['-Infinity']) is None
+
+def test_mentions_whole_words_only():
+    assert mentions('id', 'Sum the id column')
+    assert not mentions('id', 'Use the provided table')
+    assert mentions('Price ($)', 'total of price ($) please')
+    assert not mentions('', 'anything')
+    assert not mentions(None, 'anything')
+
+TABLES = '''
+<table><caption>Staff</caption><tr><th>id</th><th>age</th></tr><tr><td>1</td><td>30</td></tr></table>
+<table><tr><th>item</th><th>value</th></tr><tr><td>a</td><td>1,000</td></tr><tr><td>b</td><td>2</td></tr>
+<tr><td>c</td><td>3</td></tr></table>
+'''
+
+def test_select_table_ignores_substring_column_matches():
+    frames = extract_tables(TABLES)
+    # "provided" contains "id", but only whole-word mentions count; the larger table wins
+    assert select_table(frames, 'Sum the numbers in the provided table')['index'] == frames[1]['index']
+    assert select_table(frames, 'Sum the age column')['index'] == frames[0]['index']
+
+def test_frame_to_partial_sums_thousands_cells():
+    frame = extract_tables(TABLES)[1]
+    assert frame_to_partial(frame, ['value'])['total_sum'] == 1005
@@ -0,0 +1,24 @@
+import io
+from text_analytics import analyze_stream, parse_text_query
+
+def test_number_of_lines_and_words_are_counts():
+    assert parse_text_query('What is the number of lines in the file?') == {'operation': 'line_count'}
+    assert parse_text_query('Count the number of words in the text') == {'operation': 'word_count'}
+    assert parse_text_query('How many lines are there?') == {'operation': 'line_count'}
+
+def test_named_pattern_must_be_the_counted_object():
+    query = parse_text_query('How many unique email addresses are there?')
+    assert query['operation'] == 'regex_count' and query['name'] == 'email' and query['unique']
+    assert parse_text_query('Count the number of errors in the log')['name'] == 'error'
+    assert parse_text_query('How many numbers appear in the file?')['name'] == 'number'
+
+def test_quoted_terms_still_win():
+    assert parse_text_query('How many lines contain "foo"?')['operation'] == 'line_filter'
+    assert parse_text_query('How many times does "cat" appear?')['operation'] == 'phrase_count'
+
+def test_analyze_stream_counts_across_blocks():
+    data = b'one two\nthree a@b.com\na@b.com four\n'
+    assert analyze_stream(io.BytesIO(data), {'operation': 'line_count'}, block_bytes=5)['answer'] == 3
+    assert analyze_stream(io.BytesIO(data), {'operation': 'word_count'}, block_bytes=5)['answer'] == 10
+    emails = parse_text_query('How many distinct emails are in the file?')
+    assert analyze_stream(io.BytesIO(data), emails, block_bytes=5)['answer'] == 1
@@ -0,0 +1,47 @@
+import asyncio
+import httpx
+import web_scraper
+from render_decision import RenderDecisionEngine
+from web_scraper import WebScraper
+
+def scrape(monkeypatch, handler, render):
+    decisions = RenderDecisionEngine()
+    monkeypatch.setattr(web_scraper, 'render_decisions', decisions)
+    monkeypatch.setattr(decisions, 'should_render', lambda url, html: (True, 'test'))
+    monkeypatch.setattr(web_scraper.renderer, 'render', render)
+
+    async def run():
+        scraper = WebScraper()
+        scraper.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await scraper.scrape_page('http://scrape.test/page')
+        finally:
+            await scraper.close()
+    return asyncio.run(run()), decisions
+
+async def failing_render(url):
+    raise RuntimeError('browser crashed')
+
+def test_failed_render_is_not_recorded_as_unchanged(monkeypatch):
+    (html, error), decisions = scrape(monkeypatch, lambda request: httpx.Response(200, text='<p>static</p>'),
+                                      failing_render)
+    assert html == '<p>static</p>' and error is None
+    assert decisions.changed == 0 and decisions.unchanged == 0
+
+def test_fallback_error_status_is_an_error(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200 if len(calls) == 1 else 503, text='<p>static</p>')
+
+    (html, error), _ = scrape(monkeypatch, handler, failing_render)
+    assert html is None and 'All scraping methods failed' in error
+
+def test_successful_render_is_recorded(monkeypatch):
+    async def render(url):
+        return '<h1>Question?</h1><p>static</p>'
+
+    (html, error), decisions = scrape(monkeypatch, lambda request: httpx.Response(200, text='<p>static</p>'), render)
+    assert html.startswith('<h1>') and error is None
+    assert decisions.changed + decisions.unchanged == 1
@@ -0,0 +1,230 @@
+import heapq
+import logging
+import re
+from collections import Counter
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK_BYTES = 8 * 1024 * 1024
+
+WORD = re.compile(rb"[a-z]+(?:'[a-z]+)?")
+
+NAMED_PATTERNS = {
+    'email': rb'[\w.+-]+@[\w-]+(?:\.[\w-]+)+',
+    'ip address': rb'\b(?:\d{1,3}\.){3}\d{1,3}\b',
+    'url': rb'https?://[^\s"\'<>]+',
+    'date': rb'\b\d{4}-\d{2}-\d{2}\b',
+    'phone number': rb'\+?\d[\d -]{8,}\d',
+    'number': rb'-?\d+(?:\.\d+)?',
+    'error': rb'\berror\b',
+    'warning': rb'\bwarn(?:ing)?\b'
+}
+
+ORDINALS = {
+    'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5,
+    'sixth': 6, 'seventh': 7, 'eighth': 8, 'ninth': 9, 'tenth': 10, 'last': -1
+}
+
+# Single quotes only count at word edges so apostrophes ("what's") aren't taken as quotes
+QUOTED = re.compile(r'`([^`]+)`|"([^"]+)"|“([^”]+)”|‘([^’]+)’|(?<!\w)\'([^\']+)\'(?!\w)')
+
+def iter_blocks(stream: BinaryIO, block_bytes: int = BLOCK_BYTES) -> Iterator[bytes]:
+    """Large blocks of the stream, each ending on a line boundary"""
+    remainder = b''
+    while True:
+        data = stream.read(block_bytes)
+        if not data:
+            break
+        data = remainder + data
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            remainder = data
+            continue
+        remainder = data[cut:]
+        yield data[:cut]
+    if remainder:
+        yield remainder + b'\n'
+
+class TopKCounter:
+    """
+    Word counts in bounded memory. Counts are exact until more than `capacity`
+    distinct keys are seen; after that the rarest keys are dropped (lossy
+    counting), so only low-frequency tails can be undercounted.
+    """
+
+    def __init__(self, capacity: int = 200_000):
+        self.capacity = capacity
+        self.counts = Counter()
+        self.pruned = False
+
+    def update(self, keys):
+        self.counts.update(keys)
+        if len(self.counts) > self.capacity * 2:
+            self.counts = Counter(dict(heapq.nlargest(self.capacity, self.counts.items(), key=lambda item: item[1])))
+            self.pruned = True
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        return [(key.decode('utf-8', errors='replace'), count)
+                for key, count in heapq.nsmallest(k, self.counts.items(), key=lambda item: (-item[1], item[0]))]
+
+def _term_pattern(term: str, whole_word: bool = True, case_sensitive: bool = False) -> re.Pattern:
+    escaped = re.escape(term.encode('utf-8'))
+    if whole_word and re.match(r'\w', term) and re.search(r'\w$', term):
+        escaped = rb'\b' + escaped + rb'\b'
+    return re.compile(escaped, 0 if case_sensitive else re.IGNORECASE)
+
+def parse_text_query(question: str) -> Optional[Dict[str, Any]]:
+    """Work out what a text question asks for; None when it isn't a recognised text-analytics question"""
+    lowered = (question or '').lower()
+    quoted = QUOTED.search(question or '')
+    term = next(group for group in quoted.groups() if group is not None) if quoted else None
+    case_sensitive = 'case-sensitive' in lowered or 'case sensitive' in lowered
+
+    nth = re.search(r'\b(\d+)(?:st|nd|rd|th)\s+(?:occurrence|appearance|time|match)', lowered)
+    if nth is None:
+        nth = re.search(r'\b(' + '|'.join(ORDINALS) + r')\s+(?:occurrence|appearance|time|match)', lowered)
+    if nth and term:
+        value = nth.group(1)
+        return {
+            'operation': 'nth_occurrence', 'term': term, 'case_sensitive': case_sensitive,
+            'n': ORDINALS[value] if value in ORDINALS else int(value),
+            'line_number': 'line number' in lowered
+        }
+
+    if re.search(r'\blines?\b', lowered) and re.search(r'\b(?:contain|containing|include|including|with|start|starting|begin|beginning|end|ending|match|matching)', lowered):
+        if term:
+            if re.search(r'\b(?:start|starting|begin|beginning)', lowered):
+                position = 'start'
+            elif re.search(r'\b(?:end|ending)\b', lowered):
+                position = 'end'
+            else:
+                position = 'contains'
+            return {'operation': 'line_filter', 'term': term, 'position': position, 'case_sensitive': case_sensitive}
+
+    if re.search(r'\b(?:regex|pattern|regular expression)\b', lowered) and quoted and '`' in quoted.group(0):
+        return {'operation': 'regex_count', 'pattern': term, 'case_sensitive': case_sensitive}
+
+    top = re.search(r'\btop\s+(\d+)\s+(?:most\s+)?(?:common|frequent)?\s*words\b', lowered)
+    if top:
+        return {'operation': 'word_frequency', 'k': int(top.group(1))}
+    if re.search(r'\bmost\s+(?:common|frequent|used|repeated)\s+word\b', lowered):
+        return {'operation': 'word_frequency', 'k': 1}
+
+    if term and re.search(r'\b(?:how many times|occurrences?|appear|count|frequency|how often)\b', lowered):
+        return {'operation': 'phrase_count', 'term': term, 'case_sensitive': case_sensitive}
+
+    # Lines and words first: "the number of lines" is a line count, not a count of numbers
+    if re.search(r'\b(?:how many|number of|count(?: the| all)?)\s+(?:lines|rows)\b|\bline count\b', lowered):
+        return {'operation': 'line_count'}
+    if re.search(r'\b(?:how many|number of|count(?: the| all)?)\s+words\b|\bword count\b', lowered):
+        return {'operation': 'word_count'}
+
+    # A named pattern only counts as the object of the count ("how many emails", "number of unique IPs"),
+    # never the "number" in "the number of ..."
+    named = next((name for name in NAMED_PATTERNS if re.search(
+        rf'\b(?:how many|count|number of)\s+(?:the\s+)?(?:(?:unique|distinct|different)\s+)?{name}(?:e?s)?\b(?!\s+of\b)',
+        lowered)), None)
+    if named:
+        unique = bool(re.search(r'\b(?:unique|distinct)\b', lowered))
+        return {'operation': 'regex_count', 'pattern': NAMED_PATTERNS[named].decode(), 'name': named,
+                'unique': unique, 'case_sensitive': False}
+
+    return None
+
+def query_key(query: Dict[str, Any]) -> str:
+    """Stable cache key for a parsed query"""
+    return 'text:' + ','.join(f'{key}={query[key]}' for key in sorted(query))
+
+def analyze_stream(stream: BinaryIO, query: Dict[str, Any], block_bytes: int = BLOCK_BYTES) -> Dict[str, Any]:
+    """
+    Run a parsed text query over a binary stream in one pass, holding at most one
+    block of the input plus the query's counters in memory.
+    Returns {'answer', 'notes'}.
+    """
+    operation = query['operation']
+    blocks = iter_blocks(stream, block_bytes)
+
+    if operation == 'line_count':
+        lines = sum(block.count(b'\n') for block in blocks)
+        return {'answer': lines, 'notes': f'{lines} lines'}
+
+    if operation == 'word_count':
+        words = sum(len(WORD.findall(block.lower())) for block in blocks)
+        return {'answer': words, 'notes': f'{words} words'}
+
+    if operation == 'word_frequency':
+        counter = TopKCounter()
+        for block in blocks:
+            counter.update(WORD.findall(block.lower()))
+        top = counter.top(query['k'])
+        if not top:
+            raise ValueError("No words found")
+        answer = top[0][0] if query['k'] == 1 else [word for word, _ in top]
+        approximate = ' (approximate tail)' if counter.pruned else ''
+        return {'answer': answer, 'notes': f"Top words: {top}{approximate}"}
+
+    if operation == 'phrase_count':
+        pattern = _term_pattern(query['term'], case_sensitive=query['case_sensitive'])
+        count = sum(len(pattern.findall(block)) for block in blocks)
+        return {'answer': count, 'notes': f"'{query['term']}' occurs {count} times"}
+
+    if operation == 'regex_count':
+        flags = re.MULTILINE | (0 if query['case_sensitive'] else re.IGNORECASE)
+        pattern = re.compile(query['pattern'].encode('utf-8'), flags)
+        if query.get('unique'):
+            # Distinct matches are kept as a set; bounded by the number of distinct values in the file
+            seen = set()
+            for block in blocks:
+                seen.update(match.lower() for match in pattern.findall(block))
+            count = len(seen)
+        else:
+            count = sum(len(pattern.findall(block)) for block in blocks)
+        label = query.get('name') or query['pattern']
+        return {'answer': count, 'notes': f"{count} {'distinct ' if query.get('unique') else ''}matches for {label}"}
+
+    if operation == 'line_filter':
+        term = re.escape(query['term'].encode('utf-8'))
+        if query['position'] == 'start':
+            expression = rb'^' + term + rb'[^\n]*$'
+        elif query['position'] == 'end':
+            expression = rb'^[^\n]*' + term + rb'\r?$'
+        else:
+            expression = rb'^[^\n]*?' + term + rb'[^\n]*$'
+        pattern = re.compile(expression, re.MULTILINE | (0 if query['case_sensitive'] else re.IGNORECASE))
+        count = sum(len(pattern.findall(block)) for block in blocks)
+        wording = {'start': 'starting with', 'end': 'ending with', 'contains': 'containing'}[query['position']]
+        return {'answer': count, 'notes': f"{count} lines {wording} '{query['term']}'"}
+
+    if operation == 'nth_occurrence':
+        return _nth_occurrence(blocks, query)
+
+    raise ValueError(f"Unknown text operation: {operation}")
+
+def _nth_occurrence(blocks: Iterator[bytes], query: Dict[str, Any]) -> Dict[str, Any]:
+    pattern = _term_pattern(query['term'], case_sensitive=query['case_sensitive'])
+    n = query['n']
+    seen = 0
+    lines_before = 0
+    last = None
+
+    for block in blocks:
+        for match in pattern.finditer(block):
+            seen += 1
+            if n == -1 or seen == n:
+                start = block.rfind(b'\n', 0, match.start()) + 1
+                end = block.find(b'\n', match.end())
+                line = block[start:end].decode('utf-8', errors='replace').rstrip('\r')
+                last = (lines_before + block.count(b'\n', 0, match.start()) + 1, line)
+                if n != -1:
+                    break
+        if n != -1 and seen >= n:
+            break
+        lines_before += block.count(b'\n')
+
+    if last is None:
+        raise ValueError(f"'{query['term']}' occurs only {seen} times")
+
+    line_number, line = last
+    answer = line_number if query.get('line_number') else line
+    return {'answer': answer, 'notes': f"Occurrence {seen if n == -1 else n} of '{query['term']}' on line {line_number}"}
@@ -1,11 +1,11 @@
 import httpx
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from urllib.parse import urljoin
-import asyncio
 import logging
 from typing import Optional, Tuple
+from render_decision import render_decisions
+from renderer import renderer
+from parse_scheduler import parse_scheduler, instruction_signature
+from host_latency import host_latency
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +15,28 @@ class WebScraper:
     
     async def scrape_page(self, url: str) -> Tuple[Optional[str], Optional[str]]:
         try:
+            # Pages that always changed when rendered skip the static fetch
+            if render_decisions.known_render(url):
+                logger.info("Page is known to need JavaScript rendering")
+                html_content, error, _ = await self._render_page(url)
+                return html_content, error
+            
             # Try direct request first (fastest)
-            response = await self.client.get(url)
+            response = await host_latency.send(self.client, 'GET', url)
             response.raise_for_status()
             
             html_content = response.text
             
-            # Only use Selenium if absolutely necessary
-            if self._definitely_needs_js(html_content) or "document.querySelector" in html_content or "innerHTML" in html_content or "atob(" in html_content:
-                logger.info("Page definitely needs JavaScript rendering")
-                return await self._scrape_with_selenium_fast(url)
+            # Only use Selenium if the static features or past renders of this page say so
+            needs_render, _ = render_decisions.should_render(url, html_content)
+            if needs_render:
+                rendered_html, error, rendered = await self._render_page(url)
+                # A failed render falls back to the static page, which says nothing about what rendering changes
+                if rendered:
+                    changed = (await parse_scheduler.run(instruction_signature, html_content) !=
+                               await parse_scheduler.run(instruction_signature, rendered_html))
+                    render_decisions.record_change(url, changed)
+                return rendered_html, error
             else:
                 logger.info("Static page scraped successfully (fast)")
                 return html_content, None
@@ -34,53 +46,23 @@ class WebScraper:
             logger.error(error_msg)
             return None, error_msg
     
-    def _definitely_needs_js(self, html: str) -> bool:
-        """Only use Selenium if we're sure JS is needed"""
-        soup = BeautifulSoup(html, 'html.parser')
-        text = soup.get_text().strip()
-        
-        # If there's meaningful content without JS, don't use Selenium
-        if len(text) > 50 and any(keyword in text.lower() for keyword in ['scrape', 'secret', 'code', 'submit']):
-            return False
-            
-        # Only use Selenium for completely empty pages or specific JS patterns
-        scripts = soup.find_all('script')
-        has_complex_js = any('document.querySelector' in str(script) for script in scripts)
-        
-        return len(text) < 20 and has_complex_js
-    
-    async def _scrape_with_selenium_fast(self, url: str) -> Tuple[Optional[str], Optional[str]]:
-        """Ultra-fast Selenium with minimal delays"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-proxy-server")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        
-        driver = None
+    async def _render_page(self, url: str) -> Tuple[Optional[str], Optional[str], bool]:
+        """
+        Render with the shared headless browser, falling back to the static page.
+        Returns (html, error, rendered); rendered is False when the fallback was used.
+        """
         try:
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.set_page_load_timeout(5)  # Very short timeout
-            driver.implicitly_wait(1)  # Short implicit wait
-            driver.get(url)
-            await asyncio.sleep(1)  # Minimal wait for JS
-            html_content = driver.page_source
-            return html_content, None
+            return await renderer.render(url), None, True
             
         except Exception as e:
-            logger.warning(f"Fast Selenium failed, falling back to direct content: {str(e)}")
+            logger.warning(f"Rendering failed, falling back to direct content: {str(e)}")
             # Fallback to direct request
             try:
-                response = await self.client.get(url)
-                return response.text, None
-            except:
-                return None, f"All scraping methods failed: {str(e)}"
-        finally:
-            if driver:
-                driver.quit()
+                response = await host_latency.send(self.client, 'GET', url)
+                response.raise_for_status()
+                return response.text, None, False
+            except Exception:
+                return None, f"All scraping methods failed: {str(e)}", False
     
     async def close(self):
         await self.client.aclose()